@@ -14,8 +14,8 @@ if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
 from src.db.base import Base  
-from src.models import task, tag, user, role, permission 
-from src.models.association import task_tag, permission_role
+from src.models import task, tag, user, role, permission, task_tombstone, task_archive, audit_event, cache_version, idempotency_key
+from src.models.association import task_tag, task_tag_archive, permission_role
 
 target_metadata = Base.metadata
 
@@ -28,6 +28,26 @@ def get_database_url():
         f"{os.getenv('DB_NAME')}"
     )
 
+# Particiones creadas por la aplicación o por la migración de particionado
+# (p. ej. audit_events_2026_10, tasks_p03): no son parte del modelo y
+# autogenerate no debe proponer eliminarlas
+PARTITION_PREFIXES = ("audit_events_", "tasks_", "task_tag_")
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    table_name = object.table.name if type_ == "index" else name
+    if reflected and compare_to is None and table_name.startswith(PARTITION_PREFIXES):
+        return False
+    # Con tasks particionada por fecha, task_tag no puede tener FK a tasks
+    if (
+        type_ == "foreign_key_constraint"
+        and name == "task_tag_task_id_user_id_fkey"
+        and os.getenv("TASK_PARTITIONING", "none").strip().lower() == "range"
+    ):
+        return False
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
     """
@@ -38,6 +58,7 @@ def run_migrations_offline():
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -60,7 +81,8 @@ def run_migrations_online():
         context.configure(
             connection=connection, 
             target_metadata=target_metadata,
-            compare_type=True
+            compare_type=True,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,44 @@
+"""move_task_list_version
+
+Revision ID: 1e6b8d3f9a27
+Revises: 7a4c2f8e5b91
+Create Date: 2026-10-20 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1e6b8d3f9a27'
+down_revision: Union[str, Sequence[str], None] = '7a4c2f8e5b91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Versión de la lista de tareas de cada usuario en su propia tabla, fuera de users."""
+    op.create_table(
+        'task_list_versions',
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    op.execute(
+        "INSERT INTO task_list_versions (user_id, version) "
+        "SELECT id, task_list_version FROM users WHERE task_list_version > 0"
+    )
+    op.drop_column('users', 'task_list_version')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('users', sa.Column('task_list_version', sa.BigInteger(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE users SET task_list_version = v.version "
+        "FROM task_list_versions v WHERE v.user_id = users.id"
+    )
+    op.drop_table('task_list_versions')
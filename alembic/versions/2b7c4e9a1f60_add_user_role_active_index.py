@@ -0,0 +1,27 @@
+"""add_user_role_active_index
+
+Revision ID: 2b7c4e9a1f60
+Revises: 8f3e61b0c2d7
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b7c4e9a1f60'
+down_revision: Union[str, Sequence[str], None] = '8f3e61b0c2d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Índice (role_id, is_active) para contar miembros por rol con un index-only scan."""
+    op.create_index('idx_user_role_id_is_active', 'users', ['role_id', 'is_active'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_user_role_id_is_active', table_name='users')
@@ -0,0 +1,57 @@
+"""add_task_tag_user_id
+
+Revision ID: 3f9a6c2e8b17
+Revises: 6e1b9d4c7a25
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a6c2e8b17'
+down_revision: Union[str, Sequence[str], None] = '6e1b9d4c7a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    user_id en la clave de tasks y en task_tag, para poder particionar ambas
+    tablas por usuario (ver la revisión siguiente).
+    """
+    op.add_column('task_tag', sa.Column('user_id', sa.UUID(), nullable=True))
+    op.execute(
+        "UPDATE task_tag SET user_id = tasks.user_id FROM tasks WHERE tasks.id = task_tag.task_id"
+    )
+    op.alter_column('task_tag', 'user_id', nullable=False)
+
+    op.drop_constraint('task_tag_task_id_fkey', 'task_tag', type_='foreignkey')
+    op.drop_constraint('task_tag_pkey', 'task_tag', type_='primary')
+    op.drop_constraint('tasks_pkey', 'tasks', type_='primary')
+    op.create_primary_key('tasks_pkey', 'tasks', ['id', 'user_id'])
+    op.create_primary_key('task_tag_pkey', 'task_tag', ['task_id', 'tag_id', 'user_id'])
+    op.create_foreign_key(
+        'task_tag_user_id_fkey', 'task_tag', 'users', ['user_id'], ['id'], ondelete='CASCADE'
+    )
+    op.create_foreign_key(
+        'task_tag_task_id_user_id_fkey', 'task_tag', 'tasks',
+        ['task_id', 'user_id'], ['id', 'user_id'], ondelete='CASCADE',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('task_tag_task_id_user_id_fkey', 'task_tag', type_='foreignkey')
+    op.drop_constraint('task_tag_user_id_fkey', 'task_tag', type_='foreignkey')
+    op.drop_constraint('task_tag_pkey', 'task_tag', type_='primary')
+    op.drop_constraint('tasks_pkey', 'tasks', type_='primary')
+    op.create_primary_key('tasks_pkey', 'tasks', ['id'])
+    op.create_primary_key('task_tag_pkey', 'task_tag', ['task_id', 'tag_id'])
+    op.create_foreign_key(
+        'task_tag_task_id_fkey', 'task_tag', 'tasks', ['task_id'], ['id'], ondelete='CASCADE'
+    )
+    op.drop_column('task_tag', 'user_id')
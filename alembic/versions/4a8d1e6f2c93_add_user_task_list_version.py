@@ -0,0 +1,28 @@
+"""add_user_task_list_version
+
+Revision ID: 4a8d1e6f2c93
+Revises: e7b93f1c4a20
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a8d1e6f2c93'
+down_revision: Union[str, Sequence[str], None] = 'e7b93f1c4a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Versión de la lista de tareas de cada usuario, clave de la caché de GET /tasks."""
+    op.add_column('users', sa.Column('task_list_version', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'task_list_version')
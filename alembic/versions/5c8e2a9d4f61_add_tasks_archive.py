@@ -0,0 +1,72 @@
+"""add_tasks_archive
+
+Revision ID: 5c8e2a9d4f61
+Revises: 8b5d3e7f1a42
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c8e2a9d4f61'
+down_revision: Union[str, Sequence[str], None] = '8b5d3e7f1a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Tablas frías para las tareas completadas archivadas y sus tags."""
+    op.create_table('tasks_archive',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('status', postgresql.ENUM(name='taskstatus', create_type=False), nullable=False),
+    sa.Column('priority', postgresql.ENUM(name='taskpriority', create_type=False), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('change_seq', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('created_by', sa.String(length=100), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_by', sa.String(length=100), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', 'user_id')
+    )
+    op.create_index('idx_task_archive_user_id_created_at', 'tasks_archive', ['user_id', 'created_at'], unique=False)
+    op.create_index(
+        'idx_task_archive_user_id_modified_at',
+        'tasks_archive',
+        ['user_id', sa.text('coalesce(updated_at, created_at)')],
+        unique=False,
+    )
+    op.create_table('task_tag_archive',
+    sa.Column('task_id', sa.UUID(), nullable=False),
+    sa.Column('tag_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['task_id', 'user_id'], ['tasks_archive.id', 'tasks_archive.user_id'], name='task_tag_archive_task_id_user_id_fkey', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('task_id', 'tag_id', 'user_id')
+    )
+    # Candidatas al archivado, sin recorrer las tareas abiertas
+    op.create_index(
+        'idx_task_completed_modified_at',
+        'tasks',
+        [sa.text('coalesce(updated_at, created_at)')],
+        unique=False,
+        postgresql_where=sa.text("status = 'COMPLETED'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_task_completed_modified_at', table_name='tasks')
+    op.drop_table('task_tag_archive')
+    op.drop_index('idx_task_archive_user_id_modified_at', table_name='tasks_archive')
+    op.drop_index('idx_task_archive_user_id_created_at', table_name='tasks_archive')
+    op.drop_table('tasks_archive')
@@ -0,0 +1,33 @@
+"""add_idempotency_claim_token
+
+Revision ID: 6c1f9e4a7d38
+Revises: 1e6b8d3f9a27
+Create Date: 2026-10-20 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c1f9e4a7d38'
+down_revision: Union[str, Sequence[str], None] = '1e6b8d3f9a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Token de la reserva de cada Idempotency-Key."""
+    # Las claves existentes quedan con token vacío: ningún request en curso lo conoce
+    op.add_column(
+        'idempotency_keys',
+        sa.Column('claim_token', sa.String(length=32), server_default='', nullable=False),
+    )
+    op.alter_column('idempotency_keys', 'claim_token', server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('idempotency_keys', 'claim_token')
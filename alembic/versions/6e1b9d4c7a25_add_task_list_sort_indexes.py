@@ -0,0 +1,46 @@
+"""add_task_list_sort_indexes
+
+Revision ID: 6e1b9d4c7a25
+Revises: 9c3f5b7a2d18
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1b9d4c7a25'
+down_revision: Union[str, Sequence[str], None] = '9c3f5b7a2d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Índices (user_id, criterio de orden) para los ordenamientos y filtros de fecha de GET /tasks."""
+    op.create_index('idx_task_user_id_created_at', 'tasks', ['user_id', 'created_at'], unique=False)
+    op.create_index(
+        'idx_task_user_id_modified_at',
+        'tasks',
+        ['user_id', sa.text('coalesce(updated_at, created_at)')],
+        unique=False,
+    )
+    op.create_index(
+        'idx_task_user_id_status_created_at', 'tasks', ['user_id', 'status', 'created_at'], unique=False
+    )
+    op.create_index(
+        'idx_task_user_id_priority_created_at', 'tasks', ['user_id', 'priority', 'created_at'], unique=False
+    )
+    # Prefijo del nuevo (user_id, status, created_at)
+    op.drop_index('idx_task_user_id_status', table_name='tasks')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('idx_task_user_id_status', 'tasks', ['user_id', 'status'], unique=False)
+    op.drop_index('idx_task_user_id_priority_created_at', table_name='tasks')
+    op.drop_index('idx_task_user_id_status_created_at', table_name='tasks')
+    op.drop_index('idx_task_user_id_modified_at', table_name='tasks')
+    op.drop_index('idx_task_user_id_created_at', table_name='tasks')
@@ -0,0 +1,44 @@
+"""add_task_change_xid
+
+Revision ID: 7a4c2f8e5b91
+Revises: 2d7f4a9c1e63
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4c2f8e5b91'
+down_revision: Union[str, Sequence[str], None] = '2d7f4a9c1e63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Transacción de cada cambio (xid8) para ordenar el feed por orden de commit."""
+    # Default estable: las filas existentes toman el id de esta transacción sin reescribir la tabla
+    for table in ('tasks', 'task_tombstones'):
+        op.execute(f"ALTER TABLE {table} ADD COLUMN change_xid xid8 NOT NULL DEFAULT pg_current_xact_id()")
+    op.drop_index('idx_task_user_id_change_seq', table_name='tasks')
+    op.create_index('idx_task_user_id_change_xid_seq', 'tasks', ['user_id', 'change_xid', 'change_seq'], unique=False)
+    op.drop_index('idx_task_tombstone_user_id_change_seq', table_name='task_tombstones')
+    op.create_index(
+        'idx_task_tombstone_user_id_change_xid_seq',
+        'task_tombstones',
+        ['user_id', 'change_xid', 'change_seq'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_task_tombstone_user_id_change_xid_seq', table_name='task_tombstones')
+    op.create_index('idx_task_tombstone_user_id_change_seq', 'task_tombstones', ['user_id', 'change_seq'], unique=False)
+    op.drop_index('idx_task_user_id_change_xid_seq', table_name='tasks')
+    op.create_index('idx_task_user_id_change_seq', 'tasks', ['user_id', 'change_seq'], unique=False)
+    op.drop_column('task_tombstones', 'change_xid')
+    op.drop_column('tasks', 'change_xid')
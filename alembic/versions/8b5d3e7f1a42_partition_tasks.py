@@ -0,0 +1,159 @@
+"""partition_tasks
+
+Revision ID: 8b5d3e7f1a42
+Revises: 3f9a6c2e8b17
+Create Date: 2026-10-19 20:30:00.000000
+
+"""
+import os
+from datetime import date, datetime, timezone
+from typing import Dict, List, Sequence, Tuple, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b5d3e7f1a42'
+down_revision: Union[str, Sequence[str], None] = '3f9a6c2e8b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Estrategia elegida al aplicar esta revisión (ver README, "Particionado de tareas"):
+# - none:  tablas sin particionar
+# - hash:  tasks y task_tag en TASK_HASH_PARTITIONS particiones hash por user_id
+# - range: tasks en particiones mensuales por created_at (task_tag sin particionar)
+STRATEGY = os.getenv("TASK_PARTITIONING", "none").strip().lower()
+HASH_PARTITIONS = int(os.getenv("TASK_HASH_PARTITIONS", "16"))
+RANGE_MONTHS_AHEAD = 2
+
+# Clave primaria de cada tabla según su particionado (debe incluir la clave de partición)
+PRIMARY_KEYS = {
+    ("tasks", "none"): "id, user_id",
+    ("tasks", "hash"): "id, user_id",
+    ("tasks", "range"): "id, created_at",
+    ("task_tag", "none"): "task_id, tag_id, user_id",
+    ("task_tag", "hash"): "task_id, tag_id, user_id",
+}
+TASK_FK = "task_tag_task_id_user_id_fkey"
+
+
+def _month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _strategy(conn, table: str) -> str:
+    strategy = conn.execute(sa.text(
+        "SELECT partstrat FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"
+    ), {"table": table}).scalar()
+    return {"h": "hash", "r": "range"}.get(strategy, "none")
+
+
+def _definitions(conn, table: str) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """
+    Índices (salvo la clave primaria) y FKs propias de `table`, para recrearlos.
+    Las FKs entre particiones que Postgres deriva de la del padre se omiten.
+    """
+    indexes = conn.execute(sa.text(
+        "SELECT indexdef FROM pg_indexes "
+        "WHERE schemaname = current_schema() AND tablename = :table AND indexname <> :table || '_pkey' "
+        "ORDER BY indexname"
+    ), {"table": table}).scalars().all()
+    foreign_keys = conn.execute(sa.text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = CAST(:table AS regclass) AND contype = 'f' AND conparentid = 0 ORDER BY conname"
+    ), {"table": table}).all()
+    # El índice de una tabla particionada se lista como "ON ONLY"; en la tabla
+    # nueva debe crearse también en sus particiones
+    return [index.replace(" ON ONLY ", " ON ") for index in indexes], [tuple(fk) for fk in foreign_keys]
+
+
+def _partitions(conn, table: str, strategy: str) -> List[Tuple[str, str]]:
+    """(nombre, límites) de las particiones a crear."""
+    if strategy == "hash":
+        return [
+            (f"{table}_p{remainder:02d}", f"FOR VALUES WITH (MODULUS {HASH_PARTITIONS}, REMAINDER {remainder})")
+            for remainder in range(HASH_PARTITIONS)
+        ]
+    oldest = conn.execute(sa.text(f"SELECT min(created_at) FROM {table}")).scalar()
+    current = _month_start(datetime.now(timezone.utc).date())
+    month = _month_start(oldest.date()) if oldest is not None else current
+    partitions = []
+    while month <= _add_months(current, RANGE_MONTHS_AHEAD):
+        following = _add_months(month, 1)
+        partitions.append((
+            f"{table}_{month:%Y_%m}",
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')",
+        ))
+        month = following
+    partitions.append((f"{table}_default", "DEFAULT"))
+    return partitions
+
+
+def _rebuild(targets: Dict[str, str]) -> None:
+    """
+    Recrea las tablas de `targets` ({tabla: estrategia}) con el particionado
+    indicado copiando sus filas, y restaura índices y FKs. Toma un lock
+    exclusivo sobre las tablas durante la copia.
+    """
+    conn = op.get_bind()
+    saved = {table: _definitions(conn, table) for table in targets}
+
+    for table, strategy in targets.items():
+        partition_by = {"hash": " PARTITION BY HASH (user_id)", "range": " PARTITION BY RANGE (created_at)"}
+        op.execute(f"CREATE TABLE {table}_new (LIKE {table} INCLUDING DEFAULTS){partition_by.get(strategy, '')}")
+        if strategy != "none":
+            for name, bounds in _partitions(conn, table, strategy):
+                op.execute(f"CREATE TABLE {name} PARTITION OF {table}_new {bounds}")
+        op.execute(f"INSERT INTO {table}_new SELECT * FROM {table}")
+
+    # task_tag primero: su FK depende de tasks
+    for table in sorted(targets, key=lambda name: name != "task_tag"):
+        op.execute(f"DROP TABLE {table} CASCADE")
+    for table, strategy in targets.items():
+        op.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({PRIMARY_KEYS[(table, strategy)]})")
+        for index in saved[table][0]:
+            op.execute(index)
+
+    for table in targets:
+        for name, definition in saved[table][1]:
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+    _restore_task_fk(conn)
+
+
+def _restore_task_fk(conn) -> None:
+    """FK de task_tag a tasks; no existe si tasks está particionada por fecha."""
+    if _strategy(conn, "tasks") == "range":
+        return
+    exists = conn.execute(sa.text(
+        "SELECT 1 FROM pg_constraint WHERE conname = :name AND conrelid = CAST('task_tag' AS regclass)"
+    ), {"name": TASK_FK}).scalar()
+    if not exists:
+        op.execute(
+            f"ALTER TABLE task_tag ADD CONSTRAINT {TASK_FK} FOREIGN KEY (task_id, user_id) "
+            "REFERENCES tasks (id, user_id) ON DELETE CASCADE"
+        )
+
+
+def upgrade() -> None:
+    """Particiona tasks (y task_tag con hash) según TASK_PARTITIONING; con 'none' no hace nada."""
+    if STRATEGY not in ("none", "hash", "range"):
+        raise ValueError(f"TASK_PARTITIONING inválido: {STRATEGY!r} (none, hash o range)")
+    if STRATEGY == "hash":
+        _rebuild({"tasks": "hash", "task_tag": "hash"})
+    elif STRATEGY == "range":
+        _rebuild({"tasks": "range"})
+
+
+def downgrade() -> None:
+    """Vuelve a tablas sin particionar, sea cual sea la estrategia aplicada."""
+    conn = op.get_bind()
+    targets = {table: "none" for table in ("tasks", "task_tag") if _strategy(conn, table) != "none"}
+    if targets:
+        _rebuild(targets)
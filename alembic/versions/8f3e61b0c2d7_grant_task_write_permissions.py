@@ -0,0 +1,46 @@
+"""grant_task_write_permissions
+
+Revision ID: 8f3e61b0c2d7
+Revises: 5d2a9c7e1b34
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3e61b0c2d7'
+down_revision: Union[str, Sequence[str], None] = '5d2a9c7e1b34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Los permisos de tareas ahora se verifican: el rol user necesita update_task y delete_task."""
+    op.execute(
+        """
+        INSERT INTO permission_role (role_id, permission_id)
+        SELECT r.id, p.id
+        FROM roles r
+        CROSS JOIN permissions p
+        WHERE r.name = 'user'
+          AND p.name IN ('update_task', 'delete_task')
+        ON CONFLICT DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        """
+        DELETE FROM permission_role
+        USING roles r, permissions p
+        WHERE permission_role.role_id = r.id
+          AND permission_role.permission_id = p.id
+          AND r.name = 'user'
+          AND p.name IN ('update_task', 'delete_task')
+        """
+    )
@@ -0,0 +1,34 @@
+"""add_cache_versions
+
+Revision ID: 9c3f5b7a2d18
+Revises: 4a8d1e6f2c93
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3f5b7a2d18'
+down_revision: Union[str, Sequence[str], None] = '4a8d1e6f2c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Versiones globales de datos cacheados; la del catálogo de tags arranca en 0."""
+    op.create_table(
+        'cache_versions',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.execute("INSERT INTO cache_versions (name, version) VALUES ('tags', 0)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('cache_versions')
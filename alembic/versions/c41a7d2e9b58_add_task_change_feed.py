@@ -0,0 +1,50 @@
+"""add_task_change_feed
+
+Revision ID: c41a7d2e9b58
+Revises: 2b7c4e9a1f60
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41a7d2e9b58'
+down_revision: Union[str, Sequence[str], None] = '2b7c4e9a1f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Secuencia de cambios en tasks y tabla de tombstones para el feed incremental."""
+    op.execute(sa.schema.CreateSequence(sa.Sequence('task_change_seq')))
+    # El default volátil asigna un valor distinto a cada fila existente
+    op.add_column(
+        'tasks',
+        sa.Column('change_seq', sa.BigInteger(), server_default=sa.text("nextval('task_change_seq')"), nullable=False),
+    )
+    op.create_index('idx_task_user_id_change_seq', 'tasks', ['user_id', 'change_seq'], unique=False)
+
+    op.create_table('task_tombstones',
+    sa.Column('task_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('change_seq', sa.BigInteger(), server_default=sa.text("nextval('task_change_seq')"), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('task_id')
+    )
+    op.create_index('idx_task_tombstone_user_id_change_seq', 'task_tombstones', ['user_id', 'change_seq'], unique=False)
+    op.create_index(op.f('ix_task_tombstones_deleted_at'), 'task_tombstones', ['deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_task_tombstones_deleted_at'), table_name='task_tombstones')
+    op.drop_index('idx_task_tombstone_user_id_change_seq', table_name='task_tombstones')
+    op.drop_table('task_tombstones')
+    op.drop_index('idx_task_user_id_change_seq', table_name='tasks')
+    op.drop_column('tasks', 'change_seq')
+    op.execute(sa.schema.DropSequence(sa.Sequence('task_change_seq')))
@@ -0,0 +1,45 @@
+"""add_audit_events
+
+Revision ID: e7b93f1c4a20
+Revises: c41a7d2e9b58
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b93f1c4a20'
+down_revision: Union[str, Sequence[str], None] = 'c41a7d2e9b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Tabla de auditoría particionada por mes; las particiones mensuales las crea la aplicación."""
+    op.create_table('audit_events',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('occurred_at', sa.DateTime(), nullable=False),
+    sa.Column('actor_id', sa.String(length=100), nullable=True),
+    sa.Column('action', sa.String(length=50), nullable=False),
+    sa.Column('entity_type', sa.String(length=50), nullable=False),
+    sa.Column('entity_id', sa.String(length=100), nullable=False),
+    sa.Column('changes', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.PrimaryKeyConstraint('id', 'occurred_at'),
+    postgresql_partition_by='RANGE (occurred_at)'
+    )
+    op.create_index('idx_audit_event_entity', 'audit_events', ['entity_type', 'entity_id', 'occurred_at'], unique=False)
+    op.create_index('idx_audit_event_actor_id', 'audit_events', ['actor_id', 'occurred_at'], unique=False)
+    # Red de seguridad para eventos fuera de las particiones mensuales creadas
+    op.execute("CREATE TABLE audit_events_default PARTITION OF audit_events DEFAULT")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_audit_event_actor_id', table_name='audit_events')
+    op.drop_index('idx_audit_event_entity', table_name='audit_events')
+    op.drop_table('audit_events')
@@ -0,0 +1,57 @@
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+from benchmarks.core import benchmark
+from src.schemas.auth import LoginRequest
+from src.schemas.task import TaskCreate, TaskResponse
+
+
+TASK_PAYLOAD = {
+    "title": "Implementar autenticación",
+    "description": "Agregar JWT al proyecto",
+    "status": "pending",
+    "priority": "high",
+    "tag_names": ["backend", "urgente"],
+}
+
+LOGIN_PAYLOAD = {"email": "admin@test.com", "password": "Admin123*"}
+
+
+def fake_task(tag_count: int = 3) -> SimpleNamespace:
+    """Objeto con los atributos de un Task ORM, sin necesidad de base de datos."""
+    return SimpleNamespace(
+        id=uuid4(),
+        title="Tarea de benchmark",
+        description="Descripción de la tarea",
+        status="in_progress",
+        priority="medium",
+        user=SimpleNamespace(id=uuid4(), name="Bench User", username="bench"),
+        tags=[SimpleNamespace(id=uuid4(), name=f"tag-{i}") for i in range(tag_count)],
+        created_at=datetime.now(),
+        created_by=str(uuid4()),
+        updated_at=datetime.now(),
+        updated_by=str(uuid4()),
+    )
+
+
+@benchmark("schemas.TaskCreate.validate", group="schemas", number=10000)
+def bench_task_create(ctx):
+    return lambda: TaskCreate.model_validate(TASK_PAYLOAD)
+
+
+@benchmark("schemas.LoginRequest.validate", group="schemas", number=10000)
+def bench_login_request(ctx):
+    return lambda: LoginRequest.model_validate(LOGIN_PAYLOAD)
+
+
+@benchmark("schemas.TaskResponse.serialize", group="schemas", number=10000)
+def bench_task_response(ctx):
+    task = fake_task()
+    return lambda: TaskResponse.model_validate(task).model_dump_json()
+
+
+@benchmark("schemas.TaskResponse.serialize_page", group="schemas", number=500)
+def bench_task_response_page(ctx):
+    tasks = [fake_task() for _ in range(100)]
+    return lambda: [TaskResponse.model_validate(t).model_dump(mode="json") for t in tasks]
@@ -0,0 +1,35 @@
+from uuid import uuid4
+
+from benchmarks.core import benchmark
+from src.core.security import (
+    create_access_token,
+    verify_access_token,
+    hash_password,
+    verify_password,
+)
+
+
+PASSWORD = "Password123*"
+
+
+@benchmark("security.create_access_token", group="security")
+def bench_create_access_token(ctx):
+    user_id = uuid4()
+    return lambda: create_access_token(user_id)
+
+
+@benchmark("security.verify_access_token", group="security")
+def bench_verify_access_token(ctx):
+    token = create_access_token(uuid4())
+    return lambda: verify_access_token(token)
+
+
+@benchmark("security.hash_password", group="security", number=5, repeat=3)
+def bench_hash_password(ctx):
+    return lambda: hash_password(PASSWORD)
+
+
+@benchmark("security.verify_password", group="security", number=5, repeat=3)
+def bench_verify_password(ctx):
+    hashed = hash_password(PASSWORD)
+    return lambda: verify_password(PASSWORD, hashed)
@@ -0,0 +1,147 @@
+"""
+Benchmarks de los métodos de consulta de TaskService y UserService.
+
+Requieren un PostgreSQL local y desechable (`--db-url` o `BENCH_DB_URL`).
+Las tablas se crean si no existen y se siembran datos una sola vez.
+"""
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from benchmarks.core import benchmark
+from src.db.seed import seed_initial_data
+from src.models.role import Role
+from src.models.task import Task, TaskStatus, TaskPriority
+from src.models.user import User
+from src.services.task_service import TaskService
+from src.services.user_service import UserService
+
+
+BENCH_USERNAME = "bench_user"
+BENCH_TASKS = 1000
+BENCH_USERS = 200
+# Los benchmarks no autentican, no hace falta un hash Argon2 real
+PLACEHOLDER_PASSWORD = "benchmark-placeholder"
+
+
+def prepare_database(db: Session) -> dict:
+    """Siembra un usuario con BENCH_TASKS tareas y BENCH_USERS usuarios adicionales."""
+    seed_initial_data(db)
+    role = db.query(Role).filter(Role.name == "user").first()
+
+    user = db.query(User).filter(User.username == BENCH_USERNAME).first()
+    if not user:
+        user = User(
+            name="Bench User",
+            username=BENCH_USERNAME,
+            email="bench@test.com",
+            password=PLACEHOLDER_PASSWORD,
+            role_id=role.id,
+        )
+        db.add(user)
+        db.flush()
+
+        statuses = list(TaskStatus)
+        priorities = list(TaskPriority)
+        db.add_all([
+            Task(
+                title=f"Tarea {i}",
+                description="Tarea generada para benchmarks",
+                status=statuses[i % len(statuses)],
+                priority=priorities[i % len(priorities)],
+                user_id=user.id,
+                created_by=str(user.id),
+            )
+            for i in range(BENCH_TASKS)
+        ])
+        db.add_all([
+            User(
+                name=f"Bench {i}",
+                username=f"bench_{i}",
+                email=f"bench_{i}@test.com",
+                password=PLACEHOLDER_PASSWORD,
+                role_id=role.id,
+                is_active=i % 10 != 0,
+            )
+            for i in range(BENCH_USERS)
+        ])
+        db.commit()
+
+    task = db.query(Task).filter(Task.user_id == user.id).first()
+    return {"user": user, "task_id": task.id, "role": role}
+
+
+@benchmark("task_service.get_task_by_id", group="services", number=200, requires_db=True)
+def bench_get_task_by_id(ctx):
+    service = TaskService(ctx.db)
+    user_id, task_id = ctx.data["user"].id, ctx.data["task_id"]
+    return lambda: service.get_task_by_id(task_id, user_id)
+
+
+@benchmark("task_service.get_tasks_paginated", group="services", number=100, requires_db=True)
+def bench_get_tasks_paginated(ctx):
+    service = TaskService(ctx.db)
+    user_id = ctx.data["user"].id
+    return lambda: service.get_tasks_paginated(user_id=user_id, page=1, page_size=10)
+
+
+@benchmark("task_service.get_tasks_paginated.filtered", group="services", number=100, requires_db=True)
+def bench_get_tasks_paginated_filtered(ctx):
+    service = TaskService(ctx.db)
+    user_id = ctx.data["user"].id
+    return lambda: service.get_tasks_paginated(
+        user_id=user_id, page=3, page_size=20, status="pending", priority="high",
+    )
+
+
+@benchmark("task_service.get_tasks_page.cached", group="services", number=200, requires_db=True)
+def bench_get_tasks_page_cached(ctx):
+    service = TaskService(ctx.db)
+    user = ctx.data["user"]
+    service.get_tasks_page(user.id, user.task_list_version)
+    return lambda: service.get_tasks_page(user.id, user.task_list_version)
+
+
+@benchmark("user_service.get_user_by_id", group="services", number=200, requires_db=True)
+def bench_get_user_by_id(ctx):
+    service = UserService(ctx.db)
+    user_id = ctx.data["user"].id
+    return lambda: service.get_user_by_id(user_id)
+
+
+@benchmark("user_service.get_user_by_email", group="services", number=200, requires_db=True)
+def bench_get_user_by_email(ctx):
+    service = UserService(ctx.db)
+    return lambda: service.get_user_by_email("bench@test.com")
+
+
+@benchmark("user_service.get_user_by_username", group="services", number=200, requires_db=True)
+def bench_get_user_by_username(ctx):
+    service = UserService(ctx.db)
+    return lambda: service.get_user_by_username(BENCH_USERNAME)
+
+
+@benchmark("user_service.check_role_exists", group="services", number=200, requires_db=True)
+def bench_check_role_exists(ctx):
+    service = UserService(ctx.db)
+    role_id = ctx.data["role"].id
+    return lambda: service.check_role_exists(role_id)
+
+
+@benchmark("user_service.check_role_exists.missing", group="services", number=200, requires_db=True)
+def bench_check_role_missing(ctx):
+    service = UserService(ctx.db)
+    missing = uuid4()
+    return lambda: service.check_role_exists(missing)
+
+
+@benchmark("user_service.get_role_by_name", group="services", number=200, requires_db=True)
+def bench_get_role_by_name(ctx):
+    service = UserService(ctx.db)
+    return lambda: service.get_role_by_name("user")
+
+
+@benchmark("user_service.get_users_paginated", group="services", number=100, requires_db=True)
+def bench_get_users_paginated(ctx):
+    service = UserService(ctx.db)
+    return lambda: service.get_users_paginated(page=1, page_size=10, is_active=True)
@@ -0,0 +1,93 @@
+"""
+Utilidades comunes de la suite de micro-benchmarks.
+
+Cada benchmark se registra con el decorador `benchmark`. La función decorada
+recibe el contexto (`BenchContext`) y retorna el callable a medir; así la
+preparación (crear datos, tokens, payloads) queda fuera de la medición.
+"""
+import gc
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class Benchmark:
+    name: str
+    group: str
+    setup: Callable[["BenchContext"], Callable[[], Any]]
+    number: int
+    repeat: int
+    requires_db: bool = False
+
+
+@dataclass
+class BenchContext:
+    """Recursos compartidos entre benchmarks (sesión de BD, datos sembrados)."""
+    db: Any = None
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(
+    name: str,
+    group: str,
+    number: int = 1000,
+    repeat: int = 5,
+    requires_db: bool = False,
+):
+    """Registra un benchmark. `number` llamadas por ronda, `repeat` rondas."""
+    def decorator(setup: Callable[[BenchContext], Callable[[], Any]]):
+        BENCHMARKS.append(Benchmark(name, group, setup, number, repeat, requires_db))
+        return setup
+    return decorator
+
+
+def measure(fn: Callable[[], Any], number: int, repeat: int) -> Dict[str, float]:
+    """Mide `fn` y retorna estadísticas por llamada en microsegundos."""
+    fn()  # calentamiento
+
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        rounds = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            rounds.append((time.perf_counter() - start) / number * 1e6)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min_us": min(rounds),
+        "median_us": statistics.median(rounds),
+        "mean_us": statistics.fmean(rounds),
+        "stdev_us": statistics.stdev(rounds) if len(rounds) > 1 else 0.0,
+    }
+
+
+def compare(
+    baseline: Dict[str, Dict[str, float]],
+    current: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[Dict[str, Optional[float]]]:
+    """Compara medianas entre dos corridas. Marca regresión si supera `threshold` (0.10 = 10%)."""
+    rows = []
+    for name, result in current.items():
+        base = baseline.get(name)
+        ratio = result["median_us"] / base["median_us"] if base and base["median_us"] else None
+        rows.append({
+            "name": name,
+            "baseline_us": base["median_us"] if base else None,
+            "current_us": result["median_us"],
+            "ratio": ratio,
+            "regression": ratio is not None and ratio > 1 + threshold,
+        })
+    return rows
@@ -0,0 +1,376 @@
+"""
+Generador de carga end-to-end para una instancia de Taskify en ejecución.
+
+Inicia sesión con un pool de usuarios sembrados (por ejemplo con
+`python -m src.db.init_db synthetic`), reproduce una mezcla configurable de
+operaciones y reporta throughput, latencias p50/p95/p99 y errores por ruta.
+Los resultados se guardan en JSON junto al commit para comparar entre
+versiones.
+
+Uso (sin rate limiting en el servidor, para medir su capacidad):
+    RATE_LIMIT_ENABLED=false python -m src.serve --workers 4 --port 8000
+    python -m benchmarks.load --url http://localhost:8000 --profile mixed \\
+        --concurrency 64 --duration 60 --users 200
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+# Peso relativo de cada operación por perfil
+PROFILES: Dict[str, Dict[str, int]] = {
+    "mixed": {
+        "list_tasks": 35, "get_task": 25, "create_task": 12, "update_task": 10,
+        "delete_task": 5, "list_tags": 5, "tag_tasks": 5, "admin_list_users": 3,
+    },
+    "read_heavy": {
+        "list_tasks": 50, "get_task": 35, "list_tags": 8, "tag_tasks": 5, "admin_list_users": 2,
+    },
+    "write_heavy": {
+        "create_task": 40, "update_task": 35, "delete_task": 15, "list_tasks": 10,
+    },
+    "admin": {
+        "admin_list_users": 60, "list_tags": 20, "list_tasks": 20,
+    },
+}
+
+DEFAULT_PASSWORD = "Synthetic123*"
+ADMIN_CREDENTIALS = {"email": "admin@test.com", "password": "Admin123*"}
+TAG_NAMES = ("backend", "frontend", "urgente", "bug", "docs")
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+class HTTPConnection:
+    """Cliente HTTP/1.1 mínimo con keep-alive; evita que el generador sea el cuello de botella."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def _connect(self) -> None:
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+            self.writer = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[dict] = None,
+        token: Optional[str] = None,
+    ) -> Tuple[int, bytes]:
+        if self.writer is None:
+            await self._connect()
+
+        payload = json.dumps(body).encode() if body is not None else b""
+        headers = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Connection: keep-alive",
+            f"Content-Length: {len(payload)}",
+        ]
+        if body is not None:
+            headers.append("Content-Type: application/json")
+        if token:
+            headers.append(f"Authorization: Bearer {token}")
+        self.writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            await self.close()
+            raise ConnectionError("Conexión cerrada por el servidor")
+        status = int(status_line.split()[1])
+
+        length, chunked, close = 0, False, False
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name, value = name.strip().lower(), value.strip().lower()
+            if name == "content-length":
+                length = int(value)
+            elif name == "transfer-encoding" and "chunked" in value:
+                chunked = True
+            elif name == "connection" and value == "close":
+                close = True
+
+        if chunked:
+            data = bytearray()
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                data += await self.reader.readexactly(size)
+                await self.reader.readline()
+            content = bytes(data)
+        else:
+            content = await self.reader.readexactly(length) if length else b""
+
+        if close:
+            await self.close()
+        return status, content
+
+
+@dataclass
+class RouteStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    status_counts: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
+
+
+@dataclass
+class Session:
+    token: str
+    task_ids: List[str] = field(default_factory=list)
+
+
+class LoadRunner:
+    def __init__(self, args: argparse.Namespace):
+        parts = urlsplit(args.url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.args = args
+        self.weights = PROFILES[args.profile]
+        self.stats: Dict[str, RouteStats] = defaultdict(RouteStats)
+        self.sessions: List[Session] = []
+        self.admin_token: Optional[str] = None
+        self.deadline = 0.0
+        self.remaining = args.requests
+
+    async def login(self, conn: HTTPConnection, credentials: dict) -> Optional[str]:
+        try:
+            status, content = await conn.request("POST", f"{self.prefix}/auth/login", credentials)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError):
+            await conn.close()
+            return None
+        if status != 200:
+            return None
+        return json.loads(content)["access_token"]
+
+    async def prepare(self) -> None:
+        """Inicia sesión con el pool de usuarios (fuera de la medición)."""
+        conn = HTTPConnection(self.host, self.port)
+        try:
+            for i in range(self.args.users):
+                username = f"{self.args.username_prefix}{i:08d}"
+                token = await self.login(conn, {"username": username, "password": self.args.password})
+                if token:
+                    self.sessions.append(Session(token=token))
+            self.admin_token = await self.login(conn, ADMIN_CREDENTIALS)
+        finally:
+            await conn.close()
+        if not self.sessions:
+            raise SystemExit("No se pudo iniciar sesión con ningún usuario del pool")
+
+    def _take_request(self) -> bool:
+        if time.perf_counter() >= self.deadline:
+            return False
+        if self.remaining is None:
+            return True
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+    async def call(
+        self,
+        conn: HTTPConnection,
+        route: str,
+        method: str,
+        path: str,
+        token: Optional[str],
+        body: Optional[dict] = None,
+        expected: Tuple[int, ...] = (200,),
+    ) -> Optional[bytes]:
+        stats = self.stats[route]
+        start = time.perf_counter()
+        try:
+            status, content = await conn.request(method, f"{self.prefix}{path}", body, token)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            stats.latencies_ms.append((time.perf_counter() - start) * 1000)
+            stats.errors += 1
+            await conn.close()
+            return None
+        stats.latencies_ms.append((time.perf_counter() - start) * 1000)
+        stats.status_counts[status] += 1
+        if status not in expected:
+            stats.errors += 1
+            return None
+        return content
+
+    async def run_operation(self, op: str, conn: HTTPConnection, session: Session, rng: random.Random) -> None:
+        token = session.token
+        if op == "list_tasks":
+            content = await self.call(conn, "GET /tasks", "GET", "/tasks?page=1&page_size=10", token)
+            if content and not session.task_ids:
+                session.task_ids = [item["id"] for item in json.loads(content)["items"]]
+        elif op == "get_task":
+            if not session.task_ids:
+                return await self.run_operation("list_tasks", conn, session, rng)
+            task_id = rng.choice(session.task_ids)
+            await self.call(conn, "GET /tasks/{id}", "GET", f"/tasks/{task_id}", token)
+        elif op == "create_task":
+            body = {
+                "title": f"Carga {rng.getrandbits(32):08x}",
+                "description": "Tarea creada por el generador de carga",
+                "priority": rng.choice(("low", "medium", "high")),
+                "tag_names": rng.sample(TAG_NAMES, rng.randint(0, 2)),
+            }
+            content = await self.call(conn, "POST /tasks", "POST", "/tasks", token, body, expected=(201,))
+            if content:
+                session.task_ids.append(json.loads(content)["id"])
+        elif op == "update_task":
+            if not session.task_ids:
+                return await self.run_operation("create_task", conn, session, rng)
+            task_id = rng.choice(session.task_ids)
+            body = {"status": rng.choice(("pending", "in_progress", "completed"))}
+            await self.call(conn, "PATCH /tasks/{id}", "PATCH", f"/tasks/{task_id}", token, body, expected=(200, 404))
+        elif op == "delete_task":
+            if not session.task_ids:
+                return await self.run_operation("create_task", conn, session, rng)
+            task_id = session.task_ids.pop(rng.randrange(len(session.task_ids)))
+            await self.call(conn, "DELETE /tasks/{id}", "DELETE", f"/tasks/{task_id}", token, expected=(200, 404))
+        elif op == "list_tags":
+            await self.call(conn, "GET /tags", "GET", "/tags", token)
+        elif op == "tag_tasks":
+            tag = rng.choice(TAG_NAMES)
+            await self.call(conn, "GET /tags/{name}/tasks", "GET", f"/tags/{tag}/tasks", token, expected=(200, 404))
+        elif op == "admin_list_users":
+            if self.admin_token:
+                await self.call(conn, "GET /users", "GET", "/users?page=1&page_size=10", self.admin_token)
+
+    async def worker(self, index: int) -> None:
+        rng = random.Random(self.args.seed * 1_000_003 + index)
+        ops, weights = zip(*self.weights.items())
+        conn = HTTPConnection(self.host, self.port)
+        try:
+            while self._take_request():
+                session = self.sessions[rng.randrange(len(self.sessions))]
+                op = rng.choices(ops, weights=weights)[0]
+                await self.run_operation(op, conn, session, rng)
+        finally:
+            await conn.close()
+
+    async def run(self) -> float:
+        await self.prepare()
+        started = time.perf_counter()
+        self.deadline = started + self.args.duration
+        await asyncio.gather(*(self.worker(i) for i in range(self.args.concurrency)))
+        return time.perf_counter() - started
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(stats: RouteStats, elapsed: float) -> dict:
+    values = sorted(stats.latencies_ms)
+    count = len(values)
+    return {
+        "requests": count,
+        "errors": stats.errors,
+        "error_rate": stats.errors / count if count else 0.0,
+        "throughput_rps": count / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(values) if values else 0.0,
+        "p50_ms": percentile(values, 50),
+        "p95_ms": percentile(values, 95),
+        "p99_ms": percentile(values, 99),
+        "max_ms": values[-1] if values else 0.0,
+        "status_counts": {str(k): v for k, v in sorted(stats.status_counts.items())},
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000", help="URL base de la API")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="mixed", help="Mezcla de operaciones")
+    parser.add_argument("--concurrency", type=int, default=32, help="Conexiones concurrentes")
+    parser.add_argument("--duration", type=float, default=30.0, help="Duración máxima en segundos")
+    parser.add_argument("--requests", type=int, default=None, help="Número total de requests (opcional)")
+    parser.add_argument("--users", type=int, default=100, help="Usuarios del pool que inician sesión")
+    parser.add_argument("--username-prefix", default="user_", help="Prefijo de los usuarios sembrados")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Contraseña de los usuarios sembrados")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla de la mezcla de operaciones")
+    parser.add_argument("--output", type=Path, default=None, help="JSON de salida (default: benchmarks/results/load-<commit>-<perfil>.json)")
+    args = parser.parse_args()
+
+    runner = LoadRunner(args)
+    elapsed = asyncio.run(runner.run())
+
+    routes = {route: summarize(stats, elapsed) for route, stats in sorted(runner.stats.items())}
+    total = RouteStats()
+    for stats in runner.stats.values():
+        total.latencies_ms.extend(stats.latencies_ms)
+        total.errors += stats.errors
+    overall = summarize(total, elapsed)
+
+    print(f"{'ruta':<26}{'reqs':>8}{'rps':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'err%':>8}")
+    for route, row in list(routes.items()) + [("TOTAL", overall)]:
+        print(
+            f"{route:<26}{row['requests']:>8}{row['throughput_rps']:>10.1f}"
+            f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+            f"{row['error_rate'] * 100:>7.2f}%"
+        )
+
+    revision = git_revision()
+    report = {
+        "commit": revision,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "profile": args.profile,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "requests": args.requests,
+            "users": len(runner.sessions),
+            "seed": args.seed,
+        },
+        "elapsed_s": elapsed,
+        "overall": overall,
+        "routes": routes,
+    }
+    output = args.output or RESULTS_DIR / f"load-{revision}-{args.profile}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResultados guardados en {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
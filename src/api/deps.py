@@ -1,13 +1,15 @@
 from typing import Annotated, Optional
 from uuid import UUID
 
-from fastapi import Depends, HTTPException, status, Request
+from fastapi import Depends, Header, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from src.db.session import get_db
 from src.models.user import User
 from src.core.security import verify_access_token
+from src.core.tracing import traced
+from src.services.permission_matrix import get_permission_matrix
 
 
 class CustomHTTPBearer(HTTPBearer):
@@ -28,11 +30,18 @@ class CustomHTTPBearer(HTTPBearer):
 security = CustomHTTPBearer()
 
 
+@traced("deps.get_current_user")
 def get_current_user(
+    request: Request,
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
     db: Session = Depends(get_db),
 ) -> User:
     """Dependencia para obtener el usuario actual desde el token JWT."""
+    # Sub-peticiones de POST /batch: el lote ya autenticó al usuario
+    batch_user = getattr(request.state, "batch_user", None)
+    if batch_user is not None:
+        return batch_user
+
     token = credentials.credentials
     
     user_id = verify_access_token(token)
@@ -63,11 +72,12 @@ def get_current_user(
     return user
 
 
+@traced("deps.get_admin_user")
 def get_admin_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
     """Dependencia para verificar que el usuario tiene rol admin."""
-    if current_user.role.name != "admin":
+    if get_permission_matrix().get_role_name(current_user.role_id) != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="No tienes permisos para realizar esta acción. Se requiere rol de administrador.",
@@ -75,5 +85,62 @@ def get_admin_user(
     return current_user
 
 
+def require_permission(permission_name: str):
+    """
+    Crea una dependencia que exige un permiso al usuario actual.
+
+    La verificación usa la matriz rol -> permisos en memoria, sin consultar
+    la base de datos en cada request.
+    """
+    @traced(f"deps.require_permission:{permission_name}")
+    def dependency(
+        current_user: User = Depends(get_current_user),
+    ) -> User:
+        if not get_permission_matrix().has_permission(current_user.role_id, permission_name):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"No tienes permisos para realizar esta acción. Se requiere el permiso '{permission_name}'.",
+            )
+        return current_user
+
+    return dependency
+
+
+@traced("deps.get_if_match_version")
+def get_if_match_version(
+    if_match: Optional[str] = Header(None, description="Versión esperada del recurso (ETag)"),
+) -> Optional[int]:
+    """Dependencia que interpreta el header If-Match como versión esperada."""
+    if if_match is None or if_match.strip() == "*":
+        return None
+
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Header If-Match inválido. Use la versión del recurso, por ejemplo: If-Match: \"3\"",
+        )
+
+
+def etag_for(version: int) -> str:
+    """ETag que se envía al cliente para una versión de recurso."""
+    return f'"{version}"'
+
+
+# Solo documenta el header: lo procesa la ruta (ver `src.api.idempotency`)
+IdempotencyKeyHeader = Annotated[
+    Optional[str],
+    Header(
+        alias="Idempotency-Key",
+        description="Clave única del request: un reintento con la misma clave no se vuelve a ejecutar",
+    ),
+]
+
+
 CurrentUser = Annotated[User, Depends(get_current_user)]
 AdminUser = Annotated[User, Depends(get_admin_user)]
+IfMatchVersion = Annotated[Optional[int], Depends(get_if_match_version)]
@@ -0,0 +1,150 @@
+"""
+Header `Idempotency-Key` en los endpoints marcados con `@idempotent`
+(`POST /tasks`, `POST /batch`).
+
+La primera respuesta exitosa a un request con clave se guarda por
+(usuario, clave) durante `IDEMPOTENCY_KEY_TTL_SECONDS`. Un reintento con la
+misma clave recibe esa respuesta sin volver a ejecutar el endpoint, con el
+header `Idempotent-Replayed: true`. Un duplicado que llega mientras el
+original se ejecuta espera su respuesta hasta `IDEMPOTENCY_WAIT_SECONDS`.
+Si el original sigue en curso al vencer esa espera, el duplicado recibe 409.
+Reusar una clave con otro método, ruta o cuerpo responde 422. Si el request
+original termina con error, la clave se libera y el reintento se ejecuta.
+"""
+import asyncio
+import hashlib
+import secrets
+import time
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+
+from fastapi import Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+
+from src.core.config import get_settings
+from src.core.security import verify_access_token
+from src.db.session import SessionLocal
+from src.models.idempotency_key import IdempotencyKey
+from src.services.idempotency import get_idempotency_service
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+# Headers de la respuesta original que se repiten al reproducirla
+STORED_HEADERS = ("content-type", "etag", "location")
+
+
+def idempotent(endpoint: Callable) -> Callable:
+    """Marca un endpoint para que su ruta procese el header `Idempotency-Key`."""
+    endpoint.idempotent = True
+    return endpoint
+
+
+def _fingerprint(request: Request, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (request.method, request.url.path, request.url.query):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _request_user_id(request: Request) -> Optional[UUID]:
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    user_id = verify_access_token(token)
+    try:
+        return UUID(user_id) if user_id is not None else None
+    except ValueError:
+        return None
+
+
+def _with_service(method: str, *args):
+    db = SessionLocal()
+    try:
+        return getattr(get_idempotency_service(db), method)(*args)
+    finally:
+        db.close()
+
+
+def _replay(record: IdempotencyKey) -> Response:
+    headers = dict(record.response_headers or {})
+    headers[REPLAYED_HEADER] = "true"
+    return Response(content=record.response_body, status_code=record.status_code, headers=headers)
+
+
+async def _acquire(user_id: UUID, key: str, fingerprint: str, token: str) -> Optional[Response]:
+    """
+    Reserva la clave con `token` (retorna None) o retorna la respuesta para
+    el duplicado: la guardada, 422 si la clave es de otro request o 409 si el
+    original sigue en curso tras la espera.
+    """
+    deadline = time.monotonic() + get_settings().IDEMPOTENCY_WAIT_SECONDS
+    delay = 0.05
+    while True:
+        record = await run_in_threadpool(_with_service, "claim", user_id, key, fingerprint, token)
+        if record is None:
+            return None
+        if record.fingerprint != fingerprint:
+            return JSONResponse(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                content={"detail": "La Idempotency-Key ya se usó con otro request"},
+            )
+        if record.status_code is not None:
+            return _replay(record)
+        if time.monotonic() >= deadline:
+            return JSONResponse(
+                status_code=status.HTTP_409_CONFLICT,
+                content={"detail": "Hay un request con la misma Idempotency-Key en curso; reintente más tarde"},
+                headers={"Retry-After": "1"},
+            )
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.5)
+
+
+def idempotent_handler(
+    handler: Callable[[Request], Awaitable[Response]],
+) -> Callable[[Request], Awaitable[Response]]:
+    """Envuelve el handler de una ruta `@idempotent`."""
+
+    async def handle(request: Request) -> Response:
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        # Sub-peticiones de POST /batch: la clave, si la hay, es la del lote
+        if key is None or getattr(request.state, "batch_db", None) is not None:
+            return await handler(request)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"detail": f"Idempotency-Key inválida: de 1 a {MAX_KEY_LENGTH} caracteres"},
+            )
+        user_id = _request_user_id(request)
+        if user_id is None:
+            # Sin credenciales válidas: el endpoint responde 401
+            return await handler(request)
+
+        fingerprint = _fingerprint(request, await request.body())
+        token = secrets.token_hex(16)
+        duplicate = await _acquire(user_id, key, fingerprint, token)
+        if duplicate is not None:
+            return duplicate
+
+        response: Optional[Response] = None
+        try:
+            response = await handler(request)
+        finally:
+            body = getattr(response, "body", None)
+            if response is None or response.status_code >= 400 or body is None:
+                await run_in_threadpool(_with_service, "release", user_id, key, token)
+            else:
+                headers = {
+                    name: response.headers[name] for name in STORED_HEADERS if name in response.headers
+                }
+                await run_in_threadpool(
+                    _with_service, "complete", user_id, key, token, response.status_code, headers, bytes(body)
+                )
+        return response
+
+    return handle
@@ -1,13 +1,32 @@
+from importlib import import_module
+from typing import Iterable, Optional
+
 from fastapi import APIRouter
 
-from src.api.routes import auth, task, user, tag, permission, role
 
+# Nombre lógico del router -> módulo que lo define. Los módulos se importan
+# solo cuando el router está habilitado.
+ROUTE_MODULES = {
+    "auth": "src.api.routes.auth",
+    "task": "src.api.routes.task",
+    "user": "src.api.routes.user",
+    "tag": "src.api.routes.tag",
+    "permission": "src.api.routes.permission",
+    "role": "src.api.routes.role",
+    "batch": "src.api.routes.batch",
+}
+
+
+def build_api_router(enabled: Optional[Iterable[str]] = None) -> APIRouter:
+    """Construye el router principal importando solo los routers habilitados."""
+    names = list(ROUTE_MODULES) if enabled is None else list(enabled)
 
-api_router = APIRouter()
+    unknown = [name for name in names if name not in ROUTE_MODULES]
+    if unknown:
+        raise ValueError(f"Routers desconocidos: {', '.join(unknown)}")
 
-api_router.include_router(auth.router)
-api_router.include_router(task.router)
-api_router.include_router(user.router)
-api_router.include_router(tag.router)
-api_router.include_router(permission.router)
-api_router.include_router(role.router)
+    api_router = APIRouter()
+    for name in names:
+        module = import_module(ROUTE_MODULES[name])
+        api_router.include_router(module.router)
+    return api_router
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
+from src.api.routing import TracedRoute
 from src.db.session import get_db
 from src.schemas.auth import LoginRequest, TokenResponse
 from src.services.auth_service import get_auth_service
@@ -11,7 +12,7 @@ from src.models.role import Role
 from src.models.permission import Permission
 
 
-router = APIRouter(prefix="/auth", tags=["Autenticación"])
+router = APIRouter(prefix="/auth", tags=["Autenticación"], route_class=TracedRoute)
 
 
 @router.post(
@@ -0,0 +1,180 @@
+import json
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from src.api.routing import TracedRoute
+from src.api.deps import CurrentUser, IdempotencyKeyHeader
+from src.api.idempotency import idempotent
+from src.core.config import get_settings
+from src.db.session import SessionLocal, get_db, hold_after_commit, release_after_commit
+from src.models.user import User
+from src.schemas.batch import BatchRequest, BatchResponse, SubRequest, SubResponse
+
+
+router = APIRouter(prefix="/batch", tags=["Lotes"], route_class=TracedRoute)
+
+# El propio lote y el stream SSE (que no termina) no pueden ir dentro de un lote
+EXCLUDED_PATHS = ("/batch", "/tasks/events")
+
+
+def _is_excluded(path: str) -> bool:
+    return any(path == excluded or path.startswith(excluded + "/") for excluded in EXCLUDED_PATHS)
+
+
+async def _dispatch(request: Request, sub_request: SubRequest, user: User, db: Session) -> SubResponse:
+    """
+    Ejecuta una sub-petición contra la propia aplicación, sin red. El usuario
+    y la sesión viajan en el `state` del scope: `get_current_user` y `get_db`
+    los reutilizan en lugar de decodificar el JWT y abrir otra sesión.
+    """
+    url = urlsplit(sub_request.path)
+    body = b"" if sub_request.body is None else json.dumps(sub_request.body).encode()
+    headers = [(b"authorization", request.headers["authorization"].encode())]
+    if "host" in request.headers:
+        headers.append((b"host", request.headers["host"].encode()))
+    if body:
+        headers.append((b"content-type", b"application/json"))
+    headers += [(name.lower().encode(), value.encode()) for name, value in sub_request.headers.items()]
+
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": "1.1",
+        "method": sub_request.method,
+        "scheme": request.url.scheme,
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "root_path": request.scope.get("root_path", ""),
+        "query_string": url.query.encode(),
+        "headers": headers,
+        "client": request.scope.get("client"),
+        "server": request.scope.get("server"),
+        "state": {**request.scope.get("state", {}), "batch_user": user, "batch_db": db},
+    }
+
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if body_sent:
+            return {"type": "http.disconnect"}
+        body_sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    start: dict = {}
+    chunks = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            start.update(message)
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # ServerErrorMiddleware ya respondió 500 y relanza la excepción
+        if not start:
+            return SubResponse(status=500, body={"detail": "Error interno del servidor"})
+
+    response_headers = {
+        name.decode(): value.decode()
+        for name, value in start.get("headers", [])
+        if name.lower() != b"content-length"
+    }
+    raw = b"".join(chunks)
+    if not raw:
+        content = None
+    elif response_headers.get("content-type", "").startswith("application/json"):
+        content = json.loads(raw)
+    else:
+        content = raw.decode(errors="replace")
+    return SubResponse(status=start["status"], headers=response_headers, body=content)
+
+
+@router.post(
+    "",
+    response_model=BatchResponse,
+    summary="Ejecutar un lote de peticiones",
+    description="Ejecuta varias peticiones a la API en un solo round trip, con una sola autenticación.",
+)
+@idempotent
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    current_user: CurrentUser,
+    idempotency_key: IdempotencyKeyHeader = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Ejecuta las sub-peticiones en orden y retorna sus respuestas en el mismo orden.
+
+    - **requests**: Lista de `{method, path, body, headers}` contra las rutas existentes
+    - **atomic**: Si es true, todas se ejecutan en una transacción. Si una
+      responde con error, el lote se revierte (`rolled_back: true`) y las
+      siguientes no se ejecutan (status 424).
+
+    Los permisos se verifican en cada sub-petición como si fuera independiente.
+    El header **Idempotency-Key** aplica al lote completo; en las
+    sub-peticiones se ignora.
+    """
+    max_requests = get_settings().BATCH_MAX_REQUESTS
+    if len(batch.requests) > max_requests:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Un lote admite como máximo {max_requests} peticiones",
+        )
+    for sub_request in batch.requests:
+        path = urlsplit(sub_request.path).path
+        if not path.startswith("/") or _is_excluded(path):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Ruta no permitida en un lote: {sub_request.path}",
+            )
+
+    if not batch.atomic:
+        # Sesión compartida; cada sub-petición hace commit por su cuenta
+        responses = [await _dispatch(request, sub_request, current_user, db) for sub_request in batch.requests]
+        return BatchResponse(responses=responses)
+
+    def begin():
+        # Sesión unida a la transacción de `db`: los commit de los servicios
+        # solo liberan un savepoint y el lote decide al final
+        session = SessionLocal(bind=db.connection(), join_transaction_mode="create_savepoint")
+        hold_after_commit(session)
+        return session, session.get(User, current_user.id)
+
+    def finish(session: Session, commit: bool):
+        try:
+            if commit:
+                db.commit()
+            else:
+                db.rollback()
+            # Eventos y auditoría solo si el lote hizo commit
+            release_after_commit(session, run=commit)
+        finally:
+            session.close()
+
+    session, user = await run_in_threadpool(begin)
+    responses = []
+    failed = False
+    commit = False
+    try:
+        for sub_request in batch.requests:
+            if failed:
+                responses.append(SubResponse(
+                    status=status.HTTP_424_FAILED_DEPENDENCY,
+                    body={"detail": "No ejecutada: el lote se revirtió por una petición anterior"},
+                ))
+                continue
+            response = await _dispatch(request, sub_request, user, session)
+            responses.append(response)
+            failed = response.status >= 400
+        commit = not failed
+    finally:
+        await run_in_threadpool(finish, session, commit)
+
+    return BatchResponse(responses=responses, rolled_back=failed)
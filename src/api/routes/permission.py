@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
+from src.api.routing import TracedRoute
 from src.db.session import get_db
 from src.api.deps import AdminUser
 from src.schemas.permission import (
@@ -11,7 +12,7 @@ from src.schemas.permission import (
 from src.services.permission_service import get_permission_service
 
 
-router = APIRouter(prefix="/permissions", tags=["Permisos"])
+router = APIRouter(prefix="/permissions", tags=["Permisos"], route_class=TracedRoute)
 
 
 @router.post(
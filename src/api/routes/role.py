@@ -4,6 +4,7 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 
+from src.api.routing import TracedRoute
 from src.db.session import get_db
 from src.api.deps import AdminUser
 from src.schemas.role import (
@@ -15,11 +16,23 @@ from src.schemas.role import (
 )
 from src.schemas.user import UserListResponse
 from src.services.role_service import get_role_service
-from src.services.permission_service import get_permission_service
 from src.services.user_service import get_user_service
 
 
-router = APIRouter(prefix="/roles", tags=["Roles"])
+router = APIRouter(prefix="/roles", tags=["Roles"], route_class=TracedRoute)
+
+
+def _with_member_counts(roles, counts) -> list:
+    """Serializa roles agregando los conteos de usuarios ya calculados."""
+    items = []
+    for role in roles:
+        user_count, active_user_count = counts.get(role.id, (0, 0))
+        items.append(
+            RoleWithPermissionsResponse.model_validate(role).model_copy(
+                update={"user_count": user_count, "active_user_count": active_user_count}
+            )
+        )
+    return items
 
 
 @router.post(
@@ -69,9 +82,10 @@ def list_roles(
     """
     role_service = get_role_service(db)
     roles = role_service.get_all_roles()
+    counts = role_service.get_member_counts()
     
     return RoleListResponse(
-        items=roles,
+        items=_with_member_counts(roles, counts),
         total=len(roles),
     )
 
@@ -99,7 +113,8 @@ def get_role_with_permissions(
             detail="Rol no encontrado",
         )
     
-    return role
+    counts = role_service.get_member_counts([role.id])
+    return _with_member_counts([role], counts)[0]
 
 
 @router.patch(
@@ -123,7 +138,6 @@ def update_role_permissions(
     Se pueden enviar ambos campos o solo uno de ellos.
     """
     role_service = get_role_service(db)
-    permission_service = get_permission_service(db)
     
     # Validar que al menos se proporcione una acción
     if not permissions_data.add and not permissions_data.remove:
@@ -132,58 +146,27 @@ def update_role_permissions(
             detail="Debe proporcionar al menos permisos para agregar o quitar",
         )
     
-    # Verificar que el rol existe
-    role = role_service.get_role_by_id(role_id)
-    if not role:
+    updated_role, error_message = role_service.update_role_permissions(
+        role_id,
+        add=permissions_data.add,
+        remove=permissions_data.remove,
+        updated_by=admin_user.id,
+    )
+    
+    if error_message:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=error_message,
+        )
+    
+    if not updated_role:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Rol no encontrado",
         )
     
-    # Obtener permisos actuales del rol
-    current_permission_names = {p.name for p in role.permissions}
-    
-    # Validar permisos a agregar
-    if permissions_data.add:
-        permissions_to_add = permission_service.get_permissions_by_names(permissions_data.add)
-        found_add_names = {p.name for p in permissions_to_add}
-        missing_add = set(permissions_data.add) - found_add_names
-        if missing_add:
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail=f"Los siguientes permisos no existen: {', '.join(sorted(missing_add))}",
-            )
-    
-    # Validar permisos a quitar
-    if permissions_data.remove:
-        permissions_to_remove = permission_service.get_permissions_by_names(permissions_data.remove)
-        found_remove_names = {p.name for p in permissions_to_remove}
-        missing_remove = set(permissions_data.remove) - found_remove_names
-        if missing_remove:
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail=f"Los siguientes permisos no existen: {', '.join(sorted(missing_remove))}",
-            )
-        
-        # Verificar que los permisos a quitar están asignados al rol
-        not_assigned = set(permissions_data.remove) - current_permission_names
-        if not_assigned:
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail=f"Los siguientes permisos no están asignados al rol: {', '.join(sorted(not_assigned))}",
-            )
-    
-    # Calcular nuevos permisos
-    new_permission_names = current_permission_names.copy()
-    new_permission_names.update(permissions_data.add)
-    new_permission_names -= set(permissions_data.remove)
-    
-    # Obtener objetos de permisos finales
-    final_permissions = permission_service.get_permissions_by_names(list(new_permission_names))
-    
-    # Actualizar permisos
-    updated_role = role_service.assign_permissions_to_role(role_id, final_permissions, admin_user.id)
-    return updated_role
+    counts = role_service.get_member_counts([updated_role.id])
+    return _with_member_counts([updated_role], counts)[0]
 
 
 @router.get(
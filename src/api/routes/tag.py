@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
+from src.api.routing import TracedRoute
 from src.db.session import get_db
 from src.api.deps import CurrentUser, AdminUser
 from src.schemas.tag import TagCreate, TagResponse, TagListResponse
@@ -13,7 +16,7 @@ from src.models.role import Role
 from src.models.permission import Permission
 
 
-router = APIRouter(prefix="/tags", tags=["Tags"])
+router = APIRouter(prefix="/tags", tags=["Tags"], route_class=TracedRoute)
 
 
 @router.post(
@@ -50,17 +53,24 @@ def create_tag(
     "",
     response_model=TagListResponse,
     summary="Listar tags",
-    description="Obtiene todos los tags disponibles.",
+    description="Obtiene los tags disponibles ordenados por nombre, paginados por cursor.",
 )
 def list_tags(
     current_user: CurrentUser,
     db: Session = Depends(get_db),
+    after: Optional[str] = Query(None, description="Cursor: nombre del último tag de la página anterior"),
+    limit: int = Query(100, ge=1, le=1000, description="Tamaño de página"),
 ):
-    """Lista todos los tags."""
+    """
+    Lista los tags por nombre.
+    
+    - **after**: `next_cursor` de la respuesta anterior (omitir en la primera página)
+    - **limit**: Cantidad de tags por página (default: 100, max: 1000)
+    """
     tag_service = get_tag_service(db)
-    tags, total = tag_service.get_all_tags()
+    tags, total, next_cursor = tag_service.get_tags_page(after, limit)
     
-    return TagListResponse(items=tags, total=total)
+    return TagListResponse(items=tags, total=total, next_cursor=next_cursor)
 
 
 @router.get(
@@ -1,21 +1,39 @@
-from typing import Optional
+import time
+from datetime import datetime
+from typing import Annotated, List, Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from src.core.config import get_settings
+from src.api.routing import TracedRoute
 from src.db.session import get_db
-from src.api.deps import CurrentUser
+from src.api.deps import IdempotencyKeyHeader, IfMatchVersion, etag_for, require_permission
+from src.api.idempotency import idempotent
+from src.models.user import User
 from src.schemas.task import (
     TaskCreate,
     TaskUpdate,
     TaskResponse,
     TaskListResponse,
+    TaskChangesResponse,
+    TaskBatchRequest,
+    TaskBatchResponse,
 )
-from src.services.task_service import get_task_service
+from src.services.task_service import get_task_service, to_naive_utc
+from src.services.exceptions import VersionConflictError
+from src.services.task_events import stream_task_events
 
 
-router = APIRouter(prefix="/tasks", tags=["Tareas"])
+router = APIRouter(prefix="/tasks", tags=["Tareas"], route_class=TracedRoute)
+
+ViewTaskUser = Annotated[User, Depends(require_permission("view_task"))]
+CreateTaskUser = Annotated[User, Depends(require_permission("create_task"))]
+UpdateTaskUser = Annotated[User, Depends(require_permission("update_task"))]
+DeleteTaskUser = Annotated[User, Depends(require_permission("delete_task"))]
 
 
 @router.post(
@@ -25,9 +43,11 @@ router = APIRouter(prefix="/tasks", tags=["Tareas"])
     summary="Crear tarea",
     description="Crea una nueva tarea para el usuario autenticado.",
 )
+@idempotent
 def create_task(
     task_data: TaskCreate,
-    current_user: CurrentUser,
+    current_user: CreateTaskUser,
+    idempotency_key: IdempotencyKeyHeader = None,
     db: Session = Depends(get_db),
 ):
     """
@@ -38,6 +58,8 @@ def create_task(
     - **status**: Estado de la tarea (pending, in_progress, completed)
     - **priority**: Prioridad de la tarea (low, medium, high)
     - **tag_ids**: Lista de IDs de tags (opcional)
+    - **Idempotency-Key** (header, opcional): un reintento con la misma clave
+      devuelve la tarea ya creada en lugar de crear otra
     """
     task_service = get_task_service(db)
     task = task_service.create_task(task_data, current_user.id)
@@ -51,12 +73,20 @@ def create_task(
     description="Obtiene las tareas del usuario autenticado con paginación.",
 )
 def list_tasks(
-    current_user: CurrentUser,
+    current_user: ViewTaskUser,
     db: Session = Depends(get_db),
     page: int = Query(1, ge=1, description="Número de página"),
     page_size: int = Query(10, ge=1, le=100, description="Tamaño de página"),
     task_status: Optional[str] = Query(None, alias="status", description="Filtrar por estado"),
     task_priority: Optional[str] = Query(None, alias="priority", description="Filtrar por prioridad"),
+    created_after: Optional[datetime] = Query(None, description="Creadas desde (inclusive)"),
+    created_before: Optional[datetime] = Query(None, description="Creadas antes de (exclusive)"),
+    updated_since: Optional[datetime] = Query(None, description="Modificadas (o creadas) desde"),
+    sort: Literal["created_at", "updated_at", "priority", "status"] = Query(
+        "created_at", description="Criterio de orden"
+    ),
+    order: Literal["asc", "desc"] = Query("desc", description="Dirección del orden"),
+    include_archived: bool = Query(False, description="Incluir las tareas archivadas"),
 ):
     """
     Lista las tareas del usuario con paginación.
@@ -65,6 +95,11 @@ def list_tasks(
     - **page_size**: Cantidad de items por página (default: 10, max: 100)
     - **status**: Filtrar por estado (pending, in_progress, completed)
     - **priority**: Filtrar por prioridad (low, medium, high)
+    - **created_after** / **created_before**: Rango de fecha de creación (ISO 8601)
+    - **updated_since**: Tareas modificadas desde esa fecha (las nunca modificadas cuentan desde su creación)
+    - **sort**: created_at, updated_at, priority (low < medium < high) o status (pending < in_progress < completed)
+    - **order**: desc (default) o asc; priority y status desempatan por fecha de creación en la misma dirección
+    - **include_archived**: Incluir las tareas completadas ya archivadas (traen `archived_at`)
     """
     # Validar status si se proporciona
     valid_statuses = ["pending", "in_progress", "completed"]
@@ -82,14 +117,31 @@ def list_tasks(
             detail=f"Prioridad inválida. Valores permitidos: {', '.join(valid_priorities)}",
         )
     
+    if (
+        created_after is not None
+        and created_before is not None
+        and to_naive_utc(created_after) > to_naive_utc(created_before)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="created_after no puede ser posterior a created_before",
+        )
+    
     task_service = get_task_service(db)
     
-    tasks, total = task_service.get_tasks_paginated(
+    tasks, total = task_service.get_tasks_page(
         user_id=current_user.id,
+        list_version=current_user.task_list_version,
         page=page,
         page_size=page_size,
         status=task_status,
         priority=task_priority,
+        created_after=created_after,
+        created_before=created_before,
+        updated_since=updated_since,
+        sort=sort,
+        descending=order == "desc",
+        include_archived=include_archived,
     )
     
     total_pages = task_service.calculate_total_pages(total, page_size)
@@ -103,6 +155,151 @@ def list_tasks(
     )
 
 
+def _get_task_batch(task_ids: List[UUID], current_user: User, db: Session) -> TaskBatchResponse:
+    max_ids = get_settings().TASK_BATCH_MAX_IDS
+    if len(task_ids) > max_ids:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Se pueden pedir como máximo {max_ids} tareas por petición",
+        )
+    tasks, missing = get_task_service(db).get_tasks_by_ids(task_ids, current_user.id)
+    return TaskBatchResponse(items=tasks, missing=missing)
+
+
+@router.get(
+    "/batch",
+    response_model=TaskBatchResponse,
+    summary="Obtener varias tareas",
+    description="Obtiene varias tareas del usuario por id en una sola petición.",
+)
+def get_tasks_batch(
+    current_user: ViewTaskUser,
+    db: Session = Depends(get_db),
+    ids: List[str] = Query(..., description="IDs separados por comas o el parámetro repetido"),
+):
+    """
+    Obtiene las tareas pedidas que pertenecen al usuario.
+
+    - **ids**: `?ids=a,b,c` o `?ids=a&ids=b`. Para listas largas usar `POST /tasks/batch`.
+
+    Los ids inexistentes o de otros usuarios se devuelven en **missing**.
+    """
+    try:
+        task_ids = [UUID(value) for raw in ids for value in raw.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="IDs de tarea inválidos",
+        )
+    if not task_ids:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Debe indicar al menos un ID de tarea",
+        )
+    return _get_task_batch(task_ids, current_user, db)
+
+
+@router.post(
+    "/batch",
+    response_model=TaskBatchResponse,
+    summary="Obtener varias tareas (cuerpo JSON)",
+    description="Igual que `GET /tasks/batch`, con los ids en el cuerpo para listas largas.",
+)
+def post_tasks_batch(
+    batch: TaskBatchRequest,
+    current_user: ViewTaskUser,
+    db: Session = Depends(get_db),
+):
+    """Obtiene las tareas cuyos ids vienen en **ids**; los ausentes van en **missing**."""
+    return _get_task_batch(batch.ids, current_user, db)
+
+
+@router.get(
+    "/changes",
+    response_model=TaskChangesResponse,
+    summary="Feed de cambios de tareas",
+    description="Tareas creadas o modificadas y tareas eliminadas desde el último token de sincronización.",
+)
+def list_task_changes(
+    current_user: ViewTaskUser,
+    db: Session = Depends(get_db),
+    since: Optional[str] = Query(None, description="Token `next_token` de la sincronización anterior"),
+    limit: int = Query(500, ge=1, le=1000, description="Máximo de cambios por respuesta"),
+):
+    """
+    Sincronización incremental de tareas.
+
+    - Sin **since**: sincronización completa (todas las tareas, paginadas por `limit`).
+    - Con **since**: solo las tareas creadas/modificadas y los ids eliminados después del token.
+    - Si **has_more** es true, repetir inmediatamente con `since=next_token`.
+
+    Un token más antiguo que la retención de tombstones responde 410: el
+    cliente debe descartar su copia y sincronizar desde cero.
+    """
+    task_service = get_task_service(db)
+    now = time.time()
+
+    if since is None:
+        since_position, synced_at = (0, 0), now
+    else:
+        try:
+            since_position, synced_at = task_service.decode_change_token(since)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Token de sincronización inválido",
+            )
+        retention = get_settings().TASK_TOMBSTONE_RETENTION_DAYS * 86400
+        if now - synced_at > retention:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Token de sincronización expirado; sincronice desde cero",
+            )
+
+    tasks, deleted, last_position, has_more = task_service.get_changes(
+        user_id=current_user.id,
+        since=since_position,
+        limit=limit,
+        include_deleted=since is not None,
+    )
+
+    return TaskChangesResponse(
+        items=tasks,
+        deleted=deleted,
+        next_token=task_service.encode_change_token(last_position, synced_at if has_more else now),
+        has_more=has_more,
+    )
+
+
+@router.get(
+    "/events",
+    response_class=StreamingResponse,
+    summary="Eventos de tareas en tiempo real",
+    description="Stream Server-Sent Events con las altas, modificaciones y bajas de tareas del usuario.",
+)
+async def task_events(
+    current_user: ViewTaskUser,
+    db: Session = Depends(get_db),
+):
+    """
+    Stream SSE (`text/event-stream`) de cambios de tareas del usuario.
+
+    Eventos: `created`, `updated` y `deleted` con `{"task_id", "version"}`.
+    Si el cliente no consume a tiempo recibe `resync` y la conexión se
+    cierra; debe ponerse al día con `/tasks/changes` y reconectar.
+    """
+    user_id = current_user.id
+    # La conexión SSE puede durar horas: devolver la conexión de BD al pool ya.
+    # El cierre (ROLLBACK y devolución al pool) bloquea, así que va al threadpool.
+    await run_in_threadpool(db.close)
+
+    return StreamingResponse(
+        stream_task_events(user_id, get_settings().TASK_EVENTS_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get(
     "/{task_id}",
     response_model=TaskResponse,
@@ -111,12 +308,18 @@ def list_tasks(
 )
 def get_task(
     task_id: UUID,
-    current_user: CurrentUser,
+    current_user: ViewTaskUser,
+    response: Response,
     db: Session = Depends(get_db),
+    include_archived: bool = Query(False, description="Buscar también entre las tareas archivadas"),
 ):
-    """Obtiene una tarea por su ID."""
+    """
+    Obtiene una tarea por su ID. El header `ETag` contiene su versión.
+
+    - **include_archived**: Si la tarea fue archivada, devolverla (con `archived_at`) en lugar de 404
+    """
     task_service = get_task_service(db)
-    task = task_service.get_task_by_id(task_id, current_user.id)
+    task = task_service.get_task_by_id(task_id, current_user.id, include_archived)
     
     if not task:
         raise HTTPException(
@@ -124,6 +327,7 @@ def get_task(
             detail="Tarea no encontrada",
         )
     
+    response.headers["ETag"] = etag_for(task.version)
     return task
 
 
@@ -136,16 +340,28 @@ def get_task(
 def update_task(
     task_id: UUID,
     task_data: TaskUpdate,
-    current_user: CurrentUser,
+    current_user: UpdateTaskUser,
+    response: Response,
+    expected_version: IfMatchVersion,
     db: Session = Depends(get_db),
 ):
     """
     Actualiza una tarea existente.
     
     Solo se actualizan los campos proporcionados.
+    
+    - **If-Match** (header, opcional): versión esperada de la tarea. Si otro
+      cliente la modificó antes, responde 412 y no se aplica el cambio.
     """
     task_service = get_task_service(db)
-    task = task_service.update_task(task_id, current_user.id, task_data)
+    try:
+        task = task_service.update_task(task_id, current_user.id, task_data, expected_version)
+    except VersionConflictError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"La tarea fue modificada por otro cliente (versión actual: {exc.current_version})",
+            headers={"ETag": etag_for(exc.current_version)},
+        )
     
     if not task:
         raise HTTPException(
@@ -153,6 +369,7 @@ def update_task(
             detail="Tarea no encontrada",
         )
     
+    response.headers["ETag"] = etag_for(task.version)
     return task
 
 
@@ -164,7 +381,7 @@ def update_task(
 )
 def delete_task(
     task_id: UUID,
-    current_user: CurrentUser,
+    current_user: DeleteTaskUser,
     db: Session = Depends(get_db),
 ):
     """Elimina una tarea por su ID."""
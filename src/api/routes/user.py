@@ -1,20 +1,22 @@
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
+from src.api.routing import TracedRoute
 from src.db.session import get_db
-from src.api.deps import AdminUser
+from src.api.deps import AdminUser, IfMatchVersion, etag_for
 from src.schemas.user import (
     UserCreate,
     UserResponse,
     UserListResponse,
 )
 from src.services.user_service import get_user_service
+from src.services.exceptions import VersionConflictError
 
 
-router = APIRouter(prefix="/users", tags=["Usuarios"])
+router = APIRouter(prefix="/users", tags=["Usuarios"], route_class=TracedRoute)
 
 
 @router.post(
@@ -115,12 +117,15 @@ def update_user_status(
     user_id: UUID,
     is_active: bool,
     admin_user: AdminUser,
+    response: Response,
+    expected_version: IfMatchVersion,
     db: Session = Depends(get_db),
 ):
     """
     Cambia el estado activo/inactivo de un usuario (solo admin).
     
     - **is_active**: `true` para activar, `false` para desactivar
+    - **If-Match** (header, opcional): versión esperada del usuario; 412 si cambió
     
     El usuario no será eliminado, solo marcado como activo o inactivo.
     """
@@ -150,9 +155,23 @@ def update_user_status(
         )
     
     # Actualizar estado
-    if is_active:
-        updated_user = user_service.activate_user(user_id, admin_user.id)
-    else:
-        updated_user = user_service.deactivate_user(user_id, admin_user.id)
+    try:
+        if is_active:
+            updated_user = user_service.activate_user(user_id, admin_user.id, expected_version)
+        else:
+            updated_user = user_service.deactivate_user(user_id, admin_user.id, expected_version)
+    except VersionConflictError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"El usuario fue modificado por otro cliente (versión actual: {exc.current_version})",
+            headers={"ETag": etag_for(exc.current_version)},
+        )
+    
+    if not updated_user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Usuario no encontrado",
+        )
     
+    response.headers["ETag"] = etag_for(updated_user.version)
     return updated_user
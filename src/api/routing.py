@@ -0,0 +1,39 @@
+import time
+from typing import Callable
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from src.api.idempotency import idempotent_handler
+from src.core.tracing import current_span, record_span, span, traced
+
+
+class TracedRoute(APIRoute):
+    """
+    Ruta que agrega a la traza del request un span `endpoint.<nombre>` con la
+    ejecución del endpoint y un span `serialize` con la validación y
+    serialización de la respuesta posteriores. Si el endpoint está marcado
+    con `@idempotent`, procesa además el header `Idempotency-Key`.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        # include_router vuelve a crear la ruta con el endpoint ya envuelto;
+        # `traced` no lo envuelve dos veces
+        super().__init__(path, traced(f"endpoint.{endpoint.__name__}")(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if getattr(self.endpoint, "idempotent", False):
+            handler = idempotent_handler(handler)
+
+        async def traced_handler(request: Request) -> Response:
+            if current_span() is None:
+                return await handler(request)
+            with span("route", path=self.path) as route_span:
+                response = await handler(request)
+                endpoint_end = route_span.trace.last_end("endpoint.")
+                if endpoint_end is not None:
+                    record_span("serialize", endpoint_end, time.perf_counter())
+            return response
+
+        return traced_handler
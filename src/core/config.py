@@ -1,20 +1,162 @@
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+from typing import Annotated, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, field_validator
+from pydantic_settings import BaseSettings, NoDecode
+
+
+class RateLimit(BaseModel):
+    """Límites de un grupo de rutas, por usuario autenticado."""
+    # Peticiones por segundo sostenidas (reposición del token bucket)
+    rate: float
+    # Peticiones que se admiten de golpe (capacidad del bucket)
+    burst: int
+    # Requests simultáneos en curso (0 = sin límite)
+    concurrency: int = 0
 
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Taskify"
     PROJECT_VERSION: str = "0.0.1"
     DB_URL: str
-    
+    # Réplicas de solo lectura (lista separada por comas). Vacío = todo al primario.
+    DB_REPLICA_URLS: Annotated[List[str], NoDecode] = []
+    # Segundos que las lecturas de un usuario van al primario tras una escritura suya
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+
     # JWT Configuration
     JWT_SECRET_KEY: str = "{JWT_SECRET_KEY}"
     JWT_ALGORITHM: str = "{JWT_ALGORITHM}"
     JWT_EXPIRATION_MINUTES: int = "{JWT_EXPIRATION_MINUTES}"
-    
+
+    # Vigencia máxima de la matriz de permisos en memoria (segundos)
+    RBAC_MATRIX_TTL_SECONDS: float = 60.0
+
+    # Días que se conservan los tombstones del feed de cambios de tareas
+    TASK_TOMBSTONE_RETENTION_DAYS: int = 30
+
+    # Archivado: tareas completadas sin cambios hace más de N días pasan a
+    # tasks_archive, en transacciones de TASK_ARCHIVE_BATCH_SIZE tareas
+    TASK_ARCHIVE_AFTER_DAYS: int = 90
+    TASK_ARCHIVE_BATCH_SIZE: int = 500
+
+    # Eventos de tareas en tiempo real: "local" (un proceso) o "postgres" (LISTEN/NOTIFY)
+    TASK_EVENTS_BACKEND: Literal["local", "postgres"] = "local"
+    # Eventos pendientes por conexión antes de forzar un resync
+    TASK_EVENTS_QUEUE_SIZE: int = 100
+    TASK_EVENTS_HEARTBEAT_SECONDS: float = 15.0
+
+    # Auditoría asíncrona: cola en memoria volcada por lotes a audit_events
+    AUDIT_LOG_ENABLED: bool = True
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    # Archivo JSONL donde se vuelcan los eventos si la cola se llena o la BD
+    # falla. Vacío = descartarlos (se cuentan en `AuditLog.dropped`).
+    AUDIT_SPILL_PATH: Optional[str] = None
+
+    # Trazas por request: fracción muestreada (0 = deshabilitadas) y exportador
+    TRACE_SAMPLE_RATE: float = 0.0
+    TRACE_EXPORTER: Literal["memory", "file"] = "memory"
+    TRACE_FILE_PATH: str = "traces.jsonl"
+    # Trazas que conserva el exportador en memoria
+    TRACE_MEMORY_MAX_TRACES: int = 1000
+
+    # Máximo de ids por petición a /tasks/batch
+    TASK_BATCH_MAX_IDS: int = 100
+
+    # Máximo de sub-peticiones por POST /batch
+    BATCH_MAX_REQUESTS: int = 20
+
+    # Idempotency-Key (POST /tasks, POST /batch): vigencia de la respuesta
+    # guardada, máximo que un request se considera en curso y espera de los
+    # duplicados concurrentes
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_LOCK_SECONDS: int = 60
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+
+    # Rate limiting por usuario y grupo de rutas (primer segmento del path).
+    # RATE_LIMITS se define como JSON y reemplaza a los valores por defecto;
+    # los grupos que no figuran no se limitan.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: Literal["memory", "redis"] = "memory"
+    # Vacío = CACHE_REDIS_URL
+    RATE_LIMIT_REDIS_URL: Optional[str] = None
+    RATE_LIMITS: Dict[str, RateLimit] = {
+        "tasks": RateLimit(rate=20, burst=40, concurrency=8),
+        "tags": RateLimit(rate=20, burst=40, concurrency=8),
+        "users": RateLimit(rate=5, burst=20, concurrency=4),
+        "roles": RateLimit(rate=5, burst=20, concurrency=4),
+    }
+
+    # Deadline de cada request (segundos): cada transacción de su sesión
+    # empieza con statement_timeout = tiempo restante y lock_timeout =
+    # DB_LOCK_TIMEOUT_SECONDS. REQUEST_DEADLINES ajusta rutas puntuales por
+    # "MÉTODO /ruta" (JSON, reemplaza a los valores por defecto); 0 = sin deadline.
+    REQUEST_DEADLINE_SECONDS: float = 10.0
+    DB_LOCK_TIMEOUT_SECONDS: float = 2.0
+    REQUEST_DEADLINES: Dict[str, float] = {
+        "GET /tasks": 5.0,
+        "GET /tags/{tag_name}/tasks": 5.0,
+        "POST /batch": 30.0,
+    }
+
+    # Caché de resultados: "memory" (LRU por proceso) o "redis" (compartida)
+    CACHE_BACKEND: Literal["memory", "redis"] = "memory"
+    CACHE_REDIS_URL: Optional[str] = None
+    # Páginas de GET /tasks por usuario, invalidadas por versión en cada escritura
+    TASK_LIST_CACHE_ENABLED: bool = True
+    TASK_LIST_CACHE_MAX_ENTRIES: int = 10000
+    TASK_LIST_CACHE_TTL_SECONDS: float = 300.0
+
+    # Vigencia máxima del catálogo de tags en memoria (se invalida por versión)
+    TAG_CATALOG_CACHE_TTL_SECONDS: float = 3600.0
+
+    # Métricas en /metrics. Con varios workers, directorio compartido donde
+    # cada uno publica su instantánea cada METRICS_FLUSH_SECONDS.
+    METRICS_ENABLED: bool = True
+    METRICS_MULTIPROC_DIR: Optional[str] = None
+    METRICS_FLUSH_SECONDS: float = 5.0
+
+    # Servidor de producción (`python -m src.serve`)
+    SERVE_HOST: str = "0.0.0.0"
+    SERVE_PORT: int = 8000
+    # Workers; vacío = uno por núcleo disponible para el proceso
+    SERVE_WORKERS: Optional[int] = None
+    # Importar la aplicación en el proceso maestro antes del fork
+    SERVE_PRELOAD: bool = True
+    # Conexiones del pool que cada worker abre antes de aceptar tráfico (0 = ninguna)
+    SERVE_WARMUP_CONNECTIONS: int = 5
+    # Espera máxima a los requests en curso al detener un worker
+    SERVE_GRACEFUL_TIMEOUT_SECONDS: float = 30.0
+
+    # Routers habilitados en este despliegue (lista separada por comas)
+    ENABLED_ROUTERS: Annotated[List[str], NoDecode] = [
+        "auth", "task", "user", "tag", "permission", "role", "batch",
+    ]
+
+    @field_validator("ENABLED_ROUTERS", "DB_REPLICA_URLS", mode="before")
+    @classmethod
+    def split_comma_separated(cls, v):
+        """Permite definir listas como 'auth,task,tag'."""
+        if isinstance(v, str):
+            return [name.strip() for name in v.split(",") if name.strip()]
+        return v
+
     class Config:
         env_file = ".env"
         case_sensitive = False
         extra = "ignore"
 
 
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Construye la configuración en el primer uso y la reutiliza."""
+    return Settings()
+
+
+def __getattr__(name: str):
+    # Compatibilidad con `from src.core.config import settings`
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,314 @@
+"""
+Métricas en el formato de exposición de texto de Prometheus, sin dependencias.
+
+Cada proceso acumula sus métricas en memoria (un lock por métrica, sin E/S en
+el camino del request). Con varios workers, `METRICS_MULTIPROC_DIR` apunta a
+un directorio compartido: cada worker escribe allí una instantánea
+`<pid>.json` cada `METRICS_FLUSH_SECONDS` y `/metrics`, lo atienda el worker
+que lo atienda, suma las instantáneas de todos. Los contadores e histogramas
+de workers terminados se conservan; sus gauges se ignoran. El directorio debe
+vaciarse antes de cada despliegue.
+"""
+import asyncio
+import json
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from src.core.config import get_settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, Any] = {}
+        self._lock = Lock()
+        REGISTRY[name] = self
+
+    def snapshot(self) -> List[List[Any]]:
+        with self._lock:
+            return [[list(labels), _copy(value)] for labels, value in self._values.items()]
+
+
+def _copy(value: Any) -> Any:
+    return [list(value[0]), value[1]] if isinstance(value, list) else value
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # [conteo por bucket (no acumulado, el último es +Inf), suma]
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+
+REGISTRY: Dict[str, Metric] = {}
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "Requests HTTP atendidos", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Duración de los requests HTTP", ("method", "route")
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests HTTP en curso")
+DB_POOL_SIZE = Gauge("db_pool_size", "Tamaño base del pool de conexiones", ("pool",))
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Conexiones del pool en uso", ("pool",))
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Conexiones abiertas por encima del tamaño del pool", ("pool",))
+DB_POOL_CHECKOUT_DURATION = Histogram(
+    "db_pool_checkout_seconds",
+    "Espera para obtener una conexión del pool (incluye abrirla si hace falta)",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_TIMEOUTS = Counter(
+    "db_timeouts_total",
+    "Requests abortados por statement_timeout, lock_timeout o deadline vencido",
+    ("route", "kind"),
+)
+PASSWORD_VERIFY_DURATION = Histogram(
+    "password_verify_seconds", "Duración de la verificación Argon2 de contraseñas",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+CACHE_REQUESTS = Counter("cache_requests_total", "Consultas a cachés en memoria", ("cache", "result"))
+THREADPOOL_LIMIT = Gauge("threadpool_limit", "Hilos disponibles en el threadpool de anyio")
+THREADPOOL_BORROWED = Gauge("threadpool_borrowed", "Hilos del threadpool de anyio en uso")
+THREADPOOL_WAITING = Gauge("threadpool_waiting", "Tareas esperando un hilo del threadpool de anyio")
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que mide cada request HTTP por método, ruta y estado."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec()
+            # La plantilla de la ruta, no el path: acota la cardinalidad
+            route = scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+            HTTP_REQUESTS.inc(scope["method"], route_path, str(status_code))
+            HTTP_REQUEST_DURATION.observe(elapsed, scope["method"], route_path)
+
+
+def collect_runtime() -> None:
+    """Actualiza los gauges del pool de conexiones y del threadpool; se llama desde el loop."""
+    import anyio.to_thread
+    from src.db.session import get_engine, get_replica_engines
+
+    pools = [("primary", get_engine())]
+    pools += [(f"replica-{index}", engine) for index, engine in enumerate(get_replica_engines())]
+    for name, engine in pools:
+        pool = engine.pool
+        if hasattr(pool, "checkedout"):
+            DB_POOL_SIZE.set(pool.size(), name)
+            DB_POOL_CHECKED_OUT.set(pool.checkedout(), name)
+            DB_POOL_OVERFLOW.set(max(pool.overflow(), 0), name)
+
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    THREADPOOL_LIMIT.set(limiter.total_tokens)
+    THREADPOOL_BORROWED.set(limiter.borrowed_tokens)
+    THREADPOOL_WAITING.set(limiter.statistics().tasks_waiting)
+
+
+def snapshot() -> Dict[str, Any]:
+    return {
+        name: {
+            "type": metric.type,
+            "help": metric.documentation,
+            "labelnames": list(metric.labelnames),
+            "buckets": list(getattr(metric, "buckets", ())),
+            "samples": metric.snapshot(),
+        }
+        for name, metric in REGISTRY.items()
+    }
+
+
+def write_snapshot(directory: str) -> None:
+    """Escribe la instantánea de este proceso en `directory/<pid>.json` (reemplazo atómico)."""
+    path = os.path.join(directory, f"{os.getpid()}.json")
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as output:
+        json.dump(snapshot(), output)
+    os.replace(temporary, path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_snapshots(directory: str) -> Dict[str, Any]:
+    """Suma las instantáneas de todos los procesos del directorio."""
+    merged: Dict[str, Any] = {}
+    for filename in os.listdir(directory):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, filename), encoding="utf-8") as source:
+                process_metrics = json.load(source)
+        except (OSError, ValueError):
+            continue
+        alive = _pid_alive(int(filename[:-5]))
+        for name, data in process_metrics.items():
+            if data["type"] == "gauge" and not alive:
+                continue
+            target = merged.setdefault(name, {**data, "samples": {}})
+            for labels, value in data["samples"]:
+                key = tuple(labels)
+                current = target["samples"].get(key)
+                if current is None:
+                    target["samples"][key] = value
+                elif data["type"] == "histogram":
+                    current[0] = [a + b for a, b in zip(current[0], value[0])]
+                    current[1] += value[1]
+                else:
+                    target["samples"][key] = current + value
+    for data in merged.values():
+        data["samples"] = [[list(labels), value] for labels, value in data["samples"].items()]
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render(metrics: Dict[str, Any]) -> str:
+    """Formato de exposición de texto de Prometheus."""
+    lines: List[str] = []
+    for name, data in metrics.items():
+        lines.append(f"# HELP {name} {data['help']}")
+        lines.append(f"# TYPE {name} {data['type']}")
+        names = data["labelnames"]
+        for labels, value in data["samples"]:
+            if data["type"] != "histogram":
+                lines.append(f"{name}{_labels(names, labels)} {_format_number(value)}")
+                continue
+            counts, total = value
+            cumulative = 0
+            for bound, count in zip(list(data["buckets"]) + ["+Inf"], counts):
+                cumulative += count
+                le = bound if bound == "+Inf" else _format_number(bound)
+                bucket_labels = _labels(names, labels, f'le="{le}"')
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{name}_sum{_labels(names, labels)} {_format_number(total)}")
+            lines.append(f"{name}_count{_labels(names, labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def render_metrics() -> str:
+    """
+    Métricas de este proceso o, con `METRICS_MULTIPROC_DIR`, de todos los workers.
+
+    Puede leer y escribir archivos, así que se llama fuera del loop; los gauges
+    de `collect_runtime()` se actualizan antes, desde el loop.
+    """
+    directory = get_settings().METRICS_MULTIPROC_DIR
+    if not directory:
+        return render(snapshot())
+    write_snapshot(directory)
+    return render(merge_snapshots(directory))
+
+
+async def run_snapshot_writer(directory: str, interval: float) -> None:
+    """Tarea de fondo de cada worker: publica su instantánea periódicamente."""
+    os.makedirs(directory, exist_ok=True)
+    try:
+        while True:
+            collect_runtime()
+            write_snapshot(directory)
+            await asyncio.sleep(interval)
+    finally:
+        write_snapshot(directory)
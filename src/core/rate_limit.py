@@ -0,0 +1,238 @@
+"""
+Rate limiting por usuario autenticado y grupo de rutas.
+
+El grupo es el primer segmento del path (`/tasks/...` -> `tasks`) y sus
+límites se configuran en `RATE_LIMITS`. Para cada usuario y grupo rigen:
+
+- un token bucket: `rate` peticiones por segundo sostenidas con ráfagas de
+  hasta `burst`;
+- un máximo de `concurrency` requests simultáneos en curso, para que un solo
+  cliente no ocupe todo el threadpool del worker.
+
+Al superarlos se responde 429 con `Retry-After`. Los requests sin un token
+válido no se limitan (responden 401 sin tocar la base de datos). El stream
+SSE cuenta para el bucket pero no ocupa un lugar de concurrencia.
+
+Backends (`RATE_LIMIT_BACKEND`):
+- `memory`: contadores por proceso; con N workers el límite efectivo de un
+  usuario puede llegar a N veces el configurado.
+- `redis`: contadores compartidos entre workers (`RATE_LIMIT_REDIS_URL` o
+  `CACHE_REDIS_URL`); requiere el paquete `redis`. Otro backend puede
+  registrarse con `set_rate_limit_backend`.
+"""
+import math
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from src.core.config import RateLimit, get_settings
+from src.core.metrics import Counter
+from src.core.security import verify_access_token
+
+RATE_LIMITED = Counter(
+    "rate_limited_total", "Requests rechazados con 429 por grupo y motivo", ("group", "reason")
+)
+
+# Rutas de larga duración que no ocupan un lugar de concurrencia
+UNCAPPED_PATHS = frozenset({"/tasks/events"})
+
+
+class MemoryRateLimitBackend:
+    """Token buckets y contadores de concurrencia en memoria del proceso."""
+
+    def __init__(self, prune_interval: float = 60.0):
+        # clave -> (tokens, instante de la última actualización, instante en que se llena)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._prune_interval = prune_interval
+        self._next_prune = time.monotonic() + prune_interval
+
+    async def take_token(self, key: str, limit: RateLimit) -> float:
+        """Consume un token; retorna 0 o los segundos hasta que haya uno disponible."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (limit.burst, now, now))
+            tokens = min(limit.burst, tokens + (now - updated) * limit.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / limit.rate
+            self._buckets[key] = (tokens, now, now + (limit.burst - tokens) / limit.rate)
+            if now >= self._next_prune:
+                self._prune(now)
+        return wait
+
+    def _prune(self, now: float) -> None:
+        # Un bucket que ya se habría llenado equivale a uno inexistente
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+        self._next_prune = now + self._prune_interval
+
+    async def acquire_slot(self, key: str, limit: int) -> bool:
+        with self._lock:
+            current = self._in_flight.get(key, 0)
+            if current >= limit:
+                return False
+            self._in_flight[key] = current + 1
+            return True
+
+    async def release_slot(self, key: str) -> None:
+        with self._lock:
+            current = self._in_flight.get(key, 0) - 1
+            if current > 0:
+                self._in_flight[key] = current
+            else:
+                self._in_flight.pop(key, None)
+
+
+# Token bucket atómico en Redis: estado (tokens, instante) por clave, con el
+# reloj del servidor para que todos los workers usen el mismo
+_TAKE_TOKEN_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisRateLimitBackend:
+    """Token buckets y contadores de concurrencia compartidos en Redis."""
+
+    # Vigencia de un contador de concurrencia sin actividad: acota lo que
+    # retienen los requests de un worker que murió sin liberarlos
+    SLOT_TTL_SECONDS = 300
+
+    def __init__(self, url: Optional[str]):
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requiere el paquete 'redis' (pip install redis)") from exc
+        if not url:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requiere RATE_LIMIT_REDIS_URL o CACHE_REDIS_URL")
+        self._client = redis.Redis.from_url(url)
+        self._take_token = self._client.register_script(_TAKE_TOKEN_SCRIPT)
+
+    async def take_token(self, key: str, limit: RateLimit) -> float:
+        wait = await self._take_token(keys=[f"ratelimit:bucket:{key}"], args=[limit.rate, limit.burst])
+        return float(wait)
+
+    async def acquire_slot(self, key: str, limit: int) -> bool:
+        slot_key = f"ratelimit:slots:{key}"
+        async with self._client.pipeline(transaction=True) as pipe:
+            current, _ = await pipe.incr(slot_key).expire(slot_key, self.SLOT_TTL_SECONDS).execute()
+        if current > limit:
+            await self._client.decr(slot_key)
+            return False
+        return True
+
+    async def release_slot(self, key: str) -> None:
+        await self._client.decr(f"ratelimit:slots:{key}")
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_rate_limit_backend():
+    """Retorna el backend del proceso según `RATE_LIMIT_BACKEND`."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                settings = get_settings()
+                if settings.RATE_LIMIT_BACKEND == "redis":
+                    _backend = RedisRateLimitBackend(settings.RATE_LIMIT_REDIS_URL or settings.CACHE_REDIS_URL)
+                else:
+                    _backend = MemoryRateLimitBackend()
+    return _backend
+
+
+def set_rate_limit_backend(backend) -> None:
+    """
+    Reemplaza el backend del proceso por uno propio con los mismos métodos
+    async (`take_token`, `acquire_slot`, `release_slot`).
+    """
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def _request_user(scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                return verify_access_token(token)
+            return None
+    return None
+
+
+def _too_many_requests(retry_after: float, detail: str):
+    from fastapi.responses import JSONResponse
+
+    return JSONResponse(
+        status_code=429,
+        content={"detail": detail},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class RateLimitMiddleware:
+    """Middleware ASGI que aplica `RATE_LIMITS` a cada request autenticado."""
+
+    def __init__(self, app):
+        self.app = app
+        self.limits = get_settings().RATE_LIMITS
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        group = path.strip("/").split("/", 1)[0]
+        limit = self.limits.get(group)
+        user_id = _request_user(scope) if limit is not None else None
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        backend = get_rate_limit_backend()
+        key = f"{group}:{user_id}"
+        wait = await backend.take_token(key, limit)
+        if wait > 0:
+            RATE_LIMITED.inc(group, "rate")
+            response = _too_many_requests(wait, "Demasiadas peticiones; reintente más tarde")
+            await response(scope, receive, send)
+            return
+
+        if not limit.concurrency or path.rstrip("/") in UNCAPPED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        if not await backend.acquire_slot(key, limit.concurrency):
+            RATE_LIMITED.inc(group, "concurrency")
+            response = _too_many_requests(1, "Demasiadas peticiones simultáneas; reintente más tarde")
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await backend.release_slot(key)
@@ -1,57 +1,70 @@
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
 from uuid import UUID
 
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from src.core.config import get_settings
+from src.core.metrics import PASSWORD_VERIFY_DURATION
+from src.core.tracing import traced
 
-from src.core.config import settings
 
+@lru_cache(maxsize=1)
+def get_pwd_context():
+    """Crea el contexto de passlib en el primer uso (importar argon2 es costoso)."""
+    from passlib.context import CryptContext
 
-pwd_context = CryptContext(
-    schemes=["argon2"],
-    argon2__time_cost=3,
-    argon2__memory_cost=65536, 
-    argon2__parallelism=2,
-    deprecated="auto"
-)
+    return CryptContext(
+        schemes=["argon2"],
+        argon2__time_cost=3,
+        argon2__memory_cost=65536,
+        argon2__parallelism=2,
+        deprecated="auto"
+    )
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def verify_password(password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(password, hashed_password)
+    with PASSWORD_VERIFY_DURATION.time():
+        return get_pwd_context().verify(password, hashed_password)
 
 
 def create_access_token(user_id: UUID, expires_delta: Optional[timedelta] = None) -> str:
     """Crea un token JWT para el usuario."""
+    from jose import jwt
+
+    settings = get_settings()
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.JWT_EXPIRATION_MINUTES)
-    
+
     to_encode = {
         "sub": str(user_id),
         "exp": expire,
         "iat": datetime.now(timezone.utc),
     }
-    
+
     encoded_jwt = jwt.encode(
-        to_encode, 
-        settings.JWT_SECRET_KEY, 
+        to_encode,
+        settings.JWT_SECRET_KEY,
         algorithm=settings.JWT_ALGORITHM
     )
     return encoded_jwt
 
 
+@traced("jwt.decode")
 def verify_access_token(token: str) -> Optional[str]:
     """Verifica y decodifica un token JWT. Retorna el user_id o None si es inválido."""
+    from jose import JWTError, jwt
+
+    settings = get_settings()
     try:
         payload = jwt.decode(
-            token, 
-            settings.JWT_SECRET_KEY, 
+            token,
+            settings.JWT_SECRET_KEY,
             algorithms=[settings.JWT_ALGORITHM]
         )
         user_id: str = payload.get("sub")
@@ -60,3 +73,18 @@ def verify_access_token(token: str) -> Optional[str]:
         return user_id
     except JWTError:
         return None
+
+
+def get_unverified_subject(token: str) -> Optional[str]:
+    """
+    Lee el `sub` de un token sin verificar la firma.
+
+    Solo debe usarse para decisiones que no son de seguridad (por ejemplo,
+    enrutar lecturas al primario); la autenticación usa `verify_access_token`.
+    """
+    from jose import JWTError, jwt
+
+    try:
+        return jwt.get_unverified_claims(token).get("sub")
+    except JWTError:
+        return None
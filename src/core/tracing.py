@@ -0,0 +1,279 @@
+"""
+Trazas ligeras por request: spans con duración y atributos para las
+dependencias de `src/api/deps`, los endpoints, los métodos públicos de los
+servicios, las sentencias SQL y la serialización de la respuesta.
+
+Una traza se muestrea al inicio del request (`TRACE_SAMPLE_RATE`); los spans
+solo se registran si el request en curso está muestreado. Sin muestreo, cada
+punto instrumentado cuesta una lectura de `ContextVar`. Las trazas completas
+se envían a un exportador en memoria o a un archivo JSONL
+(`TRACE_EXPORTER`, `TRACE_FILE_PATH`).
+"""
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from src.core.config import get_settings
+
+
+class Trace:
+    """Spans terminados de un request."""
+
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self):
+        self.trace_id = os.urandom(8).hex()
+        self.spans: List[Dict[str, Any]] = []
+
+    def last_end(self, name_prefix: str) -> Optional[float]:
+        """Fin (perf_counter) del último span terminado cuyo nombre empieza con `name_prefix`."""
+        for finished in reversed(self.spans):
+            if finished["name"].startswith(name_prefix):
+                return finished["_end"]
+        return None
+
+
+class Span:
+    """Span activo; se registra en su traza al salir del bloque `with`."""
+
+    __slots__ = ("trace", "name", "span_id", "parent_id", "attributes", "start", "_token")
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.span_id = os.urandom(4).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = 0.0
+        self._token = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.trace.spans.append(_record(self, self.start, time.perf_counter()))
+
+
+class _NoopSpan:
+    """Span vacío para requests no muestreados."""
+
+    __slots__ = ()
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def _record(active: Span, start: float, end: float) -> Dict[str, Any]:
+    return {
+        "name": active.name,
+        "trace_id": active.trace.trace_id,
+        "span_id": active.span_id,
+        "parent_id": active.parent_id,
+        "duration_ms": round((end - start) * 1000, 3),
+        "attributes": active.attributes,
+        "thread": threading.current_thread().name,
+        "_start": start,
+        "_end": end,
+    }
+
+
+def current_span() -> Optional[Span]:
+    """Span activo del request en curso, o None si no está muestreado."""
+    return _current_span.get()
+
+
+def span(name: str, **attributes: Any):
+    """Abre un span hijo del activo; sin traza activa retorna un span vacío."""
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(parent.trace, name, parent.span_id, attributes)
+
+
+def record_span(name: str, start: float, end: float, **attributes: Any) -> None:
+    """Registra un span ya medido (tiempos de `perf_counter`) bajo el span activo."""
+    parent = _current_span.get()
+    if parent is not None:
+        finished = Span(parent.trace, name, parent.span_id, attributes)
+        parent.trace.spans.append(_record(finished, start, end))
+
+
+def traced(name: str):
+    """Decorador que envuelve una función (sync o async) en un span."""
+    def decorator(fn: Callable) -> Callable:
+        if getattr(fn, "__trace_name__", None) == name:
+            return fn
+        if iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if _current_span.get() is None:
+                    return await fn(*args, **kwargs)
+                with span(name):
+                    return await fn(*args, **kwargs)
+            async_wrapper.__trace_name__ = name
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        wrapper.__trace_name__ = name
+        return wrapper
+    return decorator
+
+
+def traced_service(cls: type) -> type:
+    """Decorador de clase: un span por cada método público (`TaskService.update_task`, ...)."""
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("_"):
+            continue
+        name = f"{cls.__name__}.{attr}"
+        if isinstance(value, (staticmethod, classmethod)):
+            setattr(cls, attr, type(value)(traced(name)(value.__func__)))
+        elif callable(value):
+            setattr(cls, attr, traced(name)(value))
+    return cls
+
+
+class InMemoryExporter:
+    """Conserva las últimas `max_traces` trazas (útil en pruebas y depuración)."""
+
+    def __init__(self, max_traces: int = 1000):
+        self.traces: Deque[List[Dict[str, Any]]] = deque(maxlen=max_traces)
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        self.traces.append(spans)
+
+
+class FileExporter:
+    """Agrega cada span como una línea JSON en `path`."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(finished, default=str) + "\n" for finished in spans)
+        with self._lock, open(self.path, "a", encoding="utf-8") as output:
+            output.write(lines)
+
+
+class Tracer:
+    def __init__(self, sample_rate: float, exporter):
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+
+    def should_sample(self) -> bool:
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def export(self, trace: Trace) -> None:
+        origin = min(finished["_start"] for finished in trace.spans)
+        spans = []
+        for finished in sorted(trace.spans, key=lambda item: item["_start"]):
+            exported = {key: value for key, value in finished.items() if not key.startswith("_")}
+            exported["offset_ms"] = round((finished["_start"] - origin) * 1000, 3)
+            spans.append(exported)
+        self.exporter.export(spans)
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Tracer del proceso según la configuración."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                settings = get_settings()
+                if settings.TRACE_EXPORTER == "file":
+                    exporter = FileExporter(settings.TRACE_FILE_PATH)
+                else:
+                    exporter = InMemoryExporter(settings.TRACE_MEMORY_MAX_TRACES)
+                _tracer = Tracer(settings.TRACE_SAMPLE_RATE, exporter)
+    return _tracer
+
+
+class TracingMiddleware:
+    """Middleware ASGI que abre el span raíz de cada request muestreado."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        tracer = get_tracer()
+        if scope["type"] != "http" or not tracer.should_sample():
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace()
+        root = Span(trace, f"{scope['method']} {scope['path']}", None, {"http.method": scope["method"]})
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.set("http.status_code", message["status"])
+                route = scope.get("route")
+                if route is not None:
+                    root.set("http.route", route.path)
+            await send(message)
+
+        with root:
+            await self.app(scope, receive, send_wrapper)
+        tracer.export(trace)
+
+
+def install_sql_tracing() -> None:
+    """Registra spans `sql` para cada sentencia ejecutada por cualquier engine."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_span.get() is not None:
+        conn.info.setdefault("trace_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("trace_query_start")
+    if _current_span.get() is not None and starts:
+        record_span(
+            "sql",
+            starts.pop(),
+            time.perf_counter(),
+            statement=statement[:200],
+            rows=cursor.rowcount,
+        )
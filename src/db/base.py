@@ -1,7 +1,30 @@
+from importlib import import_module
+
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
 
 @as_declarative()
 class Base:
     @declared_attr
     def __tablename__(cls) -> str:
-        return cls.__name__.lower()
\ No newline at end of file
+        return cls.__name__.lower()
+
+
+MODEL_MODULES = (
+    "src.models.association",
+    "src.models.permission",
+    "src.models.role",
+    "src.models.user",
+    "src.models.tag",
+    "src.models.task",
+    "src.models.task_tombstone",
+    "src.models.task_archive",
+    "src.models.audit_event",
+    "src.models.cache_version",
+    "src.models.idempotency_key",
+)
+
+
+def load_models() -> None:
+    """Importa todos los modelos para que las relaciones se resuelvan sin importar qué routers se monten."""
+    for module in MODEL_MODULES:
+        import_module(module)
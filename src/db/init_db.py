@@ -1,8 +1,11 @@
-from src.db.session import SessionLocal
+import argparse
+
+from src.db.session import SessionLocal, init_engine
 from src.db.seed import seed_initial_data
 
 
-def main() -> None:
+def run_seed() -> None:
+    init_engine()
     db = SessionLocal()
     try:
         seed_initial_data(db)
@@ -11,5 +14,179 @@ def main() -> None:
         db.close()
 
 
+def run_synthetic(args: argparse.Namespace) -> None:
+    from src.db.synthetic import SyntheticConfig, generate_synthetic_data
+
+    engine = init_engine()
+    db = SessionLocal()
+    try:
+        stats = generate_synthetic_data(
+            engine,
+            db,
+            SyntheticConfig(
+                users=args.users,
+                tasks_per_user=args.tasks_per_user,
+                tags=args.tags,
+                seed=args.seed,
+            ),
+        )
+    finally:
+        db.close()
+
+    print(
+        f"Datos sintéticos generados en {stats.seconds:.1f}s: "
+        f"{stats.users} usuarios, {stats.tags} tags, "
+        f"{stats.tasks} tareas, {stats.task_tags} filas task_tag"
+    )
+
+
+def run_purge_tombstones(args: argparse.Namespace) -> None:
+    from src.services.task_service import get_task_service
+
+    init_engine()
+    db = SessionLocal()
+    try:
+        purged = get_task_service(db).purge_tombstones(args.days)
+    finally:
+        db.close()
+
+    print(f"Tombstones eliminados: {purged} (más de {args.days} días)")
+
+
+def run_purge_idempotency_keys() -> None:
+    from src.services.idempotency import get_idempotency_service
+
+    init_engine()
+    db = SessionLocal()
+    try:
+        purged = get_idempotency_service(db).purge_expired()
+    finally:
+        db.close()
+
+    print(f"Claves de idempotencia vencidas eliminadas: {purged}")
+
+
+def run_archive_tasks(args: argparse.Namespace) -> None:
+    from sqlalchemy import text
+
+    from src.services.task_service import get_task_service
+
+    engine = init_engine()
+    db = SessionLocal()
+    try:
+        archived = get_task_service(db).archive_completed_tasks(args.days, args.batch_size)
+    finally:
+        db.close()
+    print(f"Tareas archivadas: {archived} (completadas hace más de {args.days} días)")
+
+    if args.vacuum and archived:
+        # VACUUM no puede ejecutarse dentro de una transacción
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM (ANALYZE) tasks, task_tag"))
+        print("VACUUM de tasks y task_tag completado")
+
+
+def run_audit_partitions(args: argparse.Namespace) -> None:
+    from src.services.audit_log import maintain_audit_partitions
+
+    engine = init_engine()
+    with engine.begin() as conn:
+        dropped = maintain_audit_partitions(conn, args.months_ahead, args.retain_months)
+
+    print(f"Particiones de auditoría al día; eliminadas: {', '.join(dropped) or 'ninguna'}")
+
+
+def run_task_partitions(args: argparse.Namespace) -> None:
+    from src.db.partitions import maintain_monthly_partitions, partition_strategy
+
+    engine = init_engine()
+    with engine.begin() as conn:
+        strategy = partition_strategy(conn, "tasks")
+        if strategy != "range":
+            print(f"tasks no está particionada por fecha ({strategy or 'sin particionar'}): nada que hacer")
+            return
+        maintain_monthly_partitions(conn, "tasks", args.months_ahead)
+
+    print("Particiones mensuales de tareas al día")
+
+
+def run_replay_audit_spill(args: argparse.Namespace) -> None:
+    import os
+
+    from src.core.config import get_settings
+    from src.services.audit_log import replay_spill
+
+    path = args.path or get_settings().AUDIT_SPILL_PATH
+    if not path or not os.path.exists(path):
+        print("No hay eventos de auditoría volcados")
+        return
+
+    init_engine()
+    total, _ = replay_spill(path)
+    print(f"Eventos de auditoría procesados: {total} (los ya insertados se ignoran)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inicialización de datos de Taskify")
+    subparsers = parser.add_subparsers(dest="command")
+
+    subparsers.add_parser("seed", help="Roles, permisos y usuario administrador (por defecto)")
+
+    synthetic = subparsers.add_parser("synthetic", help="Datos sintéticos deterministas a gran escala")
+    synthetic.add_argument("--users", type=int, default=1000, help="Número de usuarios")
+    synthetic.add_argument("--tasks-per-user", type=int, default=20, help="Media de tareas por usuario (distribución sesgada)")
+    synthetic.add_argument("--tags", type=int, default=200, help="Número de tags")
+    synthetic.add_argument("--seed", type=int, default=42, help="Semilla del generador")
+
+    purge = subparsers.add_parser("purge-tombstones", help="Purga tombstones del feed de cambios de tareas")
+    purge.add_argument("--days", type=int, default=None, help="Retención en días (default: TASK_TOMBSTONE_RETENTION_DAYS)")
+
+    subparsers.add_parser("purge-idempotency-keys", help="Elimina las claves Idempotency-Key vencidas")
+
+    archive = subparsers.add_parser("archive-tasks", help="Mueve las tareas completadas antiguas a tasks_archive")
+    archive.add_argument("--days", type=int, default=None, help="Antigüedad mínima en días (default: TASK_ARCHIVE_AFTER_DAYS)")
+    archive.add_argument("--batch-size", type=int, default=None, help="Tareas por transacción (default: TASK_ARCHIVE_BATCH_SIZE)")
+    archive.add_argument("--vacuum", action="store_true", help="VACUUM (ANALYZE) de tasks y task_tag al terminar")
+
+    partitions = subparsers.add_parser("audit-partitions", help="Crea particiones mensuales de audit_events y purga las antiguas")
+    partitions.add_argument("--months-ahead", type=int, default=2, help="Meses futuros a crear")
+    partitions.add_argument("--retain-months", type=int, default=None, help="Eliminar particiones con más de N meses")
+
+    task_partitions = subparsers.add_parser("task-partitions", help="Crea particiones mensuales de tasks (TASK_PARTITIONING=range)")
+    task_partitions.add_argument("--months-ahead", type=int, default=2, help="Meses futuros a crear")
+
+    replay = subparsers.add_parser("replay-audit-spill", help="Reinserta eventos de auditoría volcados a disco")
+    replay.add_argument("--path", default=None, help="Archivo de volcado (default: AUDIT_SPILL_PATH)")
+
+    args = parser.parse_args()
+    if args.command == "synthetic":
+        run_synthetic(args)
+    elif args.command == "audit-partitions":
+        run_audit_partitions(args)
+    elif args.command == "task-partitions":
+        run_task_partitions(args)
+    elif args.command == "replay-audit-spill":
+        run_replay_audit_spill(args)
+    elif args.command == "purge-idempotency-keys":
+        run_purge_idempotency_keys()
+    elif args.command == "archive-tasks":
+        from src.core.config import get_settings
+
+        settings = get_settings()
+        if args.days is None:
+            args.days = settings.TASK_ARCHIVE_AFTER_DAYS
+        if args.batch_size is None:
+            args.batch_size = settings.TASK_ARCHIVE_BATCH_SIZE
+        run_archive_tasks(args)
+    elif args.command == "purge-tombstones":
+        if args.days is None:
+            from src.core.config import get_settings
+
+            args.days = get_settings().TASK_TOMBSTONE_RETENTION_DAYS
+        run_purge_tombstones(args)
+    else:
+        run_seed()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,80 @@
+"""
+Mantenimiento de tablas particionadas por mes (`PARTITION BY RANGE` sobre
+una fecha): `audit_events` y, con `TASK_PARTITIONING=range`, `tasks`.
+
+Las particiones se llaman `<tabla>_AAAA_MM`. Cada tabla tiene además una
+partición DEFAULT que recibe las filas de meses aún no creados; una
+partición nueva no puede crearse si la DEFAULT ya tiene filas de ese mes,
+así que conviene crearlas con meses de adelanto.
+"""
+from datetime import date, datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def partition_strategy(conn: Connection, table: str) -> Optional[str]:
+    """'range', 'hash' o 'list' si `table` está particionada; None si no."""
+    strategy = conn.execute(
+        text("SELECT partstrat FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+        {"table": table},
+    ).scalar()
+    return {"r": "range", "h": "hash", "l": "list"}.get(strategy)
+
+
+def ensure_monthly_partition(conn: Connection, table: str, month: date) -> None:
+    """Crea la partición mensual de `month` si no existe."""
+    month = month_start(month)
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    ))
+
+
+def maintain_monthly_partitions(
+    conn: Connection,
+    table: str,
+    months_ahead: int = 2,
+    retain_months: Optional[int] = None,
+) -> List[str]:
+    """
+    Crea las particiones del mes actual y de los `months_ahead` siguientes y,
+    si se indica `retain_months`, elimina las anteriores a esa ventana.
+    Retorna los nombres de las particiones eliminadas.
+    """
+    current = month_start(datetime.now(timezone.utc).date())
+    for offset in range(months_ahead + 1):
+        ensure_monthly_partition(conn, table, add_months(current, offset))
+
+    dropped: List[str] = []
+    if retain_months is not None:
+        oldest_kept = partition_name(table, add_months(current, -retain_months))
+        partitions = conn.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :table AND c.relname ~ ('^' || :table || '_[0-9]{4}_[0-9]{2}$')"
+            ),
+            {"table": table},
+        ).scalars().all()
+        for name in sorted(partitions):
+            if name < oldest_kept:
+                # Soltar una partición es instantáneo, a diferencia de un DELETE masivo
+                conn.execute(text(f"DROP TABLE {name}"))
+                dropped.append(name)
+    return dropped
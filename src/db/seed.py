@@ -39,7 +39,7 @@ def seed_initial_data(db: Session) -> None:
     # ---------- ROLES ----------
     roles_data = {
         "admin": permissions_data,
-        "user": ["view_task", "create_task"],
+        "user": ["view_task", "create_task", "update_task", "delete_task"],
     }
 
     roles = {}
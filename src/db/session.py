@@ -1,13 +1,272 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from src.core.config import settings
+import logging
+import math
+import os
+import time
+from itertools import cycle
+from threading import Lock
+from typing import Callable, Iterator, List, Optional
 
-engine = create_engine(settings.DB_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from src.core.config import get_settings
+from src.core.metrics import DB_POOL_CHECKOUT_DURATION
 
-def get_db():
-    db = SessionLocal()
+logger = logging.getLogger(__name__)
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+READ_METHODS = frozenset({"GET", "HEAD"})
+
+_engine: Optional[Engine] = None
+_replica_engines: List[Engine] = []
+_replica_cycle: Optional[Iterator[Engine]] = None
+_engine_lock = Lock()
+
+
+# Ventana de lectura-de-tus-escrituras: tras una escritura, las lecturas del
+# mismo usuario van al primario durante DB_READ_YOUR_WRITES_SECONDS para no
+# leer de una réplica que aún no replicó el cambio. Se guarda en la caché
+# `read_your_writes` (ver `src.services.cache`): compartida entre workers con
+# CACHE_BACKEND=redis, por proceso con `memory`.
+_STICKY_USER_KEY = "read_your_writes_user"
+_STICKY_MAX_USERS = 100000
+
+
+def _sticky_cache():
+    from src.services.cache import get_cache
+
+    settings = get_settings()
+    return get_cache("read_your_writes", _STICKY_MAX_USERS, settings.DB_READ_YOUR_WRITES_SECONDS)
+
+
+def _is_sticky(user_key: str) -> bool:
+    return _sticky_cache().get(user_key) is not None
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool que mide cuánto espera cada checkout (métrica `db_pool_checkout_seconds`)."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_DURATION.observe(time.perf_counter() - started)
+
+
+def init_engine() -> Engine:
+    """Crea el engine (y los de réplica) en el primer uso y lo enlaza a SessionLocal."""
+    global _engine, _replica_engines, _replica_cycle
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                settings = get_settings()
+                _replica_engines = [
+                    create_engine(url, poolclass=TimedQueuePool) for url in settings.DB_REPLICA_URLS
+                ]
+                _replica_cycle = cycle(_replica_engines) if _replica_engines else None
+                _engine = create_engine(settings.DB_URL, poolclass=TimedQueuePool)
+                SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+def get_engine() -> Engine:
+    """Retorna el engine del proceso, creándolo si aún no existe."""
+    return init_engine()
+
+
+def get_replica_engines() -> List[Engine]:
+    """Retorna los engines de réplica configurados (puede ser una lista vacía)."""
+    init_engine()
+    return list(_replica_engines)
+
+
+def dispose_engine() -> None:
+    """Cierra los pools de conexiones y olvida los engines actuales."""
+    global _engine, _replica_engines, _replica_cycle
+    with _engine_lock:
+        for replica in _replica_engines:
+            replica.dispose()
+        _replica_engines, _replica_cycle = [], None
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+
+
+def _reset_after_fork() -> None:
+    """
+    En el hijo de un fork (workers de `src.serve` con precarga): reemplaza
+    los pools heredados sin cerrar sus conexiones, que siguen siendo del
+    padre; el hijo abre las suyas en el primer uso.
+    """
+    global _engine_lock
+    _engine_lock = Lock()
+    for engine in [_engine, *_replica_engines]:
+        if engine is not None:
+            engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def __getattr__(name: str):
+    # Compatibilidad con `from src.db.session import engine`
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+_AFTER_COMMIT_KEY = "after_commit_callbacks"
+_HELD_AFTER_COMMIT_KEY = "held_after_commit_callbacks"
+
+
+def run_after_commit(db: Session, callback: Callable[[], None]) -> None:
+    """Ejecuta `callback` cuando la transacción actual de `db` haga commit; se descarta si hace rollback."""
+    db.info.setdefault(_AFTER_COMMIT_KEY, []).append(callback)
+
+
+def hold_after_commit(db: Session) -> None:
+    """
+    Retiene los callbacks de los commits de `db` en lugar de ejecutarlos. Para
+    sesiones unidas a una transacción externa, cuyo commit es solo un savepoint.
+    """
+    db.info[_HELD_AFTER_COMMIT_KEY] = []
+
+
+def release_after_commit(db: Session, run: bool) -> None:
+    """Ejecuta (tras el commit externo) o descarta los callbacks retenidos."""
+    callbacks = db.info.pop(_HELD_AFTER_COMMIT_KEY, [])
+    if run:
+        _run_callbacks(callbacks)
+
+
+def _run_callbacks(callbacks) -> None:
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception:
+            logger.exception("Error en un callback posterior al commit")
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_callbacks(session: Session) -> None:
+    callbacks = session.info.pop(_AFTER_COMMIT_KEY, ())
+    held = session.info.get(_HELD_AFTER_COMMIT_KEY)
+    if held is not None:
+        held.extend(callbacks)
+        return
+    _run_callbacks(callbacks)
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_read_your_writes(session: Session) -> None:
+    # En el commit y no al cerrar la sesión: el cierre de `get_db` ocurre
+    # cuando la respuesta ya se envió y el siguiente GET podría ganarle
+    user_key = session.info.get(_STICKY_USER_KEY)
+    if user_key is not None:
+        try:
+            _sticky_cache().set(user_key, True)
+        except Exception:
+            logger.exception("No se pudo registrar la ventana de lectura-de-tus-escrituras")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_commit_callbacks(session: Session) -> None:
+    session.info.pop(_AFTER_COMMIT_KEY, None)
+
+
+class DeadlineExceeded(Exception):
+    """El request agotó su deadline antes de empezar otra transacción."""
+
+
+# SQLSTATE de Postgres al vencer statement_timeout y lock_timeout
+DB_TIMEOUT_KINDS = {"57014": "statement", "55P03": "lock"}
+
+_DEADLINE_KEY = "deadline"
+# `true`: los valores rigen solo hasta el fin de la transacción (SET LOCAL)
+_SET_TIMEOUTS = text(
+    "SELECT set_config('statement_timeout', :statement_timeout, true),"
+    " set_config('lock_timeout', :lock_timeout, true)"
+)
+
+
+def set_deadline(db: Session, seconds: float, lock_timeout: float) -> None:
+    """
+    Acota las transacciones de `db` a `seconds` segundos desde ahora: cada una
+    empieza con `statement_timeout` igual al tiempo restante y con
+    `lock_timeout` (0 = sin límite de espera por locks).
+    """
+    db.info[_DEADLINE_KEY] = (time.monotonic() + seconds, lock_timeout)
+
+
+@event.listens_for(Session, "after_begin")
+def _apply_deadline(session: Session, transaction, connection) -> None:
+    # Por transacción y no por sesión: los servicios hacen commit a mitad del
+    # request y SET LOCAL deja de regir con cada commit
+    deadline = session.info.get(_DEADLINE_KEY)
+    if deadline is None:
+        return
+    expires_at, lock_timeout = deadline
+    remaining = expires_at - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded()
+    connection.execute(_SET_TIMEOUTS, {
+        "statement_timeout": str(math.ceil(remaining * 1000)),
+        "lock_timeout": str(math.ceil(lock_timeout * 1000)),
+    })
+
+
+def _route_deadline(request: Request) -> float:
+    """Deadline de la ruta del request según `REQUEST_DEADLINES`."""
+    settings = get_settings()
+    route = request.scope.get("route")
+    if route is not None:
+        seconds = settings.REQUEST_DEADLINES.get(f"{request.method} {route.path}")
+        if seconds is not None:
+            return seconds
+    return settings.REQUEST_DEADLINE_SECONDS
+
+
+def _request_user_key(request: Request) -> Optional[str]:
+    """Identifica al usuario del request para la ventana de lectura-de-tus-escrituras."""
+    authorization = request.headers.get("authorization")
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    from src.core.security import get_unverified_subject
+
+    return get_unverified_subject(authorization[7:])
+
+
+def _choose_bind(request: Request, user_key: Optional[str]) -> Optional[Engine]:
+    """Réplica para lecturas fuera de la ventana del usuario; None = primario."""
+    if _replica_cycle is None or request.method not in READ_METHODS:
+        return None
+    if user_key is not None and _is_sticky(user_key):
+        return None
+    with _engine_lock:
+        return next(_replica_cycle)
+
+
+def get_db(request: Request):
+    # Sub-peticiones de POST /batch: la sesión es del lote, que la cierra
+    batch_db = getattr(request.state, "batch_db", None)
+    if batch_db is not None:
+        yield batch_db
+        return
+    init_engine()
+    user_key = _request_user_key(request) if _replica_cycle is not None else None
+    replica = _choose_bind(request, user_key)
+    db = SessionLocal(bind=replica) if replica is not None else SessionLocal()
+    deadline = _route_deadline(request)
+    if deadline > 0:
+        set_deadline(db, deadline, get_settings().DB_LOCK_TIMEOUT_SECONDS)
+    if user_key is not None and request.method not in READ_METHODS:
+        db.info[_STICKY_USER_KEY] = user_key
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
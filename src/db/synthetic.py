@@ -0,0 +1,231 @@
+"""
+Generador determinista de datos sintéticos a gran escala.
+
+A diferencia de `seed_initial_data`, que crea registros uno a uno, este
+módulo genera usuarios, tags, tareas y filas de `task_tag` en memoria y los
+escribe con `COPY ... FROM STDIN` por bloques. Con la misma semilla siempre
+produce exactamente los mismos datos.
+"""
+import io
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from src.core.security import hash_password
+from src.db.seed import seed_initial_data
+from src.models.role import Role
+from src.models.user import User
+from src.services.tag_service import TAG_CATALOG
+
+
+SYNTHETIC_PASSWORD = "Synthetic123*"
+# Dominio reservado que email-validator acepta (rechaza los de uso especial como .test)
+SYNTHETIC_EMAIL_DOMAIN = "synthetic.example.com"
+
+# Fecha fija de referencia para que las fechas generadas sean reproducibles
+REFERENCE_DATE = datetime(2026, 1, 1)
+HISTORY_DAYS = 730
+
+# Distribuciones (valor en BD, peso). Los Enum se guardan por nombre.
+STATUS_WEIGHTS = (("COMPLETED", 50), ("PENDING", 30), ("IN_PROGRESS", 20))
+PRIORITY_WEIGHTS = (("MEDIUM", 50), ("LOW", 25), ("HIGH", 25))
+TAGS_PER_TASK_WEIGHTS = ((0, 30), (1, 35), (2, 20), (3, 10), (4, 5))
+
+# Cola de Pareto: pocos usuarios concentran la mayoría de las tareas
+PARETO_ALPHA = 1.5
+PARETO_MEAN = PARETO_ALPHA / (PARETO_ALPHA - 1)
+MAX_TASKS_FACTOR = 50
+
+TAG_WORDS = (
+    "backend", "frontend", "urgente", "bug", "feature", "docs", "infra",
+    "diseño", "qa", "cliente", "reunion", "personal", "finanzas", "soporte",
+)
+TITLE_VERBS = ("Revisar", "Implementar", "Corregir", "Documentar", "Planificar", "Probar", "Actualizar")
+TITLE_NOUNS = ("API", "reporte", "migración", "dashboard", "factura", "deploy", "contrato", "backlog")
+
+CHUNK_TASKS = 200_000
+
+
+@dataclass
+class SyntheticConfig:
+    users: int = 1000
+    tasks_per_user: int = 20
+    tags: int = 200
+    seed: int = 42
+
+
+@dataclass
+class SyntheticStats:
+    users: int = 0
+    tags: int = 0
+    tasks: int = 0
+    task_tags: int = 0
+    seconds: float = 0.0
+
+
+def _cumulative(weights: Sequence[Tuple[object, int]]) -> Tuple[List[object], List[int]]:
+    values, cum, total = [], [], 0
+    for value, weight in weights:
+        total += weight
+        values.append(value)
+        cum.append(total)
+    return values, cum
+
+
+class _Generator:
+    """Encapsula el RNG para que todas las decisiones salgan de una misma semilla."""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.status_values, self.status_cum = _cumulative(STATUS_WEIGHTS)
+        self.priority_values, self.priority_cum = _cumulative(PRIORITY_WEIGHTS)
+        self.tag_count_values, self.tag_count_cum = _cumulative(TAGS_PER_TASK_WEIGHTS)
+
+    def uuid(self) -> str:
+        return str(UUID(int=self.rng.getrandbits(128), version=4))
+
+    def timestamp(self) -> str:
+        offset = self.rng.random() * HISTORY_DAYS * 86400
+        return (REFERENCE_DATE - timedelta(seconds=offset)).isoformat(sep=" ")
+
+    def tasks_for_user(self, mean: int) -> int:
+        value = mean * self.rng.paretovariate(PARETO_ALPHA) / PARETO_MEAN
+        return min(int(value), mean * MAX_TASKS_FACTOR)
+
+    def status(self) -> str:
+        return self.rng.choices(self.status_values, cum_weights=self.status_cum)[0]
+
+    def priority(self) -> str:
+        return self.rng.choices(self.priority_values, cum_weights=self.priority_cum)[0]
+
+    def task_tag_indexes(self, tag_total: int) -> set:
+        """Elige tags con sesgo hacia los primeros (los más populares)."""
+        count = self.rng.choices(self.tag_count_values, cum_weights=self.tag_count_cum)[0]
+        count = min(count, tag_total)
+        chosen = set()
+        while len(chosen) < count:
+            chosen.add(int(tag_total * self.rng.random() ** 3))
+        return chosen
+
+    def title(self, index: int) -> str:
+        return f"{self.rng.choice(TITLE_VERBS)} {self.rng.choice(TITLE_NOUNS)} #{index}"
+
+
+def _copy(cursor, table: str, columns: Sequence[str], buffer: io.StringIO) -> None:
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+
+def generate_synthetic_data(
+    engine: Engine,
+    db: Session,
+    config: SyntheticConfig,
+    log=print,
+) -> SyntheticStats:
+    """
+    Genera datos sintéticos sobre una base de datos sin datos sintéticos previos.
+
+    Las filas se escriben con COPY en una única transacción; si algo falla no
+    queda nada a medias.
+    """
+    started = time.perf_counter()
+    stats = SyntheticStats()
+    gen = _Generator(config.seed)
+
+    seed_initial_data(db)
+    role = db.query(Role).filter(Role.name == "user").first()
+    first_username = "user_00000000"
+    if db.query(User).filter(User.username == first_username).first():
+        raise RuntimeError("La base de datos ya contiene datos sintéticos")
+    db.close()
+
+    # Un único hash Argon2 compartido por todos los usuarios sintéticos
+    password_hash = hash_password(SYNTHETIC_PASSWORD)
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+
+        # ---------- TAGS ----------
+        tag_ids = []
+        buffer = io.StringIO()
+        for i in range(config.tags):
+            tag_id = gen.uuid()
+            tag_ids.append(tag_id)
+            name = f"{TAG_WORDS[i % len(TAG_WORDS)]}-{i:05d}"
+            buffer.write(f"{tag_id}\t{name}\t{gen.timestamp()}\tsynthetic\n")
+        _copy(cursor, "tags", ("id", "name", "created_at", "created_by"), buffer)
+        # Como `bump_tag_catalog_version`: los procesos en marcha descartan su catálogo al hacer commit
+        cursor.execute(
+            "INSERT INTO cache_versions (name, version) VALUES (%s, 1) "
+            "ON CONFLICT (name) DO UPDATE SET version = cache_versions.version + 1",
+            (TAG_CATALOG,),
+        )
+        stats.tags = len(tag_ids)
+        log(f"tags: {stats.tags}")
+
+        # ---------- USUARIOS ----------
+        user_ids = []
+        buffer = io.StringIO()
+        for i in range(config.users):
+            user_id = gen.uuid()
+            user_ids.append(user_id)
+            username = f"user_{i:08d}"
+            is_active = "f" if gen.rng.random() < 0.05 else "t"
+            buffer.write(
+                f"{user_id}\tUsuario {i}\t{username}\t{username}@{SYNTHETIC_EMAIL_DOMAIN}\t"
+                f"{password_hash}\t{role.id}\t{is_active}\t{gen.timestamp()}\tsynthetic\n"
+            )
+        _copy(
+            cursor,
+            "users",
+            ("id", "name", "username", "email", "password", "role_id", "is_active", "created_at", "created_by"),
+            buffer,
+        )
+        stats.users = len(user_ids)
+        log(f"usuarios: {stats.users}")
+
+        # ---------- TAREAS Y TASK_TAG ----------
+        task_columns = ("id", "title", "description", "status", "priority", "user_id", "created_at", "created_by")
+        tasks_buffer, tags_buffer = io.StringIO(), io.StringIO()
+        pending = 0
+        for user_id in user_ids:
+            for _ in range(gen.tasks_for_user(config.tasks_per_user)):
+                task_id = gen.uuid()
+                tasks_buffer.write(
+                    f"{task_id}\t{gen.title(stats.tasks)}\t\\N\t{gen.status()}\t{gen.priority()}\t"
+                    f"{user_id}\t{gen.timestamp()}\t{user_id}\n"
+                )
+                for tag_index in gen.task_tag_indexes(len(tag_ids)):
+                    tags_buffer.write(f"{task_id}\t{tag_ids[tag_index]}\t{user_id}\n")
+                    stats.task_tags += 1
+                stats.tasks += 1
+                pending += 1
+
+            if pending >= CHUNK_TASKS:
+                _copy(cursor, "tasks", task_columns, tasks_buffer)
+                _copy(cursor, "task_tag", ("task_id", "tag_id", "user_id"), tags_buffer)
+                tasks_buffer, tags_buffer = io.StringIO(), io.StringIO()
+                pending = 0
+                log(f"tareas: {stats.tasks} ({time.perf_counter() - started:.0f}s)")
+
+        if pending:
+            _copy(cursor, "tasks", task_columns, tasks_buffer)
+            _copy(cursor, "task_tag", ("task_id", "tag_id", "user_id"), tags_buffer)
+
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    stats.seconds = time.perf_counter() - started
+    return stats
+
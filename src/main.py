@@ -1,21 +1,17 @@
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from typing import Iterable, Optional
+
 from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, Response
 from fastapi.exceptions import RequestValidationError
 
-from src.core.config import settings
-from src.api.router import api_router
-
+from src.core.config import get_settings
 
-app = FastAPI(
-    title=settings.PROJECT_NAME,
-    version=settings.PROJECT_VERSION,
-    description="API de gestión de tareas con autenticación JWT",
-    docs_url="/docs",
-    redoc_url="/redoc",
-)
 
-@app.get("/", response_class=HTMLResponse, summary="Página de inicio", tags=["Inicio"])
 def read_root():
+    settings = get_settings()
     return f"""
     <!DOCTYPE html>
     <html lang="es">
@@ -120,7 +116,17 @@ def read_root():
     """
 
 
-@app.exception_handler(RequestValidationError)
+def read_metrics():
+    # Síncrono: con METRICS_MULTIPROC_DIR el render lee y escribe archivos, así
+    # que corre en el threadpool; los gauges del threadpool se leen en el loop
+    from anyio.from_thread import run_sync
+
+    from src.core.metrics import CONTENT_TYPE, collect_runtime, render_metrics
+
+    run_sync(collect_runtime)
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
+
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -131,7 +137,6 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
-@app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -139,4 +144,158 @@ async def general_exception_handler(request: Request, exc: Exception):
     )
 
 
-app.include_router(api_router)
\ No newline at end of file
+async def database_timeout_handler(request: Request, exc: Exception):
+    """
+    Deadline vencido (statement_timeout o antes de empezar otra transacción):
+    504. Espera por un lock agotada (lock_timeout): 503 con `Retry-After`.
+    Los demás errores de la base de datos siguen como error interno.
+    """
+    from src.core.metrics import DB_TIMEOUTS
+    from src.db.session import DB_TIMEOUT_KINDS, DeadlineExceeded
+
+    if isinstance(exc, DeadlineExceeded):
+        kind = "deadline"
+    else:
+        kind = DB_TIMEOUT_KINDS.get(getattr(exc.orig, "pgcode", None))
+        if kind is None:
+            raise exc
+    route = request.scope.get("route")
+    DB_TIMEOUTS.inc(route.path if route is not None else "unmatched", kind)
+    if kind == "lock":
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Recurso bloqueado por otra operación; reintente más tarde"},
+            headers={"Retry-After": "1"},
+        )
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": "La operación superó el tiempo máximo del request"},
+    )
+
+
+def prepare_app(app: FastAPI) -> None:
+    """
+    Carga los modelos, configura los mappers y registra los routers, sin
+    tocar la base de datos. Idempotente: `src.serve` lo llama en el proceso
+    maestro antes del fork para que los workers compartan el resultado.
+    """
+    from sqlalchemy.orm import configure_mappers
+
+    from src.api.router import build_api_router
+    from src.db.base import load_models
+
+    load_models()
+    configure_mappers()
+    if not app.state.routers_loaded:
+        app.include_router(build_api_router(app.state.enabled_routers))
+        app.openapi_schema = None
+        app.state.routers_loaded = True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Crea el engine y registra los routers al arrancar, no al importar."""
+    from src.db.session import init_engine, dispose_engine
+
+    init_engine()
+    prepare_app(app)
+    if app.state.warmup_connections:
+        from src.core.warmup import warm_up
+
+        warm_up(app, app.state.warmup_connections)
+
+    settings = get_settings()
+    snapshot_writer = None
+    if settings.METRICS_ENABLED and settings.METRICS_MULTIPROC_DIR:
+        from src.core.metrics import run_snapshot_writer
+
+        snapshot_writer = asyncio.create_task(
+            run_snapshot_writer(settings.METRICS_MULTIPROC_DIR, settings.METRICS_FLUSH_SECONDS)
+        )
+    yield
+    if snapshot_writer is not None:
+        snapshot_writer.cancel()
+    if "src.services.task_events" in sys.modules:
+        sys.modules["src.services.task_events"].shutdown_task_event_broker()
+    if "src.services.audit_log" in sys.modules:
+        sys.modules["src.services.audit_log"].shutdown_audit_log()
+    dispose_engine()
+
+
+def create_app(enabled_routers: Optional[Iterable[str]] = None) -> FastAPI:
+    """
+    Factory de la aplicación.
+
+    - **enabled_routers**: Routers a montar (por defecto `ENABLED_ROUTERS` de la configuración)
+    """
+    from sqlalchemy.exc import DBAPIError
+
+    from src.db.session import DeadlineExceeded
+
+    settings = get_settings()
+
+    app = FastAPI(
+        title=settings.PROJECT_NAME,
+        version=settings.PROJECT_VERSION,
+        description="API de gestión de tareas con autenticación JWT",
+        docs_url="/docs",
+        redoc_url="/redoc",
+        lifespan=lifespan,
+    )
+    app.state.enabled_routers = list(
+        enabled_routers if enabled_routers is not None else settings.ENABLED_ROUTERS
+    )
+    app.state.routers_loaded = False
+    # Precalentamiento al arrancar (lo activa `src.serve`)
+    app.state.warmup_connections = 0
+
+    app.add_api_route(
+        "/",
+        read_root,
+        methods=["GET"],
+        response_class=HTMLResponse,
+        summary="Página de inicio",
+        tags=["Inicio"],
+    )
+    app.add_exception_handler(RequestValidationError, validation_exception_handler)
+    app.add_exception_handler(DBAPIError, database_timeout_handler)
+    app.add_exception_handler(DeadlineExceeded, database_timeout_handler)
+    app.add_exception_handler(Exception, general_exception_handler)
+
+    if settings.RATE_LIMIT_ENABLED and settings.RATE_LIMITS:
+        # Antes que el de métricas, que así también cuenta los 429
+        from src.core.rate_limit import RateLimitMiddleware
+
+        app.add_middleware(RateLimitMiddleware)
+
+    if settings.METRICS_ENABLED:
+        from src.core.metrics import MetricsMiddleware
+
+        app.add_api_route(
+            "/metrics",
+            read_metrics,
+            methods=["GET"],
+            include_in_schema=False,
+        )
+        app.add_middleware(MetricsMiddleware)
+
+    if settings.TRACE_SAMPLE_RATE > 0:
+        from src.core.tracing import TracingMiddleware, install_sql_tracing
+
+        app.add_middleware(TracingMiddleware)
+        install_sql_tracing()
+
+    return app
+
+
+_app: Optional[FastAPI] = None
+
+
+def __getattr__(name: str):
+    # `uvicorn src.main:app` crea la aplicación en el primer acceso
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, ForeignKey, Index
+from sqlalchemy import Table, Column, ForeignKey, ForeignKeyConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 
 from src.db.base import Base
@@ -12,12 +12,36 @@ permission_role = Table(
     Index("idx_permission_role_permission_id", "permission_id"),
 )
 
+# `user_id` repite el dueño de la tarea: permite particionar task_tag igual que
+# tasks y que las consultas por usuario poden particiones en ambas tablas.
 task_tag = Table(
     "task_tag",
     Base.metadata,
-    Column("task_id", UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True),
+    Column("task_id", UUID(as_uuid=True), primary_key=True),
     Column("tag_id", UUID(as_uuid=True), ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Column("user_id", UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    ForeignKeyConstraint(
+        ["task_id", "user_id"],
+        ["tasks.id", "tasks.user_id"],
+        ondelete="CASCADE",
+        name="task_tag_task_id_user_id_fkey",
+    ),
     Index("idx_task_tag_task_id", "task_id"),
     Index("idx_task_tag_tag_id", "tag_id"),
 )
 
+# Tags de las tareas archivadas (tasks_archive)
+task_tag_archive = Table(
+    "task_tag_archive",
+    Base.metadata,
+    Column("task_id", UUID(as_uuid=True), primary_key=True),
+    Column("tag_id", UUID(as_uuid=True), ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Column("user_id", UUID(as_uuid=True), primary_key=True),
+    ForeignKeyConstraint(
+        ["task_id", "user_id"],
+        ["tasks_archive.id", "tasks_archive.user_id"],
+        ondelete="CASCADE",
+        name="task_tag_archive_task_id_user_id_fkey",
+    ),
+)
+
@@ -0,0 +1,29 @@
+from uuid import uuid4
+from sqlalchemy import Column, DateTime, Index, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from src.db.base import Base
+
+
+class AuditEvent(Base):
+    """
+    Evento de auditoría (solo inserción).
+
+    La tabla está particionada por mes sobre `occurred_at`; por eso la clave
+    primaria incluye la columna de partición. Las particiones se crean con
+    `maintain_audit_partitions`.
+    """
+    __tablename__ = "audit_events"
+    __table_args__ = {"postgresql_partition_by": "RANGE (occurred_at)"}
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    occurred_at = Column(DateTime, primary_key=True, nullable=False)
+    actor_id = Column(String(100), nullable=True)
+    action = Column(String(50), nullable=False)
+    entity_type = Column(String(50), nullable=False)
+    entity_id = Column(String(100), nullable=False)
+    changes = Column(JSONB, nullable=True)
+
+
+Index("idx_audit_event_entity", AuditEvent.entity_type, AuditEvent.entity_id, AuditEvent.occurred_at)
+Index("idx_audit_event_actor_id", AuditEvent.actor_id, AuditEvent.occurred_at)
@@ -0,0 +1,29 @@
+from sqlalchemy import BigInteger, Column, ForeignKey, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from src.db.base import Base
+
+
+class CacheVersion(Base):
+    """
+    Versión global de un conjunto de datos cacheado en los procesos (p. ej. el
+    catálogo de tags). Se incrementa en la misma transacción que el cambio,
+    así que ningún proceso ve la versión nueva antes que los datos nuevos.
+    """
+    __tablename__ = "cache_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, server_default="0")
+
+
+class TaskListVersion(Base):
+    """
+    Versión de las tareas de un usuario, parte de la clave de sus páginas de
+    `GET /tasks` en caché. Se incrementa en la misma transacción que cada
+    cambio. Tabla propia para no reescribir ni bloquear la fila de `users`
+    en cada escritura de tareas; se lee con el usuario (`User.task_list_version`).
+    """
+    __tablename__ = "task_list_versions"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(BigInteger, nullable=False, server_default="0")
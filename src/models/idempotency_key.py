@@ -0,0 +1,29 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.sql import func
+
+from src.db.base import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Primera respuesta a un request con header `Idempotency-Key`, por usuario
+    y clave. Mientras el request original se ejecuta `status_code` es NULL y
+    `locked_until` acota cuánto se lo considera en curso; vence en
+    `expires_at` (`IDEMPOTENCY_KEY_TTL_SECONDS`).
+    """
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    # sha256 de método, ruta, query y cuerpo del request original
+    fingerprint = Column(String(64), nullable=False)
+    # Aleatorio por reserva: el request que la tomó solo completa o libera
+    # la suya, no la de un duplicado que la tomó al vencer `locked_until`
+    claim_token = Column(String(32), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response_headers = Column(JSONB, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    locked_until = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -15,4 +15,4 @@ class Role(Base, AuditMixin):
     name = Column(String(50), nullable=False, unique=True)
 
     permissions = relationship("Permission", secondary=permission_role, back_populates="roles", lazy="selectin")
-    users = relationship("User", back_populates="role", lazy="selectin")
+    users = relationship("User", back_populates="role", lazy="select")
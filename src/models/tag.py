@@ -14,9 +14,8 @@ class Tag(Base, AuditMixin):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     name = Column(String(50), nullable=False, unique=True)
 
-    tasks = relationship("Task", secondary=task_tag, back_populates="tags", lazy="selectin")
+    tasks = relationship("Task", secondary=task_tag, back_populates="tags", lazy="select")
 
     __table_args__ = (
         Index("ix_tags_name", "name"),
-        Index("ix_tags_created_at", "created_at"),
     )
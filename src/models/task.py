@@ -1,14 +1,17 @@
 from uuid import uuid4
 from enum import Enum
-from sqlalchemy import Column, String, Text, Enum as SQLEnum, ForeignKey, Index
+from sqlalchemy import Column, String, Text, Integer, BigInteger, Enum as SQLEnum, ForeignKey, Index, Sequence, cast, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import UserDefinedType
 
 from src.db.base import Base
 from src.models.association import task_tag
 from src.models.mixins import AuditMixin
 
 
+# El orden de declaración de los enums es su orden en Postgres (low < medium <
+# high), así que ordenar por prioridad o estado usa índices sin columna de rango.
 class TaskStatus(str, Enum):
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
@@ -21,6 +24,34 @@ class TaskPriority(str, Enum):
     HIGH = "high"
 
 
+# Secuencia global de cambios: cada INSERT/UPDATE de una tarea (y cada
+# tombstone de borrado) toma el siguiente valor, usado por el feed de cambios.
+task_change_seq = Sequence("task_change_seq", metadata=Base.metadata)
+
+
+class XID8(UserDefinedType):
+    """Id de transacción de 64 bits de Postgres (`xid8`), leído como int."""
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        return "xid8"
+
+    def bind_processor(self, dialect):
+        return lambda value: None if value is None else str(value)
+
+    def bind_expression(self, bindvalue):
+        return cast(bindvalue, self)
+
+    def result_processor(self, dialect, coltype):
+        return lambda value: None if value is None else int(value)
+
+
+# Transacción que escribió la fila. `change_seq` se toma al ejecutar la
+# sentencia y no al hacer commit; el feed ordena por (change_xid, change_seq)
+# para no saltarse transacciones que confirman tarde (ver `TaskService.get_changes`).
+current_xact_id = func.pg_current_xact_id(type_=XID8())
+
+
 class Task(Base, AuditMixin):
     __tablename__ = "tasks"
 
@@ -29,11 +60,40 @@ class Task(Base, AuditMixin):
     description = Column(Text, nullable=True)
     status = Column(SQLEnum(TaskStatus), nullable=False, default=TaskStatus.PENDING)
     priority = Column(SQLEnum(TaskPriority), nullable=False, default=TaskPriority.MEDIUM)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Parte de la clave primaria para poder particionar por usuario: así las
+    # cargas, UPDATE y DELETE del ORM filtran también por user_id
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    version = Column(Integer, nullable=False, server_default="1")
+    change_seq = Column(
+        BigInteger,
+        nullable=False,
+        server_default=task_change_seq.next_value(),
+        onupdate=task_change_seq.next_value(),
+    )
+    change_xid = Column(XID8(), nullable=False, server_default=current_xact_id, onupdate=current_xact_id)
 
     user = relationship("User", back_populates="tasks")
     tags = relationship("Tag", secondary=task_tag, back_populates="tasks", lazy="selectin")
 
+    __mapper_args__ = {"version_id_col": version}
+
+
+# Última modificación: updated_at es NULL hasta el primer cambio
+task_modified_at = func.coalesce(Task.updated_at, Task.created_at)
 
-Index("idx_task_user_id_status", Task.user_id, Task.status)
+# Un índice por criterio de orden del listado, con user_id al frente; los de
+# estado y prioridad sirven también el filtro por ese campo con orden por fecha.
+Index("idx_task_user_id_created_at", Task.user_id, Task.created_at)
+Index("idx_task_user_id_modified_at", Task.user_id, task_modified_at)
+Index("idx_task_user_id_status_created_at", Task.user_id, Task.status, Task.created_at)
+Index("idx_task_user_id_priority_created_at", Task.user_id, Task.priority, Task.created_at)
 Index("idx_task_priority", Task.priority)
+# Candidatas al archivado: completadas, por antigüedad de su último cambio
+Index(
+    "idx_task_completed_modified_at",
+    task_modified_at,
+    postgresql_where=Task.status == TaskStatus.COMPLETED,
+)
+Index("idx_task_user_id_change_xid_seq", Task.user_id, Task.change_xid, Task.change_seq)
@@ -0,0 +1,41 @@
+from sqlalchemy import Column, String, Text, Integer, BigInteger, DateTime, Enum as SQLEnum, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from src.db.base import Base
+from src.models.association import task_tag_archive
+from src.models.task import TaskStatus, TaskPriority
+
+
+class TaskArchive(Base):
+    """
+    Tarea completada movida fuera de `tasks` por el archivado
+    (`TaskService.archive_completed_tasks`). Conserva las columnas de la tarea
+    tal como estaban; es de solo lectura para la API.
+    """
+    __tablename__ = "tasks_archive"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    title = Column(String(200), nullable=False)
+    description = Column(Text, nullable=True)
+    status = Column(SQLEnum(TaskStatus), nullable=False)
+    priority = Column(SQLEnum(TaskPriority), nullable=False)
+    version = Column(Integer, nullable=False)
+    change_seq = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    created_by = Column(String(100), nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+    updated_by = Column(String(100), nullable=True)
+    archived_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    user = relationship("User", viewonly=True)
+    tags = relationship("Tag", secondary=task_tag_archive, lazy="selectin", viewonly=True)
+
+
+Index("idx_task_archive_user_id_created_at", TaskArchive.user_id, TaskArchive.created_at)
+Index(
+    "idx_task_archive_user_id_modified_at",
+    TaskArchive.user_id,
+    func.coalesce(TaskArchive.updated_at, TaskArchive.created_at),
+)
@@ -0,0 +1,30 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from src.db.base import Base
+from src.models.task import XID8, current_xact_id, task_change_seq
+
+
+class TaskTombstone(Base):
+    """
+    Marca de borrado de una tarea para el feed de cambios.
+
+    Solo guarda lo necesario para que un cliente elimine su copia local; se
+    purgan tras `TASK_TOMBSTONE_RETENTION_DAYS`.
+    """
+    __tablename__ = "task_tombstones"
+
+    task_id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    change_seq = Column(BigInteger, nullable=False, server_default=task_change_seq.next_value())
+    change_xid = Column(XID8(), nullable=False, server_default=current_xact_id)
+    deleted_at = Column(DateTime, nullable=False, server_default=func.now(), index=True)
+
+
+Index(
+    "idx_task_tombstone_user_id_change_xid_seq",
+    TaskTombstone.user_id,
+    TaskTombstone.change_xid,
+    TaskTombstone.change_seq,
+)
@@ -4,12 +4,16 @@ from sqlalchemy import (
     String,
     ForeignKey,
     Index,
-    Boolean
+    Boolean,
+    Integer,
+    func,
+    select,
 )
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 
 from src.db.base import Base
+from src.models.cache_version import TaskListVersion
 from src.models.mixins import AuditMixin
 from src.core.security import hash_password, verify_password
 
@@ -60,6 +64,25 @@ class User(Base, AuditMixin):
         nullable=False
     )
 
+    version = Column(
+        Integer,
+        nullable=False,
+        server_default="1"
+    )
+
+    # Se incrementa con cada cambio en las tareas del usuario; invalida las
+    # páginas de GET /tasks en caché. Vive en task_list_versions y se carga
+    # en la misma consulta que el usuario.
+    task_list_version = column_property(
+        func.coalesce(
+            select(TaskListVersion.version)
+            .where(TaskListVersion.user_id == id)
+            .correlate_except(TaskListVersion)
+            .scalar_subquery(),
+            0,
+        )
+    )
+
     role = relationship(
         "Role",
         back_populates="users"
@@ -71,6 +94,8 @@ class User(Base, AuditMixin):
         cascade="all, delete-orphan"
     )
 
+    __mapper_args__ = {"version_id_col": version}
+
     def set_password(self, password: str) -> None:
         """Genera y guarda el hash de la contraseña."""
         self.password = hash_password(password)
@@ -85,3 +110,4 @@ class User(Base, AuditMixin):
 
 
 Index("idx_user_username_email", User.username, User.email)
+Index("idx_user_role_id_is_active", User.role_id, User.is_active)
@@ -0,0 +1,46 @@
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SubRequest(BaseModel):
+    """Schema de una sub-petición del lote."""
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    path: str = Field(..., min_length=1, description="Ruta con query string, p. ej. /tasks?page=1")
+    body: Optional[Any] = Field(None, description="Cuerpo JSON")
+    headers: Dict[str, str] = Field(default={}, description="Headers adicionales, p. ej. If-Match")
+
+
+class BatchRequest(BaseModel):
+    """Schema para ejecutar varias peticiones en un solo round trip."""
+    requests: List[SubRequest] = Field(..., min_length=1)
+    atomic: bool = Field(
+        False,
+        description="Ejecutar todo en una transacción: si una sub-petición falla, se revierte el lote",
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "requests": [
+                    {"method": "GET", "path": "/tasks?page=1"},
+                    {"method": "GET", "path": "/tags"},
+                    {"method": "POST", "path": "/tasks", "body": {"title": "Nueva"}},
+                ],
+                "atomic": False,
+            }
+        }
+    }
+
+
+class SubResponse(BaseModel):
+    """Schema de la respuesta de una sub-petición."""
+    status: int
+    headers: Dict[str, str] = {}
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    """Schema para la respuesta de un lote."""
+    responses: List[SubResponse]
+    rolled_back: bool = Field(False, description="El lote atómico se revirtió por una sub-petición fallida")
@@ -31,6 +31,8 @@ class RoleResponse(RoleBase):
     created_by: Optional[str] = None
     updated_at: Optional[datetime] = None
     updated_by: Optional[str] = None
+    user_count: int = 0
+    active_user_count: int = 0
 
     model_config = {"from_attributes": True}
 
@@ -37,3 +37,6 @@ class TagListResponse(BaseModel):
     """Schema para respuesta de lista de tags."""
     items: List[TagResponse]
     total: int
+    next_cursor: Optional[str] = Field(
+        None, description="Valor de `after` para la página siguiente; null en la última"
+    )
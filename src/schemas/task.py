@@ -76,10 +76,14 @@ class TaskResponse(TaskBase):
     id: UUID
     user: UserInfo
     tags: List[TagInfo] = []
+    version: int
     created_at: datetime
     created_by: Optional[str] = None
     updated_at: Optional[datetime] = None
     updated_by: Optional[str] = None
+    archived_at: Optional[datetime] = Field(
+        default=None, description="Fecha de archivado; solo en tareas archivadas"
+    )
 
     model_config = {"from_attributes": True}
 
@@ -91,3 +95,24 @@ class TaskListResponse(BaseModel):
     page: int
     page_size: int
     total_pages: int
+
+
+class TaskBatchRequest(BaseModel):
+    """Schema para pedir varias tareas por id."""
+    ids: List[UUID] = Field(..., min_length=1, description="IDs de las tareas")
+
+
+class TaskBatchResponse(BaseModel):
+    """Schema para respuesta de tareas pedidas por id."""
+    items: List[TaskResponse]
+    missing: List[UUID] = Field(
+        default=[], description="IDs que no existen o no pertenecen al usuario"
+    )
+
+
+class TaskChangesResponse(BaseModel):
+    """Schema para el feed incremental de cambios de tareas."""
+    items: List[TaskResponse]
+    deleted: List[UUID] = []
+    next_token: str
+    has_more: bool
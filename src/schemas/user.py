@@ -76,6 +76,7 @@ class UserResponse(UserBase):
     id: UUID
     is_active: bool
     role: RoleInfo
+    version: int
     created_at: datetime
     created_by: Optional[str] = None
     updated_at: Optional[datetime] = None
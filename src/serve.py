@@ -0,0 +1,229 @@
+"""
+Servidor de producción: `python -m src.serve`.
+
+El proceso maestro abre el socket y, con precarga, construye la aplicación
+(modelos, mappers, routers y esquema OpenAPI) antes de crear los workers con
+`fork`, que la comparten copy-on-write. Cada worker ejecuta un servidor
+uvicorn sobre el socket heredado. Antes de aceptar conexiones, el worker se
+precalienta (ver `src.core.warmup`). Los pools de base de datos no se
+heredan: `src.db.session` los descarta en el hijo tras el fork.
+
+El maestro reemplaza a los workers que terminan inesperadamente. Con SIGTERM
+o SIGINT detiene a todos y espera a que terminen sus requests en curso.
+
+Uso:
+    python -m src.serve
+    python -m src.serve --workers 8 --port 8000 --no-preload
+"""
+import argparse
+import copy
+import logging
+import logging.config
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Optional
+
+import uvicorn
+from uvicorn.config import LOGGING_CONFIG
+
+from src.core.config import get_settings
+
+logger = logging.getLogger("uvicorn.error")
+
+# Un worker que muere antes de esto se considera un fallo de arranque: se
+# espera antes de reemplazarlo para no entrar en un ciclo de forks
+MIN_WORKER_UPTIME_SECONDS = 1.0
+
+
+def available_cpus() -> int:
+    """Núcleos utilizables por el proceso: afinidad y, en contenedores, cuota de cgroup v2."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def log_config() -> dict:
+    """Configuración de logging de uvicorn, con el precalentamiento en la misma salida."""
+    config = copy.deepcopy(LOGGING_CONFIG)
+    config["loggers"]["src.core.warmup"] = {"handlers": ["default"], "level": "INFO", "propagate": False}
+    return config
+
+
+def build_app(preload: bool):
+    from src.main import create_app, prepare_app
+
+    app = create_app()
+    app.state.warmup_connections = get_settings().SERVE_WARMUP_CONNECTIONS
+    if preload:
+        prepare_app(app)
+        app.openapi()
+    return app
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket, args: argparse.Namespace) -> None:
+    """Cuerpo del proceso hijo: un servidor uvicorn sobre el socket del maestro."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    if app is None:
+        app = build_app(preload=False)
+    config = uvicorn.Config(
+        app,
+        lifespan="on",
+        log_config=log_config(),
+        log_level=args.log_level,
+        timeout_graceful_shutdown=int(args.graceful_timeout),
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn_worker(app, sock: socket.socket, args: argparse.Namespace) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            run_worker(app, sock, args)
+        except BaseException:
+            logger.exception("El worker %d terminó con error", os.getpid())
+            code = 1
+        finally:
+            logging.shutdown()
+            os._exit(code)
+    return pid
+
+
+def stop_workers(workers: Dict[int, float], timeout: float) -> None:
+    """SIGTERM a los workers (apagado ordenado) y SIGKILL a los que no terminen a tiempo."""
+    for pid in workers:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    deadline = time.monotonic() + timeout
+    while workers and time.monotonic() < deadline:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            workers.pop(pid, None)
+        else:
+            time.sleep(0.1)
+    for pid in workers:
+        logger.warning("El worker %d no terminó a tiempo; se fuerza su salida", pid)
+        try:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            pass
+
+
+def serve(args: argparse.Namespace) -> None:
+    logging.config.dictConfig(log_config())
+    logger.setLevel(args.log_level.upper())
+
+    sock = bind_socket(args.host, args.port)
+    app: Optional[object] = None
+    if args.preload:
+        started = time.perf_counter()
+        app = build_app(preload=True)
+        logger.info("Aplicación precargada en %.0f ms", (time.perf_counter() - started) * 1000)
+
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    logger.info(
+        "Maestro %d escuchando en %s:%d con %d workers", os.getpid(), args.host, args.port, args.workers
+    )
+    settings = get_settings()
+    if args.workers > 1 and settings.DB_REPLICA_URLS and settings.CACHE_BACKEND == "memory":
+        logger.warning(
+            "Con CACHE_BACKEND=memory la ventana de lectura-de-tus-escrituras es por worker; "
+            "use CACHE_BACKEND=redis para compartirla"
+        )
+    workers: Dict[int, float] = {}
+    for _ in range(args.workers):
+        workers[spawn_worker(app, sock, args)] = time.monotonic()
+
+    while not stopping:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            pid, status = 0, 0
+        if not pid:
+            time.sleep(0.5)
+            continue
+        started_at = workers.pop(pid, None)
+        if started_at is None or stopping:
+            continue
+        logger.warning("El worker %d terminó (estado %d); se reemplaza", pid, status)
+        if time.monotonic() - started_at < MIN_WORKER_UPTIME_SECONDS:
+            time.sleep(MIN_WORKER_UPTIME_SECONDS)
+        workers[spawn_worker(app, sock, args)] = time.monotonic()
+
+    logger.info("Deteniendo %d workers", len(workers))
+    stop_workers(workers, args.graceful_timeout + 5)
+    sock.close()
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default=settings.SERVE_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVE_PORT)
+    parser.add_argument(
+        "--workers", type=int, default=settings.SERVE_WORKERS or available_cpus(),
+        help="Procesos worker (default: SERVE_WORKERS o uno por núcleo disponible)",
+    )
+    parser.add_argument(
+        "--preload", action=argparse.BooleanOptionalAction, default=settings.SERVE_PRELOAD,
+        help="Construir la aplicación en el maestro antes del fork (default: SERVE_PRELOAD)",
+    )
+    parser.add_argument(
+        "--graceful-timeout", type=float, default=settings.SERVE_GRACEFUL_TIMEOUT_SECONDS,
+        help="Segundos de espera a los requests en curso al detener los workers",
+    )
+    parser.add_argument("--log-level", default="info", choices=["critical", "error", "warning", "info", "debug"])
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers debe ser al menos 1")
+
+    if not hasattr(os, "fork"):
+        # Sin fork (Windows): un solo proceso
+        logging.config.dictConfig(log_config())
+        run_worker(build_app(args.preload), bind_socket(args.host, args.port), args)
+        return
+    serve(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+"""
+Registro de auditoría asíncrono y por lotes.
+
+Los servicios llaman a `audit()` dentro de su transacción; tras el commit el
+evento entra en una cola en memoria y un hilo de fondo lo inserta en
+`audit_events` en lotes (`AUDIT_BATCH_SIZE` eventos o cada
+`AUDIT_FLUSH_INTERVAL_SECONDS`). El request nunca espera a la base de datos
+de auditoría: si la cola está llena, o si un lote no se puede insertar, los
+eventos se vuelcan a `AUDIT_SPILL_PATH` (JSONL) o se descartan y se cuentan.
+El request tampoco escribe ese archivo: con la cola llena el evento pasa a una
+segunda cola que vacía un hilo de volcado propio.
+Los eventos volcados se reinsertan con
+`python -m src.db.init_db replay-audit-spill`.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import date, datetime, timezone
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from src.core.config import get_settings
+from src.db.partitions import ensure_monthly_partition, maintain_monthly_partitions, month_start
+from src.db.session import get_engine, run_after_commit
+from src.models.audit_event import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+
+def ensure_audit_partition(conn: Connection, month: date) -> None:
+    """Crea la partición mensual de `month` si no existe."""
+    ensure_monthly_partition(conn, "audit_events", month)
+
+
+def maintain_audit_partitions(
+    conn: Connection,
+    months_ahead: int = 2,
+    retain_months: Optional[int] = None,
+) -> List[str]:
+    """Particiones mensuales de audit_events; ver `maintain_monthly_partitions`."""
+    return maintain_monthly_partitions(conn, "audit_events", months_ahead, retain_months)
+
+
+class AuditLog:
+    """Cola de eventos de auditoría con volcado por lotes en un hilo de fondo."""
+
+    def __init__(
+        self,
+        queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        spill_path: Optional[str] = None,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+        self.dropped = 0
+        self.spilled = 0
+        self.written = 0
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(queue_size)
+        self._spill_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(queue_size)
+        self._lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._spill_thread: Optional[threading.Thread] = None
+        self._months: Set[date] = set()
+        self._partitions_ready = False
+
+    def record(self, audit_event: Dict[str, Any]) -> None:
+        """Encola un evento sin bloquear; si la cola está llena lo vuelca o descarta."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(audit_event)
+        except queue.Full:
+            self._reject(audit_event)
+
+    def _reject(self, audit_event: Dict[str, Any]) -> None:
+        """Cola llena, en el hilo del request: se deja al hilo de volcado o se cuenta como descartado."""
+        if self.spill_path:
+            try:
+                self._spill_queue.put_nowait(audit_event)
+                return
+            except queue.Full:
+                pass
+        self._count_dropped(1)
+
+    def _count_dropped(self, count: int) -> None:
+        with self._counter_lock:
+            self.dropped += count
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    if self.spill_path:
+                        self._spill_thread = threading.Thread(
+                            target=self._run_spill, name="audit-log-spill", daemon=True
+                        )
+                        self._spill_thread.start()
+                    self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set() or not self._queue.empty():
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+
+    def _run_spill(self) -> None:
+        while not self._stop.is_set() or not self._spill_queue.empty():
+            batch = self._collect(self._spill_queue)
+            if batch:
+                self._overflow(batch)
+
+    def _collect(self, source: Optional["queue.Queue[Dict[str, Any]]"] = None) -> List[Dict[str, Any]]:
+        """Espera hasta llenar un lote o hasta que venza el intervalo de volcado."""
+        source = self._queue if source is None else source
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (self._stop.is_set() and source.empty()):
+                break
+            try:
+                batch.append(source.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            if not self._partitions_ready:
+                # Particiones por adelantado en su propia transacción, para que
+                # los lotes casi nunca tengan que crear una
+                with get_engine().begin() as conn:
+                    maintain_audit_partitions(conn)
+                self._partitions_ready = True
+            with get_engine().begin() as conn:
+                self._ensure_partitions(conn, batch)
+                conn.execute(insert(AuditEvent), batch)
+            self.written += len(batch)
+        except Exception:
+            logger.exception("No se pudo escribir un lote de auditoría (%d eventos)", len(batch))
+            self._months.clear()
+            self._partitions_ready = False
+            self._overflow(batch)
+
+    def _ensure_partitions(self, conn: Connection, batch: Iterable[Dict[str, Any]]) -> None:
+        for month in {month_start(audit_event["occurred_at"].date()) for audit_event in batch} - self._months:
+            ensure_audit_partition(conn, month)
+            self._months.add(month)
+
+    def _overflow(self, events: List[Dict[str, Any]]) -> None:
+        """Vuelca eventos al archivo; solo desde los hilos de escritura y de volcado."""
+        if not self.spill_path:
+            self._count_dropped(len(events))
+            return
+        lines = "".join(json.dumps(audit_event, default=str) + "\n" for audit_event in events)
+        try:
+            with self._spill_lock, open(self.spill_path, "a", encoding="utf-8") as spill:
+                spill.write(lines)
+        except OSError:
+            logger.exception("No se pudo volcar la auditoría a %s", self.spill_path)
+            self._count_dropped(len(events))
+            return
+        with self._counter_lock:
+            self.spilled += len(events)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Vacía las colas y detiene los hilos de escritura y de volcado."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._spill_thread is not None:
+            self._spill_thread.join(timeout)
+            self._spill_thread = None
+
+
+def audit(
+    db: Session,
+    action: str,
+    entity_type: str,
+    entity_id: Any,
+    actor_id: Any = None,
+    changes: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Registra una mutación (p. ej. `audit(db, "update", "task", task_id, user_id, {...})`).
+
+    El evento se encola solo si la transacción actual de `db` hace commit.
+    """
+    audit_log = get_audit_log()
+    if audit_log is None:
+        return
+    audit_event = {
+        "id": uuid4(),
+        "occurred_at": datetime.now(timezone.utc).replace(tzinfo=None),
+        "actor_id": str(actor_id) if actor_id is not None else None,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": str(entity_id),
+        "changes": json.loads(json.dumps(changes, default=str)) if changes else None,
+    }
+    run_after_commit(db, partial(audit_log.record, audit_event))
+
+
+def read_spill(path: str, batch_size: int = 1000) -> Iterable[List[Dict[str, Any]]]:
+    """Lee un archivo de volcado en lotes listos para insertar."""
+    batch: List[Dict[str, Any]] = []
+    with open(path, encoding="utf-8") as spill:
+        for line in spill:
+            if not line.strip():
+                continue
+            audit_event = json.loads(line)
+            audit_event["id"] = UUID(audit_event["id"])
+            audit_event["occurred_at"] = datetime.fromisoformat(audit_event["occurred_at"])
+            batch.append(audit_event)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def replay_spill(path: str) -> Tuple[int, str]:
+    """
+    Inserta los eventos de un archivo de volcado. El archivo se renombra antes
+    de leerlo para que los volcados nuevos vayan a un archivo aparte; si la
+    inserción termina bien, se elimina. Retorna (eventos, archivo procesado).
+    """
+    processing = f"{path}.{int(time.time())}.replay"
+    os.replace(path, processing)
+    total = 0
+    months: Set[date] = set()
+    with get_engine().begin() as conn:
+        for batch in read_spill(processing):
+            for month in {month_start(audit_event["occurred_at"].date()) for audit_event in batch} - months:
+                ensure_audit_partition(conn, month)
+                months.add(month)
+            # Un reintento no debe duplicar eventos ya insertados
+            conn.execute(pg_insert(AuditEvent).on_conflict_do_nothing(), batch)
+            total += len(batch)
+    os.remove(processing)
+    return total, processing
+
+
+_audit_log: Optional[AuditLog] = None
+_audit_log_lock = threading.Lock()
+
+
+def get_audit_log() -> Optional[AuditLog]:
+    """Retorna el registro de auditoría del proceso, o None si está deshabilitado."""
+    global _audit_log
+    settings = get_settings()
+    if not settings.AUDIT_LOG_ENABLED:
+        return None
+    if _audit_log is None:
+        with _audit_log_lock:
+            if _audit_log is None:
+                _audit_log = AuditLog(
+                    queue_size=settings.AUDIT_QUEUE_SIZE,
+                    batch_size=settings.AUDIT_BATCH_SIZE,
+                    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+                    spill_path=settings.AUDIT_SPILL_PATH,
+                )
+    return _audit_log
+
+
+def shutdown_audit_log() -> None:
+    """Vuelca los eventos pendientes y olvida el registro."""
+    global _audit_log
+    with _audit_log_lock:
+        if _audit_log is not None:
+            _audit_log.close()
+            _audit_log = None
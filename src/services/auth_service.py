@@ -5,8 +5,10 @@ from sqlalchemy.orm import Session
 
 from src.models.user import User
 from src.core.security import verify_password, create_access_token
+from src.core.tracing import traced_service
 
 
+@traced_service
 class AuthService:
     """Servicio de autenticación."""
     
@@ -0,0 +1,120 @@
+"""
+Cachés de resultados de consultas.
+
+Backends (`CACHE_BACKEND`):
+- `memory`: LRU en memoria por proceso, con vigencia por entrada.
+- `redis`: almacén compartido entre workers (`CACHE_REDIS_URL`); requiere el
+  paquete `redis`, que no forma parte de las dependencias base.
+
+Los valores deben ser serializables a JSON. Las claves incluyen un número de
+versión que el servicio incrementa en cada escritura, así que una entrada
+obsoleta nunca se vuelve a leer; la vigencia solo acota la memoria.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src.core.config import get_settings
+from src.core.metrics import CACHE_REQUESTS
+
+
+class MemoryCache:
+    """LRU en memoria con vigencia por entrada."""
+
+    def __init__(self, name: str, max_entries: int, ttl: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                CACHE_REQUESTS.inc(self.name, "hit")
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+        CACHE_REQUESTS.inc(self.name, "miss")
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    """Caché compartida en Redis; las entradas vencen con `EX`."""
+
+    def __init__(self, name: str, url: str, ttl: float):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("CACHE_BACKEND=redis requiere el paquete 'redis' (pip install redis)") from exc
+        if not url:
+            raise RuntimeError("CACHE_BACKEND=redis requiere CACHE_REDIS_URL")
+        self.name = name
+        self.ttl = ttl
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._client.get(f"{self.name}:{key}")
+        CACHE_REQUESTS.inc(self.name, "hit" if raw is not None else "miss")
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any) -> None:
+        self._client.set(f"{self.name}:{key}", json.dumps(value), ex=max(int(self.ttl), 1))
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(f"{self.name}:*"):
+            self._client.delete(key)
+
+
+_caches: Dict[str, Any] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, max_entries: int, ttl: float):
+    """Retorna la caché `name` del proceso según `CACHE_BACKEND`."""
+    cache = _caches.get(name)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(name)
+            if cache is None:
+                settings = get_settings()
+                if settings.CACHE_BACKEND == "redis":
+                    cache = RedisCache(name, settings.CACHE_REDIS_URL, ttl)
+                else:
+                    cache = MemoryCache(name, max_entries, ttl)
+                _caches[name] = cache
+    return cache
+
+
+def get_tag_catalog_cache() -> MemoryCache:
+    """Catálogo de tags completo, siempre en memoria del proceso (una entrada por versión)."""
+    cache = _caches.get("tag_catalog")
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.setdefault(
+                "tag_catalog", MemoryCache("tag_catalog", 2, get_settings().TAG_CATALOG_CACHE_TTL_SECONDS)
+            )
+    return cache
+
+
+def get_task_list_cache() -> Optional[Any]:
+    """Caché de páginas de `GET /tasks`, o None si está deshabilitada."""
+    settings = get_settings()
+    if not settings.TASK_LIST_CACHE_ENABLED:
+        return None
+    return get_cache("task_list", settings.TASK_LIST_CACHE_MAX_ENTRIES, settings.TASK_LIST_CACHE_TTL_SECONDS)
@@ -0,0 +1,6 @@
+class VersionConflictError(Exception):
+    """La versión esperada (If-Match) no coincide con la versión actual del registro."""
+
+    def __init__(self, current_version: int):
+        super().__init__(f"Versión actual: {current_version}")
+        self.current_version = current_version
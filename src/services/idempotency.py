@@ -0,0 +1,105 @@
+from datetime import timedelta
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, delete, func, or_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from src.core.config import get_settings
+from src.models.idempotency_key import IdempotencyKey
+
+
+class IdempotencyService:
+    """
+    Claves `Idempotency-Key` en `idempotency_keys`. Cada operación es una
+    transacción corta propia, independiente de la del request que protege.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def claim(self, user_id: UUID, key: str, fingerprint: str, token: str) -> Optional[IdempotencyKey]:
+        """
+        Reserva la clave con `token` para ejecutar el request. Retorna None si
+        la reservó (no existía, venció o su ejecución quedó abandonada) o el
+        registro existente si otro request ya la tiene.
+        """
+        settings = get_settings()
+        stmt = pg_insert(IdempotencyKey).values(
+            user_id=user_id,
+            key=key,
+            fingerprint=fingerprint,
+            claim_token=token,
+            locked_until=func.now() + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS),
+            expires_at=func.now() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+            set_={
+                "fingerprint": stmt.excluded.fingerprint,
+                "claim_token": stmt.excluded.claim_token,
+                "status_code": None,
+                "response_headers": None,
+                "response_body": None,
+                "created_at": func.now(),
+                "locked_until": stmt.excluded.locked_until,
+                "expires_at": stmt.excluded.expires_at,
+            },
+            where=or_(
+                IdempotencyKey.expires_at < func.now(),
+                and_(IdempotencyKey.status_code.is_(None), IdempotencyKey.locked_until < func.now()),
+            ),
+        ).returning(IdempotencyKey.key)
+        claimed = self.db.execute(stmt).scalar() is not None
+        self.db.commit()
+        if claimed:
+            return None
+        return self.db.query(IdempotencyKey).filter(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+        ).populate_existing().first()
+
+    def complete(
+        self, user_id: UUID, key: str, token: str, status_code: int, headers: Dict[str, str], body: bytes
+    ) -> None:
+        """
+        Guarda la respuesta del request que reservó la clave con `token`. Si
+        otro request la reservó después, no la modifica.
+        """
+        self.db.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.claim_token == token,
+            )
+            .values(status_code=status_code, response_headers=headers, response_body=body)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+
+    def release(self, user_id: UUID, key: str, token: str) -> None:
+        """Libera la reserva `token` sin respuesta, para que un reintento se ejecute."""
+        self.db.execute(
+            delete(IdempotencyKey)
+            .where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.claim_token == token,
+                IdempotencyKey.status_code.is_(None),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+
+    def purge_expired(self) -> int:
+        """Elimina las claves vencidas. Retorna cuántas borró."""
+        result = self.db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < func.now()))
+        self.db.commit()
+        return result.rowcount
+
+
+def get_idempotency_service(db: Session) -> IdempotencyService:
+    """Factory para crear IdempotencyService."""
+    return IdempotencyService(db)
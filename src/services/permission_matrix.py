@@ -0,0 +1,125 @@
+import time
+from threading import Lock
+from typing import Dict, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+
+from src.core.config import get_settings
+from src.core.metrics import CACHE_REQUESTS
+from src.models.association import permission_role
+from src.models.permission import Permission
+from src.models.role import Role
+
+
+class _Compiled(NamedTuple):
+    """Resultado de una compilación; se publica entero con una sola asignación."""
+    bits: Dict[str, int]
+    role_masks: Dict[UUID, int]
+    role_names: Dict[UUID, str]
+
+
+class PermissionMatrix:
+    """
+    Matriz rol -> permisos compilada en memoria.
+
+    Cada permiso recibe un bit y cada rol una máscara con los bits de sus
+    permisos, así que verificar un permiso es una operación AND sin acceso a
+    la base de datos. La matriz se reconstruye en la siguiente verificación
+    tras `invalidate()` (llamado por los servicios que cambian roles o
+    permisos) o al vencer `ttl` segundos, para que otros procesos converjan.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._lock = Lock()
+        # Protege `_generation` y la instalación de una matriz compilada
+        self._state_lock = Lock()
+        self._generation = 0
+        self._loaded_at: Optional[float] = None
+        # Los bits dependen del orden de los nombres: crear un permiso los
+        # desplaza, así que bits y máscaras se leen siempre del mismo snapshot
+        self._compiled = _Compiled({}, {}, {})
+
+    def invalidate(self) -> None:
+        """Marca la matriz como obsoleta; se reconstruye en el próximo uso."""
+        with self._state_lock:
+            self._generation += 1
+            self._loaded_at = None
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    def _compile(self) -> bool:
+        """
+        Carga roles y permisos con una sola consulta y compila las máscaras.
+
+        Lee siempre del primario: una réplica atrasada justo después de
+        `invalidate()` dejaría permisos viejos durante todo el `ttl`. Si hubo
+        otro `invalidate()` mientras compilaba, el resultado puede ser
+        anterior a ese cambio: no lo instala y retorna False.
+        """
+        from src.db.session import SessionLocal, init_engine
+
+        generation = self._generation
+        init_engine()
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(Role.id, Role.name, Permission.name)
+                .select_from(Role)
+                .outerjoin(permission_role, permission_role.c.role_id == Role.id)
+                .outerjoin(Permission, Permission.id == permission_role.c.permission_id)
+            ).all()
+            permission_names = db.execute(select(Permission.name).order_by(Permission.name)).scalars().all()
+        finally:
+            db.close()
+
+        bits = {name: 1 << index for index, name in enumerate(permission_names)}
+        role_masks: Dict[UUID, int] = {}
+        role_names: Dict[UUID, str] = {}
+        for role_id, role_name, permission_name in rows:
+            role_names[role_id] = role_name
+            role_masks[role_id] = role_masks.get(role_id, 0) | bits.get(permission_name, 0)
+
+        with self._state_lock:
+            if generation != self._generation:
+                return False
+            self._compiled = _Compiled(bits, role_masks, role_names)
+            self._loaded_at = time.monotonic()
+        return True
+
+    def ensure_loaded(self) -> None:
+        if self._is_fresh():
+            CACHE_REQUESTS.inc("permission_matrix", "hit")
+            return
+        with self._lock:
+            if not self._is_fresh():
+                CACHE_REQUESTS.inc("permission_matrix", "miss")
+                while not self._compile():
+                    pass
+                return
+        CACHE_REQUESTS.inc("permission_matrix", "hit")
+
+    def has_permission(self, role_id: UUID, permission_name: str) -> bool:
+        """Indica si el rol tiene el permiso."""
+        self.ensure_loaded()
+        compiled = self._compiled
+        bit = compiled.bits.get(permission_name)
+        return bit is not None and bool(compiled.role_masks.get(role_id, 0) & bit)
+
+    def get_role_name(self, role_id: UUID) -> Optional[str]:
+        """Nombre del rol sin cargar la relación `User.role`."""
+        self.ensure_loaded()
+        return self._compiled.role_names.get(role_id)
+
+
+_permission_matrix: Optional[PermissionMatrix] = None
+
+
+def get_permission_matrix() -> PermissionMatrix:
+    """Retorna la matriz de permisos del proceso."""
+    global _permission_matrix
+    if _permission_matrix is None:
+        _permission_matrix = PermissionMatrix(ttl=get_settings().RBAC_MATRIX_TTL_SECONDS)
+    return _permission_matrix
@@ -5,8 +5,12 @@ from sqlalchemy.orm import Session
 
 from src.models.permission import Permission
 from src.schemas.permission import PermissionCreate
+from src.services.audit_log import audit
+from src.services.permission_matrix import get_permission_matrix
+from src.core.tracing import traced_service
 
 
+@traced_service
 class PermissionService:
     """Servicio para operaciones con permisos."""
     
@@ -25,7 +29,10 @@ class PermissionService:
         """Crea un nuevo permiso."""
         permission = Permission(name=permission_data.name, created_by=str(created_by))
         self.db.add(permission)
+        self.db.flush()
+        audit(self.db, "create", "permission", permission.id, created_by, {"name": permission.name})
         self.db.commit()
+        get_permission_matrix().invalidate()
         self.db.refresh(permission)
         return permission
     
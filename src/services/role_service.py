@@ -1,15 +1,21 @@
-from typing import Optional, List, Tuple
+from typing import Dict, Iterable, Optional, List, Tuple
 from uuid import UUID
 
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, func, select, update, delete, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
+from src.models.association import permission_role
 from src.models.role import Role
 from src.models.user import User
 from src.models.permission import Permission
 from src.schemas.role import RoleCreate
+from src.services.audit_log import audit
+from src.services.permission_matrix import get_permission_matrix
+from src.core.tracing import traced_service
 
 
+@traced_service
 class RoleService:
     """Servicio para operaciones con roles."""
     
@@ -28,7 +34,10 @@ class RoleService:
         """Crea un nuevo rol."""
         role = Role(name=role_data.name, created_by=str(created_by))
         self.db.add(role)
+        self.db.flush()
+        audit(self.db, "create", "role", role.id, created_by, {"name": role.name})
         self.db.commit()
+        get_permission_matrix().invalidate()
         self.db.refresh(role)
         return role
     
@@ -36,6 +45,27 @@ class RoleService:
         """Obtiene todos los roles."""
         return self.db.query(Role).order_by(Role.name).all()
     
+    def get_member_counts(
+        self, role_ids: Optional[Iterable[UUID]] = None
+    ) -> Dict[UUID, Tuple[int, int]]:
+        """
+        Cuenta usuarios (totales y activos) por rol con un solo GROUP BY.
+
+        No carga `Role.users`; los roles sin usuarios no aparecen en el
+        resultado.
+        """
+        query = select(
+            User.role_id,
+            func.count(),
+            func.count().filter(User.is_active.is_(True)),
+        ).group_by(User.role_id)
+        if role_ids is not None:
+            query = query.where(User.role_id.in_(list(role_ids)))
+        return {
+            role_id: (user_count, active_user_count)
+            for role_id, user_count, active_user_count in self.db.execute(query)
+        }
+    
     def assign_permissions_to_role(
         self, 
         role_id: UUID, 
@@ -49,10 +79,104 @@ class RoleService:
         
         role.permissions = permissions
         role.updated_by = str(updated_by)
+        audit(self.db, "set_permissions", "role", role_id, updated_by, {
+            "permissions": sorted(permission.name for permission in permissions),
+        })
         self.db.commit()
+        get_permission_matrix().invalidate()
         self.db.refresh(role)
         return role
     
+    def update_role_permissions(
+        self,
+        role_id: UUID,
+        add: List[str],
+        remove: List[str],
+        updated_by: UUID,
+    ) -> Tuple[Optional[Role], Optional[str]]:
+        """
+        Agrega y quita permisos de un rol aplicando solo la diferencia.
+
+        Usa un número fijo de sentencias sin importar cuántos permisos tenga
+        el rol: UPDATE del rol (bloquea la fila y verifica que existe), una
+        consulta de validación, INSERT ... ON CONFLICT DO NOTHING y DELETE
+        sobre `permission_role`, todo en una transacción.
+
+        Retorna (role, error_message). Si el rol no existe retorna (None, None).
+        """
+        touched = self.db.execute(
+            update(Role)
+            .where(Role.id == role_id)
+            .values(updated_by=str(updated_by))
+            .returning(Role.id)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+        if touched is None:
+            self.db.rollback()
+            return None, None
+
+        # Validar nombres y estado de asignación en una sola consulta
+        names = set(add) | set(remove)
+        rows = self.db.execute(
+            select(Permission.id, Permission.name, permission_role.c.role_id)
+            .outerjoin(
+                permission_role,
+                and_(
+                    permission_role.c.permission_id == Permission.id,
+                    permission_role.c.role_id == role_id,
+                ),
+            )
+            .where(Permission.name.in_(names))
+        ).all()
+        ids_by_name = {name: permission_id for permission_id, name, _ in rows}
+        assigned = {name for _, name, assigned_role in rows if assigned_role is not None}
+
+        missing = names - ids_by_name.keys()
+        if missing:
+            self.db.rollback()
+            return None, f"Los siguientes permisos no existen: {', '.join(sorted(missing))}"
+
+        not_assigned = set(remove) - assigned
+        if not_assigned:
+            self.db.rollback()
+            return None, f"Los siguientes permisos no están asignados al rol: {', '.join(sorted(not_assigned))}"
+
+        # Un permiso presente en add y remove termina quitado (igual que antes)
+        to_add = set(add) - assigned - set(remove)
+        to_remove = set(remove)
+
+        if to_add:
+            self.db.execute(
+                pg_insert(permission_role)
+                .values([
+                    {"role_id": role_id, "permission_id": ids_by_name[name]}
+                    for name in sorted(to_add)
+                ])
+                .on_conflict_do_nothing()
+            )
+        if to_remove:
+            self.db.execute(
+                delete(permission_role).where(
+                    permission_role.c.role_id == role_id,
+                    permission_role.c.permission_id.in_([ids_by_name[name] for name in to_remove]),
+                )
+            )
+
+        audit(self.db, "update_permissions", "role", role_id, updated_by, {
+            "add": sorted(to_add),
+            "remove": sorted(to_remove),
+        })
+        self.db.commit()
+        get_permission_matrix().invalidate()
+
+        role = (
+            self.db.query(Role)
+            .filter(Role.id == role_id)
+            .populate_existing()
+            .first()
+        )
+        return role, None
+    
     def get_users_by_role_name(self, role_name: str) -> Tuple[List[User], int]:
         """Obtiene usuarios por nombre de rol."""
         role = self.get_role_by_name(role_name)
@@ -1,13 +1,37 @@
+from bisect import bisect_right
 from typing import Optional, List, Tuple
 from uuid import UUID
 
+from sqlalchemy import desc, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
+from src.models.association import task_tag
+from src.models.cache_version import CacheVersion
 from src.models.tag import Tag
 from src.models.task import Task
-from src.schemas.tag import TagCreate
+from src.schemas.tag import TagCreate, TagResponse
+from src.services.audit_log import audit
+from src.services.cache import get_tag_catalog_cache
+from src.core.tracing import traced_service
 
 
+TAG_CATALOG = "tags"
+
+
+def bump_tag_catalog_version(db: Session) -> None:
+    """Invalida el catálogo de tags en todos los procesos al hacer commit la transacción de `db`."""
+    db.execute(
+        pg_insert(CacheVersion)
+        .values(name=TAG_CATALOG, version=1)
+        .on_conflict_do_update(
+            index_elements=[CacheVersion.name],
+            set_={"version": CacheVersion.version + 1},
+        )
+    )
+
+
+@traced_service
 class TagService:
     """Servicio para operaciones con tags."""
     
@@ -26,14 +50,50 @@ class TagService:
         """Crea un nuevo tag."""
         tag = Tag(name=tag_data.name, created_by=str(created_by))
         self.db.add(tag)
+        self.db.flush()
+        bump_tag_catalog_version(self.db)
+        audit(self.db, "create", "tag", tag.id, created_by, {"name": tag.name})
         self.db.commit()
         self.db.refresh(tag)
         return tag
     
-    def get_all_tags(self) -> Tuple[List[Tag], int]:
-        """Obtiene todos los tags."""
-        tags = self.db.query(Tag).order_by(Tag.name).all()
-        return tags, len(tags)
+    def get_tag_catalog(self) -> Tuple[List[TagResponse], List[str]]:
+        """
+        Catálogo completo de tags ordenado por nombre (orden binario, el mismo
+        de `bisect`) y la lista de nombres, desde la caché del proceso.
+
+        La versión se lee antes que los tags: una entrada guardada bajo la
+        versión `v` nunca es más antigua que `v`.
+        """
+        version = self.db.execute(
+            select(CacheVersion.version).where(CacheVersion.name == TAG_CATALOG)
+        ).scalar() or 0
+        cache = get_tag_catalog_cache()
+        catalog = cache.get(str(version))
+        if catalog is None:
+            rows = self.db.execute(
+                select(Tag.id, Tag.name, Tag.created_at, Tag.created_by, Tag.updated_at, Tag.updated_by)
+                .order_by(Tag.name.collate("C"))
+            ).all()
+            items = [TagResponse.model_validate(row) for row in rows]
+            catalog = (items, [item.name for item in items])
+            cache.set(str(version), catalog)
+        return catalog
+    
+    def get_tags_page(
+        self,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> Tuple[List[TagResponse], int, Optional[str]]:
+        """
+        Página del catálogo con keyset por nombre: los tags posteriores a
+        `after`. Retorna (tags, total del catálogo, cursor siguiente o None).
+        """
+        items, names = self.get_tag_catalog()
+        start = bisect_right(names, after) if after is not None else 0
+        page = items[start:start + limit]
+        next_cursor = page[-1].name if start + limit < len(items) else None
+        return page, len(items), next_cursor
     
     def get_tasks_by_tag_name(
         self, 
@@ -45,7 +105,18 @@ class TagService:
         if not tag:
             return [], 0
         
-        tasks = [task for task in tag.tasks if task.user_id == user_id]
+        # Filtrar por usuario en SQL: poda particiones de tasks y task_tag
+        tasks = (
+            self.db.query(Task)
+            .join(task_tag, task_tag.c.task_id == Task.id)
+            .filter(
+                task_tag.c.tag_id == tag.id,
+                task_tag.c.user_id == user_id,
+                Task.user_id == user_id,
+            )
+            .order_by(desc(Task.created_at))
+            .all()
+        )
         return tasks, len(tasks)
 
 
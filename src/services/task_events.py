@@ -0,0 +1,217 @@
+"""
+Difusión en tiempo real de cambios de tareas.
+
+Los servicios publican un evento por cada alta, modificación o baja de una
+tarea dentro de su transacción; el evento solo se entrega si la transacción
+hace commit. Las conexiones SSE de `/tasks/events` se suscriben por usuario y
+cada una tiene una cola acotada: si un consumidor lento la llena, recibe un
+evento `resync` y se cierra (el cliente se pone al día con `/tasks/changes`).
+
+Backends (`TASK_EVENTS_BACKEND`):
+- `local`: broker en memoria, suficiente con un solo proceso.
+- `postgres`: `pg_notify` en la transacción del servicio y un hilo por
+  proceso con `LISTEN` que reparte a los suscriptores locales, para que el
+  fan-out funcione con varios workers.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+from functools import partial
+from typing import AsyncIterator, Dict, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy import select as sa_select
+from sqlalchemy.orm import Session
+
+from src.core.config import get_settings
+from src.db.session import get_engine, run_after_commit
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "task_events"
+
+
+class Subscription:
+    """Suscripción de una conexión a los eventos de un usuario."""
+
+    def __init__(self, user_id: str, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def offer(self, task_event: dict) -> None:
+        """Encola el evento; se ejecuta en el loop de la conexión."""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(task_event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+def _offer_all(subscriptions: List[Subscription], task_event: dict) -> None:
+    for subscription in subscriptions:
+        subscription.offer(task_event)
+
+
+class TaskEventBroker:
+    """Broker en memoria: reparte los eventos confirmados a los suscriptores del proceso."""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: UUID) -> Subscription:
+        """Registra una suscripción ligada al loop en ejecución."""
+        subscription = Subscription(str(user_id), asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscriptions.setdefault(subscription.user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def dispatch(self, task_event: dict) -> None:
+        """Entrega un evento a las suscripciones locales de su usuario (desde cualquier hilo)."""
+        by_loop: Dict[asyncio.AbstractEventLoop, List[Subscription]] = {}
+        with self._lock:
+            for subscription in self._subscriptions.get(task_event["user_id"], ()):
+                by_loop.setdefault(subscription.loop, []).append(subscription)
+        # Un solo despertar por loop, no uno por conexión
+        for loop, subscriptions in by_loop.items():
+            loop.call_soon_threadsafe(_offer_all, subscriptions, task_event)
+
+    def publish(self, db: Session, task_event: dict) -> None:
+        """Asocia el evento a la transacción de `db`; se entrega tras el commit."""
+        run_after_commit(db, partial(self.dispatch, task_event))
+
+    def close(self) -> None:
+        """Libera los recursos del broker."""
+
+
+class PostgresTaskEventBroker(TaskEventBroker):
+    """Broker con fan-out entre procesos vía LISTEN/NOTIFY."""
+
+    def __init__(self, queue_size: int = 100, poll_interval: float = 1.0):
+        super().__init__(queue_size)
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._listener: Optional[threading.Thread] = None
+
+    def publish(self, db: Session, task_event: dict) -> None:
+        # NOTIFY es transaccional: Postgres lo entrega solo si la transacción hace commit
+        db.execute(sa_select(func.pg_notify(CHANNEL, json.dumps(task_event))))
+
+    def subscribe(self, user_id: UUID) -> Subscription:
+        self._ensure_listener()
+        return super().subscribe(user_id)
+
+    def _ensure_listener(self) -> None:
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._stop.clear()
+                self._listener = threading.Thread(
+                    target=self._listen, name="task-events-listener", daemon=True
+                )
+                self._listener.start()
+
+    def _listen(self) -> None:
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = get_engine().raw_connection()
+                driver_connection = connection.driver_connection
+                driver_connection.autocommit = True
+                with driver_connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                while not self._stop.is_set():
+                    ready, _, _ = select.select([driver_connection], [], [], self.poll_interval)
+                    if not ready:
+                        continue
+                    driver_connection.poll()
+                    while driver_connection.notifies:
+                        notify = driver_connection.notifies.pop(0)
+                        self.dispatch(json.loads(notify.payload))
+            except Exception:
+                logger.exception("Error en el listener de eventos de tareas; reintentando")
+                self._stop.wait(self.poll_interval)
+            finally:
+                if connection is not None:
+                    connection.invalidate()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._listener is not None:
+            self._listener.join(timeout=self.poll_interval * 2)
+            self._listener = None
+
+
+def task_event(event_type: str, task_id: UUID, user_id: UUID, version: Optional[int] = None) -> dict:
+    """Construye el payload de un evento (`created`, `updated` o `deleted`)."""
+    return {
+        "type": event_type,
+        "task_id": str(task_id),
+        "user_id": str(user_id),
+        "version": version,
+    }
+
+
+async def stream_task_events(user_id: UUID, heartbeat: float) -> AsyncIterator[str]:
+    """Genera el stream SSE de un usuario hasta que el cliente se desconecta o desborda su cola."""
+    broker = get_task_event_broker()
+    subscription = broker.subscribe(user_id)
+    try:
+        yield ": conectado\n\n"
+        while True:
+            if subscription.overflowed:
+                yield "event: resync\ndata: {}\n\n"
+                return
+            try:
+                task_event = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {task_event['type']}\ndata: {json.dumps(task_event)}\n\n"
+    finally:
+        broker.unsubscribe(subscription)
+
+
+_broker: Optional[TaskEventBroker] = None
+_broker_lock = threading.Lock()
+
+
+def get_task_event_broker() -> TaskEventBroker:
+    """Retorna el broker del proceso según `TASK_EVENTS_BACKEND`."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                settings = get_settings()
+                if settings.TASK_EVENTS_BACKEND == "postgres":
+                    _broker = PostgresTaskEventBroker(settings.TASK_EVENTS_QUEUE_SIZE)
+                else:
+                    _broker = TaskEventBroker(settings.TASK_EVENTS_QUEUE_SIZE)
+    return _broker
+
+
+def shutdown_task_event_broker() -> None:
+    """Detiene el listener (si existe) y olvida el broker."""
+    global _broker
+    with _broker_lock:
+        if _broker is not None:
+            _broker.close()
+            _broker = None
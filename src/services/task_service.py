@@ -1,15 +1,62 @@
+from datetime import datetime, timedelta, timezone
 from math import ceil
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Union
 from uuid import UUID
 
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import asc, desc, func, update, delete, insert, literal, select, tuple_, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from src.models.task import Task, TaskStatus, TaskPriority
+from src.models.association import task_tag, task_tag_archive
+from src.models.cache_version import TaskListVersion
+from src.models.task import XID8, Task, TaskStatus, TaskPriority, task_modified_at
+from src.models.task_archive import TaskArchive
 from src.models.tag import Tag
-from src.schemas.task import TaskCreate, TaskUpdate
+from src.models.task_tombstone import TaskTombstone
+from src.schemas.task import TaskCreate, TaskUpdate, TaskResponse
+from src.services.cache import get_task_list_cache
+from src.services.audit_log import audit
+from src.services.exceptions import VersionConflictError
+from src.services.tag_service import bump_tag_catalog_version
+from src.services.task_events import get_task_event_broker, task_event
+from src.core.tracing import traced_service
 
 
+def modified_at(model):
+    """Última modificación (o creación) de `Task` o `TaskArchive`, como en sus índices."""
+    return func.coalesce(model.updated_at, model.created_at)
+
+
+# Criterio de orden del listado -> columnas de `Task` o `TaskArchive`; cada
+# uno tiene su índice (user_id, ...) en tasks
+TASK_SORT_KEYS = {
+    "created_at": lambda model: (model.created_at,),
+    "updated_at": lambda model: (modified_at(model),),
+    "priority": lambda model: (model.priority, model.created_at),
+    "status": lambda model: (model.status, model.created_at),
+}
+
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Las columnas de fecha son UTC sin zona horaria."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def bump_task_list_version(db: Session, user_id: UUID) -> None:
+    """Invalida las páginas de `GET /tasks` del usuario al hacer commit la transacción de `db`."""
+    db.execute(
+        pg_insert(TaskListVersion)
+        .values(user_id=user_id, version=1)
+        .on_conflict_do_update(
+            index_elements=[TaskListVersion.user_id],
+            set_={"version": TaskListVersion.version + 1},
+        )
+    )
+
+
+@traced_service
 class TaskService:
     """Servicio para operaciones con tareas."""
     
@@ -26,9 +73,14 @@ class TaskService:
                 tag = Tag(name=name, created_by=str(user_id))
                 self.db.add(tag)
                 self.db.flush()  # Para obtener el ID sin hacer commit
+                bump_tag_catalog_version(self.db)
             tags.append(tag)
         return tags
     
+    def _bump_task_list_version(self, user_id: UUID) -> None:
+        """Invalida las páginas en caché del usuario (en la transacción actual)."""
+        bump_task_list_version(self.db, user_id)
+    
     def create_task(self, task_data: TaskCreate, user_id: UUID) -> Task:
         """Crea una nueva tarea."""
         task = Task(
@@ -45,16 +97,57 @@ class TaskService:
             task.tags = self._get_or_create_tags(task_data.tag_names, user_id)
         
         self.db.add(task)
+        self.db.flush()
+        self._bump_task_list_version(user_id)
+        get_task_event_broker().publish(self.db, task_event("created", task.id, user_id, task.version))
+        audit(self.db, "create", "task", task.id, user_id, task_data.model_dump(exclude_none=True))
+        task_id = task.id
         self.db.commit()
-        self.db.refresh(task)
-        return task
+        # Releer filtrando también por user_id, que es la clave de partición
+        return (
+            self.db.query(Task)
+            .filter(Task.id == task_id, Task.user_id == user_id)
+            .populate_existing()
+            .one()
+        )
     
-    def get_task_by_id(self, task_id: UUID, user_id: UUID) -> Optional[Task]:
-        """Obtiene una tarea por ID (solo si pertenece al usuario)."""
-        return self.db.query(Task).filter(
+    def get_task_by_id(
+        self, task_id: UUID, user_id: UUID, include_archived: bool = False
+    ) -> Optional[Union[Task, TaskArchive]]:
+        """
+        Obtiene una tarea por ID (solo si pertenece al usuario). Con
+        `include_archived`, si no está en `tasks` la busca en `tasks_archive`.
+        """
+        task = self.db.query(Task).filter(
             Task.id == task_id,
             Task.user_id == user_id
         ).first()
+        if task is None and include_archived:
+            task = self.db.query(TaskArchive).filter(
+                TaskArchive.id == task_id,
+                TaskArchive.user_id == user_id,
+            ).first()
+        return task
+    
+    def get_tasks_by_ids(self, task_ids: List[UUID], user_id: UUID) -> Tuple[List[Task], List[UUID]]:
+        """
+        Obtiene varias tareas del usuario con una sola consulta (tags incluidos).
+
+        Retorna (tareas en el orden pedido, ids inexistentes o ajenos), sin duplicados.
+        """
+        unique_ids = list(dict.fromkeys(task_ids))
+        found = {
+            task.id: task
+            for task in (
+                self.db.query(Task)
+                .options(joinedload(Task.tags))
+                .filter(Task.id.in_(unique_ids), Task.user_id == user_id)
+                .all()
+            )
+        }
+        tasks = [found[task_id] for task_id in unique_ids if task_id in found]
+        missing = [task_id for task_id in unique_ids if task_id not in found]
+        return tasks, missing
     
     def get_tasks_paginated(
         self, 
@@ -63,75 +156,402 @@ class TaskService:
         page_size: int = 10,
         status: Optional[str] = None,
         priority: Optional[str] = None,
-    ) -> Tuple[List[Task], int]:
-        """Obtiene tareas paginadas del usuario."""
-        query = self.db.query(Task).filter(Task.user_id == user_id)
-        
-        # Filtros opcionales
-        if status:
-            query = query.filter(Task.status == TaskStatus(status))
-        if priority:
-            query = query.filter(Task.priority == TaskPriority(priority))
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        updated_since: Optional[datetime] = None,
+        sort: str = "created_at",
+        descending: bool = True,
+        include_archived: bool = False,
+    ) -> Tuple[List[Union[Task, TaskArchive]], int]:
+        """
+        Obtiene tareas paginadas del usuario.
+
+        `sort` es una clave de TASK_SORT_KEYS; `updated_since` compara contra
+        la última modificación (o la creación si nunca se modificó). Con
+        `include_archived` la página mezcla `tasks` y `tasks_archive`.
+        """
+        filters = (status, priority, created_after, created_before, updated_since)
+        direction = desc if descending else asc
+        offset = (page - 1) * page_size
+
+        if include_archived:
+            return self._get_tasks_with_archived(user_id, filters, sort, direction, offset, page_size)
+
+        query = self.db.query(Task).filter(*self._list_conditions(Task, user_id, *filters))
         
         # Contar total antes de paginar
         total = query.count()
         
-        # Ordenar y paginar
+        # Ordenar (con el id como desempate estable entre páginas) y paginar
+        order_by = [direction(column) for column in TASK_SORT_KEYS[sort](Task) + (Task.id,)]
         tasks = (
             query
-            .order_by(desc(Task.created_at))
-            .offset((page - 1) * page_size)
+            .order_by(*order_by)
+            .offset(offset)
             .limit(page_size)
             .all()
         )
         
         return tasks, total
     
+    @staticmethod
+    def _list_conditions(
+        model,
+        user_id: UUID,
+        status: Optional[str],
+        priority: Optional[str],
+        created_after: Optional[datetime],
+        created_before: Optional[datetime],
+        updated_since: Optional[datetime],
+    ) -> list:
+        """Condiciones del listado sobre `Task` o `TaskArchive`."""
+        conditions = [model.user_id == user_id]
+        if status:
+            conditions.append(model.status == TaskStatus(status))
+        if priority:
+            conditions.append(model.priority == TaskPriority(priority))
+        if created_after is not None:
+            conditions.append(model.created_at >= to_naive_utc(created_after))
+        if created_before is not None:
+            conditions.append(model.created_at < to_naive_utc(created_before))
+        if updated_since is not None:
+            conditions.append(modified_at(model) >= to_naive_utc(updated_since))
+        return conditions
+    
+    def _get_tasks_with_archived(
+        self, user_id: UUID, filters: tuple, sort: str, direction, offset: int, limit: int
+    ) -> Tuple[List[Union[Task, TaskArchive]], int]:
+        """
+        Página ordenada sobre `tasks` UNION ALL `tasks_archive`: primero se
+        resuelven solo las claves de la página y después se cargan las filas
+        de cada tabla.
+        """
+        def keys(model, archived: bool):
+            columns = [column.label(f"sort_{i}") for i, column in enumerate(TASK_SORT_KEYS[sort](model))]
+            return select(
+                model.id, *columns, literal(archived).label("archived")
+            ).where(*self._list_conditions(model, user_id, *filters))
+
+        listing = union_all(keys(Task, False), keys(TaskArchive, True)).subquery()
+        total = self.db.execute(select(func.count()).select_from(listing)).scalar_one()
+
+        sort_columns = [column for column in listing.c if column.name.startswith("sort_")]
+        page = self.db.execute(
+            select(listing.c.id, listing.c.archived)
+            .order_by(*[direction(column) for column in sort_columns + [listing.c.id]])
+            .offset(offset)
+            .limit(limit)
+        ).all()
+
+        found = {}
+        for model, archived in ((Task, False), (TaskArchive, True)):
+            ids = [task_id for task_id, is_archived in page if is_archived == archived]
+            if ids:
+                rows = self.db.query(model).filter(model.id.in_(ids), model.user_id == user_id).all()
+                found.update(((row.id, archived), row) for row in rows)
+        tasks = [found[key] for key in (tuple(row) for row in page) if key in found]
+        return tasks, total
+    
+    def get_tasks_page(
+        self,
+        user_id: UUID,
+        list_version: int,
+        page: int = 1,
+        page_size: int = 10,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        updated_since: Optional[datetime] = None,
+        sort: str = "created_at",
+        descending: bool = True,
+        include_archived: bool = False,
+    ) -> Tuple[List[dict], int]:
+        """
+        Como `get_tasks_paginated`, con las tareas ya serializadas y servidas
+        desde la caché si el usuario no las modificó desde que se guardó la
+        página (`list_version` es `User.task_list_version`).
+        """
+        cache = get_task_list_cache()
+        dates = ":".join(
+            to_naive_utc(value).isoformat() if value is not None else ""
+            for value in (created_after, created_before, updated_since)
+        )
+        key = (
+            f"{user_id}:{list_version}:{page}:{page_size}:{status or ''}:{priority or ''}:"
+            f"{dates}:{sort}:{'desc' if descending else 'asc'}:{int(include_archived)}"
+        )
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached["items"], cached["total"]
+
+        tasks, total = self.get_tasks_paginated(
+            user_id, page, page_size, status, priority,
+            created_after, created_before, updated_since, sort, descending, include_archived,
+        )
+        items = [TaskResponse.model_validate(task).model_dump(mode="json") for task in tasks]
+        if cache is not None:
+            cache.set(key, {"items": items, "total": total})
+        return items, total
+    
     def update_task(
         self, 
         task_id: UUID, 
         user_id: UUID, 
-        task_data: TaskUpdate
+        task_data: TaskUpdate,
+        expected_version: Optional[int] = None,
     ) -> Optional[Task]:
-        """Actualiza una tarea existente."""
-        task = self.get_task_by_id(task_id, user_id)
-        
-        if not task:
-            return None
-        
-        # Actualizar solo campos proporcionados
+        """
+        Actualiza una tarea existente con un único UPDATE condicional.
+
+        Si se indica `expected_version` y no coincide con la versión actual,
+        lanza VersionConflictError sin modificar la tarea.
+        """
         update_data = task_data.model_dump(exclude_unset=True)
-        
+        tag_names = update_data.pop("tag_names", None)
+
+        # Actualizar solo campos proporcionados
+        values = {}
         for field, value in update_data.items():
-            if field == "tag_names" and value is not None:
-                task.tags = self._get_or_create_tags(value, user_id)
-            elif field == "status" and value is not None:
-                setattr(task, field, TaskStatus(value))
+            if field == "status" and value is not None:
+                values[field] = TaskStatus(value)
             elif field == "priority" and value is not None:
-                setattr(task, field, TaskPriority(value))
+                values[field] = TaskPriority(value)
             elif value is not None:
-                setattr(task, field, value)
-        
-        task.updated_by = str(user_id)
+                values[field] = value
+        values["updated_by"] = str(user_id)
+        values["version"] = Task.version + 1
+
+        stmt = update(Task).where(Task.id == task_id, Task.user_id == user_id)
+        if expected_version is not None:
+            stmt = stmt.where(Task.version == expected_version)
+        stmt = (
+            stmt.values(**values)
+            .returning(Task.version)
+            .execution_options(synchronize_session=False)
+        )
+
+        new_version = self.db.execute(stmt).scalar_one_or_none()
+        if new_version is None:
+            self.db.rollback()
+            current_version = self.db.query(Task.version).filter(
+                Task.id == task_id,
+                Task.user_id == user_id
+            ).scalar()
+            if current_version is None:
+                return None
+            raise VersionConflictError(current_version)
+
+        if tag_names is not None:
+            tag_ids = {tag.id for tag in self._get_or_create_tags(tag_names, user_id)}
+            self.db.execute(
+                delete(task_tag).where(task_tag.c.task_id == task_id, task_tag.c.user_id == user_id)
+            )
+            if tag_ids:
+                self.db.execute(
+                    insert(task_tag),
+                    [{"task_id": task_id, "tag_id": tag_id, "user_id": user_id} for tag_id in tag_ids],
+                )
+
+        self._bump_task_list_version(user_id)
+        get_task_event_broker().publish(self.db, task_event("updated", task_id, user_id, new_version))
+        audit(self.db, "update", "task", task_id, user_id, task_data.model_dump(exclude_unset=True))
         self.db.commit()
-        self.db.refresh(task)
-        return task
+        return (
+            self.db.query(Task)
+            .filter(Task.id == task_id, Task.user_id == user_id)
+            .populate_existing()
+            .first()
+        )
     
     def delete_task(self, task_id: UUID, user_id: UUID) -> bool:
-        """Elimina una tarea."""
-        task = self.get_task_by_id(task_id, user_id)
-        
-        if not task:
+        """Elimina una tarea y deja un tombstone para el feed de cambios."""
+        # Explícito: con tasks particionada por fecha no hay FK desde task_tag
+        self.db.execute(
+            delete(task_tag).where(task_tag.c.task_id == task_id, task_tag.c.user_id == user_id)
+        )
+        deleted = self.db.execute(
+            delete(Task)
+            .where(Task.id == task_id, Task.user_id == user_id)
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+
+        if deleted is None:
+            self.db.rollback()
             return False
-        
-        self.db.delete(task)
+
+        self.db.execute(insert(TaskTombstone).values(task_id=task_id, user_id=user_id))
+        self._bump_task_list_version(user_id)
+        get_task_event_broker().publish(self.db, task_event("deleted", task_id, user_id))
+        audit(self.db, "delete", "task", task_id, user_id)
         self.db.commit()
         return True
     
+    def get_changes(
+        self,
+        user_id: UUID,
+        since: Tuple[int, int],
+        limit: int,
+        include_deleted: bool = True,
+    ) -> Tuple[List[Task], List[UUID], Tuple[int, int], bool]:
+        """
+        Cambios del usuario posteriores a la posición `since`
+        (`change_xid`, `change_seq`), en ese orden.
+
+        `change_seq` se asigna al ejecutar la sentencia y no al hacer commit:
+        una transacción lenta puede confirmar un valor menor que otro que el
+        cliente ya recibió. Por eso solo se entregan cambios de transacciones
+        anteriores a la más antigua aún en curso (`pg_snapshot_xmin`): esas
+        ya terminaron y ninguna que confirme después puede quedar detrás de
+        la posición del cliente.
+
+        Retorna (tareas creadas o modificadas, ids borrados, última posición
+        incluida, hay_más). Tareas y tombstones se leen por separado con el
+        índice (user_id, change_xid, change_seq) y se mezclan hasta `limit`.
+        """
+        # Un solo horizonte para ambas consultas, que en READ COMMITTED usan snapshots distintos
+        horizon = self.db.execute(
+            select(func.pg_snapshot_xmin(func.pg_current_snapshot(), type_=XID8()))
+        ).scalar_one()
+        since_position = tuple_(literal(since[0], XID8()), literal(since[1]))
+
+        tasks = (
+            self.db.query(Task)
+            .filter(
+                Task.user_id == user_id,
+                tuple_(Task.change_xid, Task.change_seq) > since_position,
+                Task.change_xid < literal(horizon, XID8()),
+            )
+            .order_by(Task.change_xid, Task.change_seq)
+            .limit(limit + 1)
+            .all()
+        )
+        tombstones = []
+        if include_deleted:
+            tombstones = (
+                self.db.query(TaskTombstone.change_xid, TaskTombstone.change_seq, TaskTombstone.task_id)
+                .filter(
+                    TaskTombstone.user_id == user_id,
+                    tuple_(TaskTombstone.change_xid, TaskTombstone.change_seq) > since_position,
+                    TaskTombstone.change_xid < literal(horizon, XID8()),
+                )
+                .order_by(TaskTombstone.change_xid, TaskTombstone.change_seq)
+                .limit(limit + 1)
+                .all()
+            )
+
+        changes = sorted(
+            [((task.change_xid, task.change_seq), task) for task in tasks]
+            + [((xid, seq), task_id) for xid, seq, task_id in tombstones],
+            key=lambda change: change[0],
+        )
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        last_position = changes[-1][0] if changes else tuple(since)
+        updated = [change for _, change in changes if isinstance(change, Task)]
+        deleted = [change for _, change in changes if not isinstance(change, Task)]
+        return updated, deleted, last_position, has_more
+    
+    def purge_tombstones(self, retention_days: int) -> int:
+        """Elimina los tombstones con más de `retention_days` días. Retorna cuántos borró."""
+        result = self.db.execute(
+            delete(TaskTombstone).where(
+                TaskTombstone.deleted_at < func.now() - timedelta(days=retention_days)
+            )
+        )
+        self.db.commit()
+        return result.rowcount
+    
+    def archive_completed_tasks(self, older_than_days: int, batch_size: int) -> int:
+        """
+        Mueve a `tasks_archive` (con sus filas de `task_tag`) las tareas
+        completadas sin cambios desde hace más de `older_than_days` días.
+
+        Cada tarea archivada deja un tombstone, así que los clientes del feed
+        de cambios la ven salir de las tareas vivas. Cada lote de
+        `batch_size` tareas es una transacción corta: los locks se limitan a
+        esas filas y las tareas que otra transacción tiene bloqueadas se
+        saltan (quedan para la siguiente ejecución). Retorna cuántas tareas
+        archivó.
+        """
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        task_columns = [column.name for column in TaskArchive.__table__.columns if column.name != "archived_at"]
+        archived = 0
+        while True:
+            # Índice parcial idx_task_completed_modified_at
+            keys = [
+                tuple(row)
+                for row in self.db.execute(
+                    select(Task.id, Task.user_id)
+                    .where(Task.status == TaskStatus.COMPLETED, task_modified_at < cutoff)
+                    .order_by(task_modified_at)
+                    .limit(batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+            ]
+            if not keys:
+                break
+
+            tag_keys = tuple_(task_tag.c.task_id, task_tag.c.user_id).in_(keys)
+            task_keys = tuple_(Task.id, Task.user_id).in_(keys)
+            self.db.execute(
+                insert(TaskArchive).from_select(
+                    task_columns, select(*[Task.__table__.c[name] for name in task_columns]).where(task_keys)
+                )
+            )
+            self.db.execute(
+                insert(task_tag_archive).from_select(
+                    ["task_id", "tag_id", "user_id"],
+                    select(task_tag.c.task_id, task_tag.c.tag_id, task_tag.c.user_id).where(tag_keys),
+                )
+            )
+            # El feed de cambios las informa como eliminadas de las tareas vivas
+            self.db.execute(
+                insert(TaskTombstone).from_select(["task_id", "user_id"], select(Task.id, Task.user_id).where(task_keys))
+            )
+            # Explícito: con tasks particionada por fecha no hay FK desde task_tag
+            self.db.execute(delete(task_tag).where(tag_keys))
+            self.db.execute(delete(Task).where(task_keys).execution_options(synchronize_session=False))
+            for user_id in sorted({user_id for _, user_id in keys}):
+                self._bump_task_list_version(user_id)
+            self.db.commit()
+
+            archived += len(keys)
+            if len(keys) < batch_size:
+                break
+        return archived
+    
     @staticmethod
     def calculate_total_pages(total: int, page_size: int) -> int:
         """Calcula el total de páginas."""
         return ceil(total / page_size) if total > 0 else 1
+    
+    @staticmethod
+    def encode_change_token(position: Tuple[int, int], synced_at: float) -> str:
+        """Token opaco del feed: última posición vista y desde cuándo el cliente está al día."""
+        change_xid, change_seq = position
+        return f"{change_xid}.{change_seq}-{int(synced_at)}"
+    
+    @staticmethod
+    def decode_change_token(token: str) -> Tuple[Tuple[int, int], float]:
+        """
+        Inverso de `encode_change_token`. Lanza ValueError si el token es
+        inválido. Un token sin transacción (anterior al orden por commit) se
+        trata como expirado: el cliente debe sincronizar desde cero.
+        """
+        position, _, synced_at = token.partition("-")
+        synced_at = float(int(synced_at))
+        if "." not in position:
+            change_xid, change_seq, synced_at = 0, int(position), 0.0
+        else:
+            change_xid, _, change_seq = position.partition(".")
+            change_xid, change_seq = int(change_xid), int(change_seq)
+        if change_xid < 0 or change_seq < 0:
+            raise ValueError(token)
+        return (change_xid, change_seq), synced_at
 
 
 def get_task_service(db: Session) -> TaskService:
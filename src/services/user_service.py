@@ -3,14 +3,19 @@ from typing import Optional, List, Tuple
 from uuid import UUID
 
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, update
 
 from src.models.user import User
 from src.models.role import Role
 from src.schemas.user import UserCreate, UserUpdate
 from src.core.security import hash_password
+from src.services.audit_log import audit
+from src.services.exceptions import VersionConflictError
+from src.services.task_service import bump_task_list_version
+from src.core.tracing import traced_service
 
 
+@traced_service
 class UserService:
     """Servicio para operaciones con usuarios."""
     
@@ -50,6 +55,12 @@ class UserService:
         )
         
         self.db.add(user)
+        self.db.flush()
+        audit(self.db, "create", "user", user.id, created_by, {
+            "username": user.username,
+            "email": user.email,
+            "role_id": role_id,
+        })
         self.db.commit()
         self.db.refresh(user)
         return user
@@ -78,49 +89,70 @@ class UserService:
         
         return users, total
     
-    def update_user(self, user_id: UUID, user_data: UserUpdate, updated_by: UUID) -> Optional[User]:
-        """Actualiza un usuario existente."""
-        user = self.get_user_by_id(user_id)
-        
-        if not user:
-            return None
+    def update_user(
+        self,
+        user_id: UUID,
+        user_data: UserUpdate,
+        updated_by: UUID,
+        expected_version: Optional[int] = None,
+    ) -> Optional[User]:
+        """
+        Actualiza un usuario existente con un único UPDATE condicional.
 
+        Si se indica `expected_version` y no coincide con la versión actual,
+        lanza VersionConflictError sin modificar el usuario.
+        """
         update_data = user_data.model_dump(exclude_unset=True)
-        
-        for field, value in update_data.items():
-            if value is not None:
-                setattr(user, field, value)
-        
-        user.updated_by = str(updated_by)
+
+        values = {field: value for field, value in update_data.items() if value is not None}
+        values["updated_by"] = str(updated_by)
+        values["version"] = User.version + 1
+
+        stmt = update(User).where(User.id == user_id)
+        if expected_version is not None:
+            stmt = stmt.where(User.version == expected_version)
+        stmt = (
+            stmt.values(**values)
+            .returning(User.version)
+            .execution_options(synchronize_session=False)
+        )
+
+        if self.db.execute(stmt).scalar_one_or_none() is None:
+            self.db.rollback()
+            current_version = self.db.query(User.version).filter(User.id == user_id).scalar()
+            if current_version is None:
+                return None
+            raise VersionConflictError(current_version)
+
+        if "name" in values or "username" in values:
+            # Las tareas en caché incluyen el nombre del usuario
+            bump_task_list_version(self.db, user_id)
+        audit(self.db, "update", "user", user_id, updated_by, update_data)
         self.db.commit()
-        self.db.refresh(user)
-        return user
+        return (
+            self.db.query(User)
+            .filter(User.id == user_id)
+            .populate_existing()
+            .first()
+        )
     
-    def deactivate_user(self, user_id: UUID, updated_by: UUID) -> Optional[User]:
+    def deactivate_user(
+        self,
+        user_id: UUID,
+        updated_by: UUID,
+        expected_version: Optional[int] = None,
+    ) -> Optional[User]:
         """Desactiva un usuario (soft delete)."""
-        user = self.get_user_by_id(user_id)
-        
-        if not user:
-            return None
-        
-        user.is_active = False
-        user.updated_by = str(updated_by)
-        self.db.commit()
-        self.db.refresh(user)
-        return user
+        return self.update_user(user_id, UserUpdate(is_active=False), updated_by, expected_version)
     
-    def activate_user(self, user_id: UUID, updated_by: UUID) -> Optional[User]:
+    def activate_user(
+        self,
+        user_id: UUID,
+        updated_by: UUID,
+        expected_version: Optional[int] = None,
+    ) -> Optional[User]:
         """Reactiva un usuario."""
-        user = self.get_user_by_id(user_id)
-        
-        if not user:
-            return None
-        
-        user.is_active = True
-        user.updated_by = str(updated_by)
-        self.db.commit()
-        self.db.refresh(user)
-        return user
+        return self.update_user(user_id, UserUpdate(is_active=True), updated_by, expected_version)
     
     @staticmethod
     def calculate_total_pages(total: int, page_size: int) -> int: